@@ -0,0 +1,228 @@
+"""Acesso concorrente à Árvore Rubro-Negra com trava de leitura/escrita
+
+`ArvoreConcorrente` envolve uma `ArvoreRubroNegra` e serializa o acesso:
+várias threads podem consultar ao mesmo tempo (busca, percursos, intervalos,
+estatísticas de ordem), enquanto cada mutação tem acesso exclusivo. A trava
+dá preferência aos escritores, para que um fluxo contínuo de leituras não
+impeça as mutações de avançar.
+
+Os iteradores não seguram a trava entre um valor e outro: leem blocos de
+valores sob a trava de leitura e, antes de cada bloco, conferem a `versao`
+da árvore. Se houve mutação desde o início do percurso, levantam
+`ErroArvore`, como os quadros de animação antigos. Quem precisa de um
+retrato estável mesmo com escritas concorrentes pode usar `em_ordem()`, que
+copia tudo sob a trava.
+
+As operações animadas copiam os quadros ainda com a trava de escrita e os
+devolvem, já que o diário de animação da árvore é um só e seria substituído
+pela próxima operação animada de outra thread.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from arvore_rubro_negra import ArvoreRubroNegra, ErroArvore
+
+# Valores lidos por aquisição da trava nos iteradores
+TAMANHO_BLOCO = 256
+
+
+class TravaLeituraEscrita:
+    """Muitos leitores ou um escritor; escritores esperando bloqueiam novos leitores.
+
+    Não é reentrante: uma thread não deve pedir a trava de novo enquanto a
+    segura.
+    """
+
+    def __init__(self):
+        # Os caminhos rápidos usam o mutex direto; a condição só serve para esperar
+        self._mutex = threading.Lock()
+        self._condicao = threading.Condition(self._mutex)
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_esperando = 0
+
+    def adquirir_leitura(self):
+        with self._mutex:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+
+    def liberar_leitura(self):
+        with self._mutex:
+            self._leitores -= 1
+            if self._leitores == 0 and self._escritores_esperando:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        with self._mutex:
+            self._escritores_esperando += 1
+            while self._escrevendo or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escrevendo = True
+
+    def liberar_escrita(self):
+        with self._mutex:
+            self._escrevendo = False
+            self._condicao.notify_all()
+
+    @contextmanager
+    def leitura(self):
+        self.adquirir_leitura()
+        try:
+            yield
+        finally:
+            self.liberar_leitura()
+
+    @contextmanager
+    def escrita(self):
+        self.adquirir_escrita()
+        try:
+            yield
+        finally:
+            self.liberar_escrita()
+
+
+def _sob_leitura(nome):
+    """Método que repassa `nome` à árvore segurando a trava de leitura"""
+    def metodo(self, *args, **kwargs):
+        trava = self.trava
+        trava.adquirir_leitura()
+        try:
+            return getattr(self.arvore, nome)(*args, **kwargs)
+        finally:
+            trava.liberar_leitura()
+    metodo.__name__ = nome
+    metodo.__doc__ = getattr(ArvoreRubroNegra, nome).__doc__
+    return metodo
+
+
+def _sob_escrita(nome):
+    """Método que repassa `nome` à árvore segurando a trava de escrita"""
+    def metodo(self, *args, **kwargs):
+        trava = self.trava
+        trava.adquirir_escrita()
+        try:
+            return getattr(self.arvore, nome)(*args, **kwargs)
+        finally:
+            trava.liberar_escrita()
+    metodo.__name__ = nome
+    metodo.__doc__ = getattr(ArvoreRubroNegra, nome).__doc__
+    return metodo
+
+
+class ArvoreConcorrente:
+    """ArvoreRubroNegra segura para várias threads.
+
+    Toda operação deve passar pelo envoltório; usar `self.arvore` direto
+    dispensa a trava.
+    """
+
+    def __init__(self, arvore=None, **opcoes):
+        self.arvore = arvore if arvore is not None else ArvoreRubroNegra(**opcoes)
+        self.trava = TravaLeituraEscrita()
+
+    # Consultas: leitores simultâneos
+    buscar = _sob_leitura("buscar")
+    buscar_lote = _sob_leitura("buscar_lote")
+    contem_lote = _sob_leitura("contem_lote")
+    posicoes_lote = _sob_leitura("posicoes_lote")
+    minimo = _sob_leitura("minimo")
+    maximo = _sob_leitura("maximo")
+    piso = _sob_leitura("piso")
+    teto = _sob_leitura("teto")
+    sucessor = _sob_leitura("sucessor")
+    antecessor = _sob_leitura("antecessor")
+    selecionar = _sob_leitura("selecionar")
+    rank = _sob_leitura("rank")
+    contar_intervalo = _sob_leitura("contar_intervalo")
+    em_ordem = _sob_leitura("em_ordem")
+    pre_ordem = _sob_leitura("pre_ordem")
+    pos_ordem = _sob_leitura("pos_ordem")
+    altura = _sob_leitura("altura")
+    altura_preta = _sob_leitura("altura_preta")
+    exportar = _sob_leitura("exportar")
+    salvar = _sob_leitura("salvar")
+    validar = _sob_leitura("validar")
+    validar_caminhos = _sob_leitura("validar_caminhos")
+    __contains__ = _sob_leitura("__contains__")
+
+    # Mutações: um escritor por vez
+    inserir = _sob_escrita("inserir")
+    inserir_ou_atualizar = _sob_escrita("inserir_ou_atualizar")
+    inserir_lote = _sob_escrita("inserir_lote")
+    excluir = _sob_escrita("excluir")
+
+    def __len__(self):
+        return len(self.arvore)
+
+    @property
+    def versao(self):
+        return self.arvore.versao
+
+    def __iter__(self):
+        return self.iter_em_ordem()
+
+    def iter_em_ordem(self):
+        """Valores em ordem; levanta ErroArvore se a árvore mudar no meio"""
+        arvore = self.arvore
+        with self.trava.leitura():
+            versao = arvore.versao
+            no = arvore._minimo(arvore.raiz) if arvore.raiz is not arvore.NIL else None
+        return self._percorrer(no, versao, None)
+
+    def intervalo(self, a, b):
+        """Valores em [a, b], em ordem; levanta ErroArvore se a árvore mudar no meio"""
+        arvore = self.arvore
+        with self.trava.leitura():
+            versao = arvore.versao
+            no = arvore._teto_no(a) if not b < a else None
+        return self._percorrer(no, versao, b)
+
+    def _percorrer(self, no, versao, limite):
+        """Gera valores a partir de `no` em blocos lidos sob a trava de leitura"""
+        arvore = self.arvore
+        while no is not None:
+            with self.trava.leitura():
+                if arvore.versao != versao:
+                    raise ErroArvore("árvore modificada durante a iteração")
+                bloco = []
+                while no is not None and len(bloco) < TAMANHO_BLOCO:
+                    if limite is not None and limite < no.valor:
+                        no = None
+                        break
+                    bloco.append(no.valor)
+                    no = arvore._sucessor_no(no)
+            yield from bloco
+
+    def validar_em_etapas(self, passo=1024):
+        """Valida a árvore inteira segurando a trava de leitura só uma etapa por vez.
+
+        Entre as etapas os escritores avançam; se algum mudar a árvore, a
+        etapa seguinte levanta ErroArvore e a validação deve recomeçar.
+        """
+        etapas = self.arvore.validar_em_etapas(passo)
+        while True:
+            with self.trava.leitura():
+                try:
+                    visitados = next(etapas)
+                except StopIteration:
+                    return
+            yield visitados
+
+    def inserir_animado(self, valor):
+        """Insere capturando a animação; retorna (inserido, [(estado, descrição), ...])"""
+        with self.trava.escrita():
+            resultado = self.arvore.inserir_animado(valor)
+            return resultado, self._copiar_quadros()
+
+    def excluir_animado(self, valor):
+        """Exclui capturando a animação; retorna (excluido, [(estado, descrição), ...])"""
+        with self.trava.escrita():
+            resultado = self.arvore.excluir_animado(valor)
+            return resultado, self._copiar_quadros()
+
+    def _copiar_quadros(self):
+        arvore = self.arvore
+        return list(zip(arvore.estados_animacao, arvore.descricoes_animacao))
@@ -0,0 +1,253 @@
+"""Coleção de Árvores Rubro-Negras particionada por intervalos de chaves
+
+`ArvoreParticionada` distribui as chaves entre N árvores independentes,
+cada uma responsável por um intervalo contíguo. O índice de roteamento é a
+lista ordenada `limites`: a partição i guarda as chaves em
+[limites[i - 1], limites[i]), e `bisect` encontra a partição de uma chave em
+O(log N).
+
+As operações em lote (`inserir_lote`, `buscar_lote`, `em_ordem`) ordenam ou
+agrupam a entrada uma vez, entregam cada grupo à sua partição em paralelo por
+um `concurrent.futures.Executor` e juntam os resultados. Como as partições
+não se sobrepõem, juntar em ordem é só concatenar.
+
+As partições se dividem ao passar de `tamanho_maximo` chaves e se juntam à
+vizinha ao cair abaixo de `tamanho_minimo`, então o número de partições
+acompanha o volume de dados.
+
+O executor padrão é um `ThreadPoolExecutor`: as partições vivem neste
+processo, e um `ProcessPoolExecutor` teria de serializar a árvore inteira a
+cada tarefa. No CPython com GIL as threads não executam Python em paralelo;
+o ganho real vem em builds sem GIL. Mesmo assim, a divisão em partições já
+reduz a altura percorrida por operação e o custo de reconstruir cada árvore.
+"""
+
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+from arvore_rubro_negra import ArvoreRubroNegra, ErroInvariante, _sem_repetidos
+
+TAMANHO_MAXIMO = 100_000
+
+
+class ArvoreParticionada:
+    """Árvores rubro-negras com intervalos de chaves disjuntos e ordenados.
+
+    Como `ArvoreRubroNegra`, não é segura para várias threads; o paralelismo
+    fica dentro de cada operação em lote, com uma tarefa por partição.
+    """
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO, tamanho_minimo=None, executor=None,
+                 trabalhadores=None, **opcoes):
+        if tamanho_maximo < 2:
+            raise ValueError("tamanho_maximo deve ser pelo menos 2")
+        self.tamanho_maximo = tamanho_maximo
+        self.tamanho_minimo = tamanho_maximo // 4 if tamanho_minimo is None else tamanho_minimo
+        self.opcoes = opcoes
+        self.limites = []
+        self.particoes = [ArvoreRubroNegra(**opcoes)]
+        self._executor = executor
+        self._executor_proprio = None
+        self._trabalhadores = trabalhadores
+
+    @property
+    def executor(self):
+        """Executor das tarefas em lote, criado na primeira operação paralela"""
+        if self._executor is None:
+            self._executor_proprio = ThreadPoolExecutor(self._trabalhadores)
+            self._executor = self._executor_proprio
+        return self._executor
+
+    def fechar(self):
+        """Encerra o executor criado pela coleção (um executor recebido fica aberto)"""
+        if self._executor_proprio is not None:
+            self._executor_proprio.shutdown()
+            self._executor_proprio = None
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def _indice(self, valor):
+        """Partição responsável por `valor`"""
+        return bisect_right(self.limites, valor)
+
+    def _mapear(self, funcao, tarefas):
+        """Aplica `funcao` às tarefas em paralelo; com uma só tarefa, roda direto"""
+        if len(tarefas) <= 1:
+            return [funcao(*tarefa) for tarefa in tarefas]
+        return list(self.executor.map(funcao, *zip(*tarefas)))
+
+    def inserir(self, valor):
+        """Insere um valor; retorna False se ele já existia"""
+        i = self._indice(valor)
+        inserido = self.particoes[i].inserir(valor)
+        if inserido and len(self.particoes[i]) > self.tamanho_maximo:
+            self._dividir(i)
+        return inserido
+
+    def excluir(self, valor):
+        """Remove um valor; retorna False se ele não existia"""
+        i = self._indice(valor)
+        excluido = self.particoes[i].excluir(valor)
+        if excluido and len(self.particoes[i]) < self.tamanho_minimo:
+            self._juntar_vizinha(i)
+        return excluido
+
+    def buscar(self, valor):
+        """Nó com `valor` na partição responsável, ou None"""
+        return self.particoes[self._indice(valor)].buscar(valor)
+
+    def __contains__(self, valor):
+        return self.buscar(valor) is not None
+
+    def __len__(self):
+        return sum(len(particao) for particao in self.particoes)
+
+    def minimo(self):
+        for particao in self.particoes:
+            if len(particao):
+                return particao.minimo()
+        return None
+
+    def maximo(self):
+        for particao in reversed(self.particoes):
+            if len(particao):
+                return particao.maximo()
+        return None
+
+    def inserir_lote(self, valores):
+        """Insere vários valores, uma tarefa por partição; retorna quantos eram novos.
+
+        Uma partição que passaria de `tamanho_maximo` não é montada inteira
+        para depois ser dividida: a tarefa intercala as chaves atuais com as
+        do lote e já monta os pedaços finais.
+        """
+        lote = list(_sem_repetidos(sorted(valores)))
+        fatias = [(i, a, b) for i, a, b in self._fatias(lote) if a < b]
+        tarefas = [(self.particoes[i], lote[a:b], self.tamanho_maximo, self.opcoes)
+                   for i, a, b in fatias]
+        inseridos = 0
+        # De trás para frente, para que os índices das partições anteriores não mudem
+        for (i, _, _), (novos, pedacos) in reversed(list(zip(fatias, self._mapear(_carregar, tarefas)))):
+            inseridos += novos
+            if pedacos is not None:
+                self._substituir(i, pedacos)
+        return inseridos
+
+    def _fatias(self, ordenados):
+        """(partição, início, fim) de cada trecho de uma lista ordenada"""
+        inicio = 0
+        for i, limite in enumerate(self.limites):
+            fim = bisect_left(ordenados, limite, inicio)
+            yield i, inicio, fim
+            inicio = fim
+        yield len(self.limites), inicio, len(ordenados)
+
+    def buscar_lote(self, valores):
+        """Lista com o nó de cada valor (ou None), na ordem da entrada.
+
+        Cada partição recebe seu grupo em uma tarefa e usa
+        `ArvoreRubroNegra.buscar_lote`, que percorre a partição uma vez só
+        quando o grupo é grande. Aceita listas, iteráveis ou arrays NumPy.
+        """
+        valores = valores.tolist() if hasattr(valores, "tolist") else list(valores)
+        grupos = {}
+        for posicao, valor in enumerate(valores):
+            grupos.setdefault(self._indice(valor), []).append(posicao)
+        tarefas = [(self.particoes[i], [valores[p] for p in posicoes])
+                   for i, posicoes in grupos.items()]
+        resultados = [None] * len(valores)
+        for posicoes, nos in zip(grupos.values(), self._mapear(_buscar_todos, tarefas)):
+            for posicao, no in zip(posicoes, nos):
+                resultados[posicao] = no
+        return resultados
+
+    def contem_lote(self, valores):
+        """Se cada valor está na coleção, na ordem da entrada"""
+        return [no is not None for no in self.buscar_lote(valores)]
+
+    def em_ordem(self):
+        """Lista com todos os valores em ordem; cada partição é percorrida em paralelo"""
+        tarefas = [(particao,) for particao in self.particoes]
+        return list(chain.from_iterable(self._mapear(ArvoreRubroNegra.em_ordem, tarefas)))
+
+    def __iter__(self):
+        return chain.from_iterable(self.particoes)
+
+    def intervalo(self, a, b):
+        """Gera em ordem os valores em [a, b], visitando só as partições do intervalo"""
+        if b < a:
+            return
+        for i in range(self._indice(a), self._indice(b) + 1):
+            yield from self.particoes[i].intervalo(a, b)
+
+    def validar(self):
+        """Valida cada partição e confere que suas chaves respeitam os limites"""
+        if self.limites != sorted(self.limites) or len(self.limites) != len(self.particoes) - 1:
+            raise ErroInvariante("limites fora de ordem ou em número errado")
+        for i, particao in enumerate(self.particoes):
+            particao.validar()
+            if not len(particao):
+                continue
+            if i > 0 and particao.minimo() < self.limites[i - 1]:
+                raise ErroInvariante(f"partição {i} tem chaves abaixo de {self.limites[i - 1]!r}")
+            if i < len(self.limites) and not particao.maximo() < self.limites[i]:
+                raise ErroInvariante(f"partição {i} tem chaves a partir de {self.limites[i]!r}")
+        return True
+
+    def _dividir(self, i):
+        """Divide a partição i em pedaços de cerca de tamanho_maximo / 2 chaves"""
+        self._substituir(i, _montar_pedacos(self.particoes[i].em_ordem(), self.tamanho_maximo, self.opcoes))
+
+    def _substituir(self, i, pedacos):
+        """Troca a partição i por árvores consecutivas, atualizando os limites"""
+        self.particoes[i:i + 1] = pedacos
+        self.limites[i:i] = [pedaco.minimo() for pedaco in pedacos[1:]]
+
+    def _juntar_vizinha(self, i):
+        """Junta a partição i à menor vizinha, se couberem juntas"""
+        if len(self.particoes) == 1:
+            return
+        if i == 0:
+            j = 1
+        elif i == len(self.particoes) - 1:
+            j = i - 1
+        else:
+            j = i - 1 if len(self.particoes[i - 1]) <= len(self.particoes[i + 1]) else i + 1
+        i, j = min(i, j), max(i, j)
+        esquerda, direita = self.particoes[i], self.particoes[j]
+        if len(esquerda) + len(direita) > self.tamanho_maximo:
+            return
+        valores = esquerda.em_ordem() + direita.em_ordem()
+        self.particoes[i:j + 1] = [ArvoreRubroNegra.from_sorted(valores, **self.opcoes)]
+        del self.limites[i]
+
+
+def _montar_pedacos(valores, tamanho_maximo, opcoes):
+    """Árvores de cerca de tamanho_maximo / 2 chaves cada, montadas em O(n)"""
+    pedacos = max(2, round(len(valores) / (tamanho_maximo // 2)))
+    passo = -(-len(valores) // pedacos)
+    return [ArvoreRubroNegra.from_sorted(valores[a:a + passo], **opcoes)
+            for a in range(0, len(valores), passo)]
+
+
+def _carregar(arvore, lote, tamanho_maximo, opcoes):
+    """Tarefa de `inserir_lote`: retorna (inseridos, pedaços ou None)"""
+    if len(arvore) + len(lote) <= tamanho_maximo:
+        return arvore.inserir_lote(lote), None
+    if len(arvore):
+        # O Timsort reconhece as duas sequências ordenadas e as intercala em O(n)
+        valores = list(_sem_repetidos(sorted(arvore.em_ordem() + lote)))
+    else:
+        valores = lote
+    return len(valores) - len(arvore), _montar_pedacos(valores, tamanho_maximo, opcoes)
+
+
+def _buscar_todos(arvore, valores):
+    """Tarefa de `buscar_lote`: busca os valores de uma partição"""
+    return arvore.buscar_lote(valores)
@@ -0,0 +1,2071 @@
+"""Núcleo da Árvore Rubro-Negra (Red-Black Tree), sem dependências externas
+
+Contém apenas a estrutura de dados e a captura de estados para animação.
+O desenho com matplotlib/networkx fica em `visualizacao.py` e só é importado
+quando `visualizar` ou `animar_operacao` são chamados.
+"""
+
+import os
+import random
+import sys
+
+
+class Cor:
+    VERMELHO = 0
+    PRETO = 1
+
+
+class Evento:
+    """Eventos reportados ao observador da árvore"""
+    DUPLICADO = "duplicado"
+    NAO_ENCONTRADO = "nao_encontrado"
+
+
+class ErroArvore(Exception):
+    """Erro base das operações da árvore em modo estrito"""
+
+
+class ErroValorDuplicado(ErroArvore, ValueError):
+    """Valor já existe na árvore"""
+
+
+class ErroValorNaoEncontrado(ErroArvore, KeyError):
+    """Valor não existe na árvore"""
+
+
+class ErroInvariante(ErroArvore):
+    """A estrutura da árvore viola uma propriedade rubro-negra"""
+
+
+class No:
+    """Representa um nó da Árvore Rubro-Negra"""
+    __slots__ = ('valor', 'cor', 'pai', 'esquerda', 'direita', 'tamanho')
+    
+    def __init__(self, valor):
+        self.valor = valor
+        self.cor = Cor.VERMELHO
+        self.pai = None
+        self.esquerda = None
+        self.direita = None
+        self.tamanho = 1  # nós na subárvore (estatísticas de ordem)
+    
+    def __str__(self):
+        cor_texto = "V" if self.cor == Cor.VERMELHO else "P"
+        return f"{self.valor}({cor_texto})"
+
+
+# Sentinela NIL compartilhada por todas as árvores. Nenhuma operação a altera
+# (a exclusão guarda o pai de x à parte), então árvores criadas separadamente
+# podem ser juntadas sem religar folhas, e threads que mexem em árvores
+# diferentes não disputam nada.
+SENTINELA = No(None)
+SENTINELA.cor = Cor.PRETO
+SENTINELA.tamanho = 0
+
+
+class Cursor:
+    """Posição em uma ArvoreRubroNegra que anda nos dois sentidos pelos
+    ponteiros de pai, sem voltar à raiz.
+    
+    Ao passar do último (ou antes do primeiro) valor o cursor fica fora da
+    árvore (`valido` é False); andar no sentido oposto o traz de volta ao
+    extremo correspondente. Mutações na árvore invalidam o cursor.
+    """
+    __slots__ = ('arvore', 'no', 'depois_do_fim')
+    
+    def __init__(self, arvore, no, depois_do_fim=False):
+        self.arvore = arvore
+        self.no = no
+        # Quando no é None, indica de que lado o cursor saiu da árvore
+        self.depois_do_fim = depois_do_fim
+    
+    @property
+    def valido(self):
+        return self.no is not None
+    
+    @property
+    def valor(self):
+        if self.no is None:
+            raise IndexError("cursor fora da árvore")
+        return self.no.valor
+    
+    def avancar(self):
+        """Move para o próximo valor; retorna False se saiu pelo fim"""
+        arvore = self.arvore
+        if self.no is None:
+            if self.depois_do_fim or arvore.raiz is arvore.NIL:
+                return False
+            self.no = arvore._minimo(arvore.raiz)
+            return True
+        self.no = arvore._sucessor_no(self.no)
+        self.depois_do_fim = True
+        return self.no is not None
+    
+    def retroceder(self):
+        """Move para o valor anterior; retorna False se saiu pelo início"""
+        arvore = self.arvore
+        if self.no is None:
+            if not self.depois_do_fim or arvore.raiz is arvore.NIL:
+                return False
+            self.no = arvore._maximo(arvore.raiz)
+            return True
+        self.no = arvore._antecessor_no(self.no)
+        self.depois_do_fim = False
+        return self.no is not None
+
+
+def _registro_no(no, NIL):
+    """Registro de um nó no formato dos quadros de animação"""
+    return {
+        'valor': no.valor,
+        'cor': no.cor,
+        'esquerda_id': id(no.esquerda) if no.esquerda is not NIL else None,
+        'direita_id': id(no.direita) if no.direita is not NIL else None,
+        'pai_id': id(no.pai) if no.pai is not None else None
+    }
+
+
+class DiarioAnimacao:
+    """Quadros de uma operação animada, guardados como diário de mutações.
+    
+    Em vez de clonar a árvore a cada passo, cada captura guarda apenas os
+    registros dos nós marcados desde a captura anterior, e a primeira
+    marcação de um nó guarda também seu registro original. Os quadros
+    completos (dicionários id -> registro) são reconstruídos sob demanda a
+    partir da árvore atual: o custo de captura é O(nós alterados) e a memória
+    é proporcional ao trabalho da operação.
+    
+    Depois que a operação termina, os quadros só podem ser reconstruídos
+    enquanto a árvore não sofrer outra mutação.
+    """
+    
+    def __init__(self, arvore):
+        self.arvore = arvore
+        self.antes = {}       # id -> registro antes da operação (None: nó criado nela)
+        self.sujos = {}       # id -> nó marcado desde a última captura
+        self.removidos = []   # nós retirados da árvore desde a última captura
+        self.passos = []      # por captura: id -> registro (None: nó removido)
+        self.versao = None    # versão da árvore ao encerrar a operação
+    
+    def marcar(self, *nos):
+        """Registra nós que serão alterados (chamar antes da alteração)"""
+        NIL = self.arvore.NIL
+        for no in nos:
+            if no is None or no is NIL:
+                continue
+            chave = id(no)
+            if chave not in self.antes:
+                self.antes[chave] = _registro_no(no, NIL)
+            self.sujos[chave] = no
+    
+    def marcar_novo(self, no):
+        """Registra um nó criado durante a operação"""
+        self.antes.setdefault(id(no), None)
+        self.sujos[id(no)] = no
+    
+    def remover(self, no):
+        """Registra um nó que sai da árvore"""
+        self.marcar(no)
+        self.removidos.append(no)
+    
+    def capturar(self):
+        """Fecha um passo com os registros atuais dos nós marcados"""
+        NIL = self.arvore.NIL
+        passo = {chave: _registro_no(no, NIL) for chave, no in self.sujos.items()}
+        for no in self.removidos:
+            passo[id(no)] = None
+        self.sujos = {}
+        self.removidos = []
+        self.passos.append(passo)
+    
+    def _estado_inicial(self):
+        """Reconstrói o estado antes da operação a partir da árvore atual"""
+        arvore = self.arvore
+        if self.versao is not None and arvore.versao != self.versao:
+            raise ErroArvore("a árvore mudou depois da animação; "
+                             "os quadros não podem mais ser reconstruídos")
+        NIL = arvore.NIL
+        estado = {id(no): _registro_no(no, NIL) for no in arvore._iter_nos_em_ordem()}
+        for chave, registro in self.antes.items():
+            if registro is None:
+                estado.pop(chave, None)
+            else:
+                estado[chave] = registro
+        return estado
+    
+    def __len__(self):
+        return len(self.passos)
+    
+    def __iter__(self):
+        estado = self._estado_inicial()
+        for passo in self.passos:
+            for chave, registro in passo.items():
+                if registro is None:
+                    estado.pop(chave, None)
+                else:
+                    estado[chave] = registro
+            yield dict(estado)
+    
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self.passos)
+        if not 0 <= indice < len(self.passos):
+            raise IndexError(indice)
+        for i, estado in enumerate(self):
+            if i == indice:
+                return estado
+
+
+class Instrumentacao:
+    """Contadores do trabalho de rebalanceamento de uma árvore.
+    
+    Ativada com `arvore.instrumentar()`. Acumula rotações, trocas de cor e
+    iterações dos laços de correção, além da profundidade da descida de cada
+    inserção e exclusão. Com um `observador`, chama
+    observador(operacao, valor, profundidade, rotacoes, recoloracoes, iteracoes)
+    ao fim de cada `inserir`, `inserir_ou_atualizar` e `excluir` (e de suas
+    versões animadas), e a cada valor inserido ou removido um a um por
+    `inserir_lote`, `uniao` e `diferenca`, com os números só daquela
+    operação, para relacionar picos de latência com o rebalanceamento que os
+    causou. As correções feitas ao juntar ou dividir subárvores entram nos
+    totais, mas em nenhuma operação.
+    
+    Sem instrumentação (`arvore.instrumentacao is None`), o custo é uma
+    comparação com None por rotação, por iteração de correção e por operação.
+    """
+    __slots__ = ('rotacoes', 'recoloracoes', 'iteracoes', 'operacoes', 'profundidade_total',
+                 'profundidade_maxima', 'observador', '_inicio', '_profundidade')
+    
+    def __init__(self, observador=None):
+        self.observador = observador
+        self.zerar()
+    
+    def zerar(self):
+        """Zera todos os contadores"""
+        self.rotacoes = 0
+        self.recoloracoes = 0
+        self.iteracoes = 0           # iterações dos laços de correção
+        self.operacoes = 0           # inserções e exclusões medidas
+        self.profundidade_total = 0  # nós visitados nas descidas
+        self.profundidade_maxima = 0
+        self._inicio = (0, 0, 0)
+        self._profundidade = 0
+    
+    @property
+    def profundidade_media(self):
+        return self.profundidade_total / self.operacoes if self.operacoes else 0.0
+    
+    def como_dict(self):
+        """Contadores acumulados em um dicionário"""
+        return {
+            'operacoes': self.operacoes,
+            'rotacoes': self.rotacoes,
+            'recoloracoes': self.recoloracoes,
+            'iteracoes': self.iteracoes,
+            'profundidade_media': self.profundidade_media,
+            'profundidade_maxima': self.profundidade_maxima,
+        }
+    
+    def iniciar(self, profundidade):
+        """Marca o fim da descida de uma operação"""
+        self._profundidade = profundidade
+        self._inicio = (self.rotacoes, self.recoloracoes, self.iteracoes)
+    
+    def concluir(self, operacao, valor):
+        """Contabiliza a operação iniciada e avisa o observador"""
+        profundidade = self._profundidade
+        self.operacoes += 1
+        self.profundidade_total += profundidade
+        if profundidade > self.profundidade_maxima:
+            self.profundidade_maxima = profundidade
+        if self.observador is not None:
+            rotacoes, recoloracoes, iteracoes = self._inicio
+            self.observador(operacao, valor, profundidade, self.rotacoes - rotacoes,
+                            self.recoloracoes - recoloracoes, self.iteracoes - iteracoes)
+    
+    def __repr__(self):
+        return (f"Instrumentacao(operacoes={self.operacoes}, rotacoes={self.rotacoes}, "
+                f"recoloracoes={self.recoloracoes}, iteracoes={self.iteracoes}, "
+                f"profundidade_maxima={self.profundidade_maxima})")
+
+
+def _sem_repetidos(valores_ordenados):
+    """Remove repetições consecutivas de uma sequência ordenada"""
+    primeiro = True
+    anterior = None
+    for valor in valores_ordenados:
+        if primeiro or anterior < valor:
+            yield valor
+            anterior = valor
+            primeiro = False
+
+
+class ArvoreRubroNegra:
+    """Árvore Rubro-Negra auto-balanceada com suporte a animações"""
+    
+    # Classe usada para criar os nós; subclasses podem trocar o layout
+    classe_no = No
+    
+    def __init__(self, estrito=False, estatisticas_ordem=True):
+        self.NIL = SENTINELA
+        self.raiz = self.NIL
+        self.tamanho = 0
+        self.estados_animacao = []
+        self.descricoes_animacao = []
+        self._diario = None
+        # Incrementada a cada mutação; invalida quadros de animação antigos
+        self.versao = 0
+        # Modo estrito: duplicatas e valores ausentes levantam exceção
+        # em vez de apenas retornar False
+        self.estrito = estrito
+        # Mantém o tamanho de cada subárvore para selecionar/rank em O(log n)
+        self.estatisticas_ordem = estatisticas_ordem
+        # Altura preta mantida pelas correções de inserção/exclusão e altura
+        # total em cache (None quando uma rotação ou exclusão a invalida)
+        self._altura_preta = 1
+        self._altura_cache = 0
+        # Callable opcional observador(evento, valor) chamado quando uma
+        # operação é rejeitada; a árvore em si nunca escreve no console
+        self.observador = None
+        # Contadores de rebalanceamento (Instrumentacao), None quando desligados
+        self.instrumentacao = None
+    
+    def _rejeitar(self, evento, valor):
+        """Notifica o observador e, no modo estrito, levanta a exceção"""
+        if self.observador is not None:
+            self.observador(evento, valor)
+        if self.estrito:
+            if evento == Evento.DUPLICADO:
+                raise ErroValorDuplicado(valor)
+            raise ErroValorNaoEncontrado(valor)
+    
+    def instrumentar(self, observador=None):
+        """Liga os contadores de rebalanceamento e retorna a Instrumentacao.
+        
+        `arvore.instrumentacao = None` desliga de novo.
+        """
+        self.instrumentacao = Instrumentacao(observador)
+        return self.instrumentacao
+    
+    @classmethod
+    def from_sorted(cls, valores, **opcoes):
+        """Constrói em O(n) uma árvore balanceada a partir de valores em ordem
+        estritamente crescente; levanta ValueError se a ordem não for respeitada.
+        """
+        arvore = cls(**opcoes)
+        nos = []
+        anterior = None
+        for valor in valores:
+            if nos and not anterior < valor:
+                raise ValueError(f"valores fora de ordem ou repetidos: {anterior!r}, {valor!r}")
+            nos.append(arvore.classe_no(valor))
+            anterior = valor
+        arvore._montar_balanceada(nos)
+        return arvore
+    
+    @classmethod
+    def from_iterable(cls, valores, **opcoes):
+        """Constrói a árvore a partir de valores quaisquer (ordena e remove repetidos)"""
+        return cls.from_sorted(_sem_repetidos(sorted(valores)), **opcoes)
+    
+    def salvar(self, caminho):
+        """Grava as chaves em `caminho` no formato binário de `persistencia.py`"""
+        from persistencia import salvar
+        salvar(self, caminho)
+    
+    @classmethod
+    def carregar(cls, caminho, somente_leitura=False, **opcoes):
+        """Lê uma árvore gravada por `salvar`.
+        
+        Por padrão reconstrói a árvore em O(n) com `from_sorted`. Com
+        `somente_leitura=True`, retorna uma `ArvoreMapeada`, que mapeia o
+        arquivo com mmap e responde consultas direto do buffer, sem criar nós.
+        """
+        from persistencia import ArvoreMapeada, ler_chaves
+        if somente_leitura:
+            return ArvoreMapeada(caminho)
+        return cls.from_sorted(ler_chaves(caminho), **opcoes)
+    
+    def inserir_lote(self, valores):
+        """Insere vários valores e retorna quantos eram novos.
+        
+        Se o lote é grande em relação à árvore, os nós existentes são
+        intercalados com o lote ordenado e religados em uma árvore balanceada
+        em O(n + m); caso contrário, cada valor é inserido normalmente.
+        Valores repetidos são ignorados sem notificar o observador.
+        """
+        lote = list(_sem_repetidos(sorted(valores)))
+        m = len(lote)
+        n = self.tamanho
+        
+        if m * (n + m).bit_length() > n + m:
+            nos = self._intercalar_nos(lote)
+            inseridos = len(nos) - n
+            self._montar_balanceada(nos)
+            return inseridos
+        
+        inseridos = 0
+        instrumentacao = self.instrumentacao
+        for valor in lote:
+            no, novo = self._inserir_folha(valor)
+            if novo:
+                self._balancear_insercao(no)
+                inseridos += 1
+            if instrumentacao is not None:
+                instrumentacao.concluir("inserir_lote", valor)
+        return inseridos
+    
+    def _intercalar_nos(self, lote):
+        """Intercala os nós atuais (em ordem) com novos nós para os valores do lote"""
+        nos = []
+        existentes = self._iter_nos_em_ordem()
+        atual = next(existentes, None)
+        for valor in lote:
+            while atual is not None and atual.valor < valor:
+                nos.append(atual)
+                atual = next(existentes, None)
+            if atual is not None and not valor < atual.valor:
+                continue  # já existe: mantém o nó atual
+            nos.append(self.classe_no(valor))
+        while atual is not None:
+            nos.append(atual)
+            atual = next(existentes, None)
+        return nos
+    
+    def _montar_balanceada(self, nos):
+        """Religa os nós (em ordem) como árvore perfeitamente balanceada.
+        
+        Todos os nós são pretos, exceto os do nível mais profundo quando ele
+        está incompleto, que ficam vermelhos: assim toda folha NIL tem a mesma
+        altura preta.
+        """
+        n = len(nos)
+        if n & (n + 1) == 0:
+            profundidade_vermelha = -1  # árvore perfeita: todos pretos
+        else:
+            profundidade_vermelha = n.bit_length() - 1
+        self.raiz = self._montar_balanceada_aux(nos, 0, n, None, 0, profundidade_vermelha)
+        self.tamanho = n
+        self.versao += 1
+        self._altura_cache = n.bit_length()
+        self._altura_preta = self._calcular_altura_preta()
+    
+    def _montar_balanceada_aux(self, nos, inicio, fim, pai, profundidade, profundidade_vermelha):
+        """Liga recursivamente nos[inicio:fim] com o elemento do meio como raiz"""
+        if inicio >= fim:
+            return self.NIL
+        
+        meio = (inicio + fim) // 2
+        no = nos[meio]
+        no.pai = pai
+        no.cor = Cor.VERMELHO if profundidade == profundidade_vermelha else Cor.PRETO
+        no.tamanho = fim - inicio
+        no.esquerda = self._montar_balanceada_aux(nos, inicio, meio, no,
+                                                  profundidade + 1, profundidade_vermelha)
+        no.direita = self._montar_balanceada_aux(nos, meio + 1, fim, no,
+                                                 profundidade + 1, profundidade_vermelha)
+        return no
+    
+    def rotacao_esquerda(self, x, capturar_estado=False):
+        """Realiza rotação à esquerda no nó x"""
+        if self.instrumentacao is not None:
+            self.instrumentacao.rotacoes += 1
+        if capturar_estado:
+            self._capturar_estado(f"Rotação ESQUERDA em nó {x.valor}")
+            self._marcar(x, x.pai, x.direita, x.direita.esquerda)
+        
+        y = x.direita
+        x.direita = y.esquerda
+        
+        if y.esquerda != self.NIL:
+            y.esquerda.pai = x
+        
+        y.pai = x.pai
+        
+        if x.pai is None:
+            self.raiz = y
+        elif x == x.pai.esquerda:
+            x.pai.esquerda = y
+        else:
+            x.pai.direita = y
+        
+        y.esquerda = x
+        x.pai = y
+        self._altura_cache = None
+        
+        if self.estatisticas_ordem:
+            y.tamanho = x.tamanho
+            x.tamanho = x.esquerda.tamanho + x.direita.tamanho + 1
+        
+        if capturar_estado:
+            self._capturar_estado(f"Após rotação esquerda em {x.valor}")
+    
+    def rotacao_direita(self, y, capturar_estado=False):
+        """Realiza rotação à direita no nó y"""
+        if self.instrumentacao is not None:
+            self.instrumentacao.rotacoes += 1
+        if capturar_estado:
+            self._capturar_estado(f"Rotação DIREITA em nó {y.valor}")
+            self._marcar(y, y.pai, y.esquerda, y.esquerda.direita)
+        
+        x = y.esquerda
+        y.esquerda = x.direita
+        
+        if x.direita != self.NIL:
+            x.direita.pai = y
+        
+        x.pai = y.pai
+        
+        if y.pai is None:
+            self.raiz = x
+        elif y == y.pai.direita:
+            y.pai.direita = x
+        else:
+            y.pai.esquerda = x
+        
+        x.direita = y
+        y.pai = x
+        self._altura_cache = None
+        
+        if self.estatisticas_ordem:
+            x.tamanho = y.tamanho
+            y.tamanho = y.esquerda.tamanho + y.direita.tamanho + 1
+        
+        if capturar_estado:
+            self._capturar_estado(f"Após rotação direita em {y.valor}")
+    
+    def inserir(self, valor):
+        """Insere um valor na árvore"""
+        no, novo = self._inserir_folha(valor)
+        if not novo:
+            if self.instrumentacao is not None:
+                self.instrumentacao.concluir("inserir", valor)
+            self._rejeitar(Evento.DUPLICADO, valor)
+            return False
+        
+        self._balancear_insercao(no)
+        if self.instrumentacao is not None:
+            self.instrumentacao.concluir("inserir", valor)
+        return True
+    
+    def inserir_ou_atualizar(self, valor):
+        """Insere o valor ou substitui o valor igual já armazenado.
+        
+        Retorna True se a chave era nova e False se apenas foi atualizada.
+        """
+        no, novo = self._inserir_folha(valor)
+        if not novo:
+            no.valor = valor
+            self.versao += 1
+        else:
+            self._balancear_insercao(no)
+        if self.instrumentacao is not None:
+            self.instrumentacao.concluir("inserir_ou_atualizar", valor)
+        return novo
+    
+    def _inserir_folha(self, valor):
+        """Desce uma única vez da raiz, detectando duplicata e ligando a nova folha.
+        
+        Retorna (nó, novo): o nó existente com novo=False se o valor já está
+        na árvore, ou a folha vermelha recém-ligada com novo=True.
+        """
+        NIL = self.NIL
+        contar = self.estatisticas_ordem
+        pai = None
+        atual = self.raiz
+        a_esquerda = False
+        profundidade = 1
+        
+        # Busca a posição correta para inserir (BST padrão), parando na duplicata.
+        # Os tamanhos do caminho são incrementados na descida e desfeitos se
+        # o valor já existir.
+        while atual is not NIL:
+            pai = atual
+            if valor < atual.valor:
+                atual = atual.esquerda
+                a_esquerda = True
+            elif atual.valor < valor:
+                atual = atual.direita
+                a_esquerda = False
+            else:
+                if contar:
+                    self._descontar_caminho(atual.pai)
+                if self.instrumentacao is not None:
+                    self.instrumentacao.iniciar(profundidade)
+                return atual, False
+            if contar:
+                pai.tamanho += 1
+            profundidade += 1
+        
+        novo_no = self.classe_no(valor)
+        novo_no.esquerda = NIL
+        novo_no.direita = NIL
+        novo_no.pai = pai
+        if self._diario is not None:
+            self._diario.marcar(pai)
+            self._diario.marcar_novo(novo_no)
+        
+        if pai is None:
+            self.raiz = novo_no
+        elif a_esquerda:
+            pai.esquerda = novo_no
+        else:
+            pai.direita = novo_no
+        
+        self.tamanho += 1
+        self.versao += 1
+        # Uma folha nova só pode aumentar a altura; rotações invalidam o cache
+        if self._altura_cache is not None and profundidade > self._altura_cache:
+            self._altura_cache = profundidade
+        if self.instrumentacao is not None:
+            self.instrumentacao.iniciar(profundidade)
+        return novo_no, True
+    
+    def _balancear_insercao(self, novo_no):
+        """Restaura as propriedades após ligar uma nova folha vermelha"""
+        # Se for a raiz, apenas muda para preto
+        if novo_no.pai is None:
+            novo_no.cor = Cor.PRETO
+            self._altura_preta += 1
+            return
+        
+        # Se o avô não existe, não precisa balancear
+        if novo_no.pai.pai is None:
+            return
+        
+        # Corrige a árvore para manter propriedades Rubro-Negra
+        self._corrigir_insercao(novo_no, capturar_estado=False)
+    
+    def _corrigir_insercao(self, no, capturar_estado=False):
+        """Corrige propriedades da árvore após inserção"""
+        instrumentacao = self.instrumentacao
+        while no.pai and no.pai.cor == Cor.VERMELHO:
+            if instrumentacao is not None:
+                instrumentacao.iteracoes += 1
+            if no.pai == no.pai.pai.direita:
+                tio = no.pai.pai.esquerda
+                
+                if tio.cor == Cor.VERMELHO:
+                    # Caso 1: Tio é vermelho - recoloração
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 1: Tio {tio.valor} é VERMELHO - Recoloração")
+                        self._marcar(tio, no.pai, no.pai.pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 3
+                    tio.cor = Cor.PRETO
+                    no.pai.cor = Cor.PRETO
+                    no.pai.pai.cor = Cor.VERMELHO
+                    no = no.pai.pai
+                    if capturar_estado:
+                        self._capturar_estado(f"Recoloração completa")
+                else:
+                    # Caso 2: Tio é preto e nó é filho esquerdo
+                    if no == no.pai.esquerda:
+                        if capturar_estado:
+                            self._capturar_estado(f"Caso 2: Tio é PRETO, nó {no.valor} é filho esquerdo")
+                        no = no.pai
+                        self.rotacao_direita(no, capturar_estado)
+                    
+                    # Caso 3: Tio é preto e nó é filho direito
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 3: Ajustando cores e rotacionando")
+                        self._marcar(no.pai, no.pai.pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 2
+                    no.pai.cor = Cor.PRETO
+                    no.pai.pai.cor = Cor.VERMELHO
+                    self.rotacao_esquerda(no.pai.pai, capturar_estado)
+            else:
+                tio = no.pai.pai.direita
+                
+                if tio.cor == Cor.VERMELHO:
+                    # Caso 1: Tio é vermelho - recoloração
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 1: Tio {tio.valor} é VERMELHO - Recoloração")
+                        self._marcar(tio, no.pai, no.pai.pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 3
+                    tio.cor = Cor.PRETO
+                    no.pai.cor = Cor.PRETO
+                    no.pai.pai.cor = Cor.VERMELHO
+                    no = no.pai.pai
+                    if capturar_estado:
+                        self._capturar_estado(f"Recoloração completa")
+                else:
+                    # Caso 2: Tio é preto e nó é filho direito
+                    if no == no.pai.direita:
+                        if capturar_estado:
+                            self._capturar_estado(f"Caso 2: Tio é PRETO, nó {no.valor} é filho direito")
+                        no = no.pai
+                        self.rotacao_esquerda(no, capturar_estado)
+                    
+                    # Caso 3: Tio é preto e nó é filho esquerdo
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 3: Ajustando cores e rotacionando")
+                        self._marcar(no.pai, no.pai.pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 2
+                    no.pai.cor = Cor.PRETO
+                    no.pai.pai.cor = Cor.VERMELHO
+                    self.rotacao_direita(no.pai.pai, capturar_estado)
+            
+            if no == self.raiz:
+                break
+        
+        # Se o caso 1 subiu até a raiz e a deixou vermelha, enegrecê-la
+        # acrescenta um nó preto a todos os caminhos
+        if self.raiz.cor == Cor.VERMELHO:
+            if capturar_estado:
+                self._marcar(self.raiz)
+            if instrumentacao is not None:
+                instrumentacao.recoloracoes += 1
+            self.raiz.cor = Cor.PRETO
+            self._altura_preta += 1
+        if capturar_estado:
+            self._capturar_estado(f"Garantindo que raiz seja PRETA")
+    
+    def buscar(self, valor):
+        """Busca um valor na árvore (iterativa, sem recursão)"""
+        NIL = self.NIL
+        no = self.raiz
+        while no is not NIL:
+            if valor < no.valor:
+                no = no.esquerda
+            elif no.valor < valor:
+                no = no.direita
+            else:
+                return no
+        return None
+    
+    def buscar_lote(self, valores):
+        """Nó de cada valor (ou None), na ordem da entrada.
+        
+        Lotes pequenos descem da raiz uma vez por valor, em O(m log n). Em
+        lotes grandes (m log n >= 4n) os valores são ordenados e casados com
+        um único percurso em ordem, do teto do menor valor em diante, em
+        O(n + m log m). Aceita listas, iteráveis ou arrays NumPy.
+        """
+        return self._localizar_lote(valores, posicoes=False)[0]
+    
+    def contem_lote(self, valores):
+        """Se cada valor está na árvore; com um array NumPy, retorna um array bool"""
+        nos, numpy = self._localizar_lote(valores, posicoes=False)
+        achados = [no is not None for no in nos]
+        return numpy.array(achados, dtype=bool) if numpy is not None else achados
+    
+    def posicoes_lote(self, valores):
+        """Posição em ordem (rank) de cada valor, ou -1 se ausente.
+        
+        Com um array NumPy na entrada, retorna um array int64. Sem
+        estatísticas de ordem, usa sempre o percurso em ordem.
+        """
+        posicoes, numpy = self._localizar_lote(valores, posicoes=True)
+        return numpy.array(posicoes, dtype=numpy.int64) if numpy is not None else posicoes
+    
+    def _localizar_lote(self, valores, posicoes):
+        """Nós (ou posições) dos valores na ordem da entrada e o módulo numpy, se usado"""
+        numpy = None
+        if hasattr(valores, "dtype") and hasattr(valores, "argsort"):
+            # Quem criou o array já importou o numpy; o núcleo não o importa
+            numpy = sys.modules.get("numpy")
+            chaves = valores.tolist()
+        else:
+            chaves = list(valores)
+        m = len(chaves)
+        n = self.tamanho
+        ausente = -1 if posicoes else None
+        if not m or not n:
+            return [ausente] * m, numpy
+        
+        if m * n.bit_length() < 4 * n and (self.estatisticas_ordem or not posicoes):
+            if posicoes:
+                return [self._posicao(chave) for chave in chaves], numpy
+            buscar = self.buscar
+            return [buscar(chave) for chave in chaves], numpy
+        
+        if numpy is not None:
+            ordem = valores.argsort(kind="stable").tolist()
+        else:
+            ordem = sorted(range(m), key=chaves.__getitem__)
+        ordenadas = [chaves[k] for k in ordem]
+        resultados = [ausente] * m
+        
+        NIL = self.NIL
+        if posicoes and not self.estatisticas_ordem:
+            no, posicao = self._minimo(self.raiz), 0
+        else:
+            no = self._teto_no(ordenadas[0])
+            posicao = self._contar_menores(ordenadas[0], inclusivo=False) if posicoes else 0
+        i = 0
+        while no is not None and i < m:
+            valor = no.valor
+            while i < m and ordenadas[i] < valor:
+                i += 1
+            while i < m and not valor < ordenadas[i]:
+                resultados[ordem[i]] = posicao if posicoes else no
+                i += 1
+            # Sucessor pelos ponteiros de pai, como em _iter_nos_em_ordem
+            if no.direita is not NIL:
+                no = no.direita
+                while no.esquerda is not NIL:
+                    no = no.esquerda
+            else:
+                filho = no
+                no = no.pai
+                while no is not None and filho is no.direita:
+                    filho = no
+                    no = no.pai
+            posicao += 1
+        return resultados, numpy
+    
+    def _posicao(self, valor):
+        """Posição em ordem de valor, ou -1, em uma descida (requer estatísticas)"""
+        NIL = self.NIL
+        no = self.raiz
+        menores = 0
+        while no is not NIL:
+            if valor < no.valor:
+                no = no.esquerda
+            elif no.valor < valor:
+                menores += no.esquerda.tamanho + 1
+                no = no.direita
+            else:
+                return menores + no.esquerda.tamanho
+        return -1
+    
+    def excluir(self, valor):
+        """Remove um valor da árvore"""
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            no = self.buscar(valor)
+        else:
+            no, profundidade = self._buscar_com_profundidade(valor)
+            instrumentacao.iniciar(profundidade)
+        if no is None:
+            if instrumentacao is not None:
+                instrumentacao.concluir("excluir", valor)
+            self._rejeitar(Evento.NAO_ENCONTRADO, valor)
+            return False
+        
+        self._excluir_no(no)
+        self.tamanho -= 1
+        if instrumentacao is not None:
+            instrumentacao.concluir("excluir", valor)
+        return True
+    
+    def _buscar_com_profundidade(self, valor):
+        """Busca que também conta os nós visitados: (nó ou None, profundidade)"""
+        NIL = self.NIL
+        no = self.raiz
+        profundidade = 0
+        while no is not NIL:
+            profundidade += 1
+            if valor < no.valor:
+                no = no.esquerda
+            elif no.valor < valor:
+                no = no.direita
+            else:
+                return no, profundidade
+        return None, profundidade
+    
+    def _excluir_no(self, z):
+        """Remove nó da árvore"""
+        y = z
+        y_cor_original = y.cor
+        
+        self.versao += 1
+        self._altura_cache = None
+        if self.estatisticas_ordem:
+            self._descontar_remocao(z)
+        
+        if z.esquerda == self.NIL:
+            x, x_pai = z.direita, z.pai
+            self._transplantar(z, z.direita)
+        elif z.direita == self.NIL:
+            x, x_pai = z.esquerda, z.pai
+            self._transplantar(z, z.esquerda)
+        else:
+            # Encontra o sucessor (menor nó da subárvore direita)
+            y = self._minimo(z.direita)
+            y_cor_original = y.cor
+            x = y.direita
+            
+            if y.pai == z:
+                x_pai = y
+            else:
+                x_pai = y.pai
+                self._transplantar(y, y.direita)
+                y.direita = z.direita
+                y.direita.pai = y
+            
+            self._transplantar(z, y)
+            y.esquerda = z.esquerda
+            y.esquerda.pai = y
+            y.cor = z.cor
+            y.tamanho = z.tamanho
+        
+        if y_cor_original == Cor.PRETO:
+            self._corrigir_exclusao(x, x_pai, capturar_estado=False)
+    
+    def _descontar_remocao(self, z):
+        """Decrementa os tamanhos das subárvores que perdem um nó ao remover z"""
+        if z.esquerda is not self.NIL and z.direita is not self.NIL:
+            # O sucessor sai da sua posição: descontamos do pai dele até a raiz,
+            # o que inclui z; o sucessor herda depois o tamanho de z
+            self._descontar_caminho(self._minimo(z.direita).pai)
+        else:
+            self._descontar_caminho(z.pai)
+    
+    def _descontar_caminho(self, no):
+        """Decrementa o tamanho de no e de todos os seus ancestrais"""
+        while no is not None:
+            no.tamanho -= 1
+            no = no.pai
+    
+    def _corrigir_exclusao(self, x, pai, capturar_estado=False):
+        """Corrige propriedades da árvore após exclusão.
+        
+        `pai` é o pai de x, guardado à parte: x pode ser a sentinela NIL,
+        que é compartilhada e nunca recebe pai.
+        """
+        absorvido = False  # o caso 4 resolve o preto extra sem mudar a altura preta
+        instrumentacao = self.instrumentacao
+        while x is not self.raiz and x.cor == Cor.PRETO:
+            if instrumentacao is not None:
+                instrumentacao.iteracoes += 1
+            if x is pai.esquerda:
+                irmao = pai.direita
+                
+                # Caso 1: Irmão é vermelho
+                if irmao.cor == Cor.VERMELHO:
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 1 Exclusão: Irmão {irmao.valor} é VERMELHO")
+                        self._marcar(irmao, pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 2
+                    irmao.cor = Cor.PRETO
+                    pai.cor = Cor.VERMELHO
+                    self.rotacao_esquerda(pai, capturar_estado)
+                    irmao = pai.direita
+                
+                # Caso 2: Irmão é preto e ambos os filhos do irmão são pretos
+                if irmao.esquerda.cor == Cor.PRETO and irmao.direita.cor == Cor.PRETO:
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 2 Exclusão: Irmão e filhos são PRETOS")
+                        self._marcar(irmao)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 1
+                    irmao.cor = Cor.VERMELHO
+                    x = pai
+                    pai = x.pai
+                    if capturar_estado:
+                        self._capturar_estado(f"Recolorindo irmão para VERMELHO")
+                else:
+                    # Caso 3: Irmão é preto, filho esquerdo é vermelho e direito é preto
+                    if irmao.direita.cor == Cor.PRETO:
+                        if capturar_estado:
+                            self._capturar_estado(f"Caso 3 Exclusão: Preparando rotação")
+                            self._marcar(irmao, irmao.esquerda, irmao.direita)
+                        if instrumentacao is not None:
+                            instrumentacao.recoloracoes += 2
+                        irmao.esquerda.cor = Cor.PRETO
+                        irmao.cor = Cor.VERMELHO
+                        self.rotacao_direita(irmao, capturar_estado)
+                        irmao = pai.direita
+                    
+                    # Caso 4: Irmão é preto e filho direito é vermelho
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 4 Exclusão: Ajuste final")
+                        self._marcar(irmao, pai, irmao.esquerda, irmao.direita)
+                    if instrumentacao is not None:
+                        # Irmão e pai só trocam de cor se o pai era vermelho
+                        instrumentacao.recoloracoes += 3 if pai.cor == Cor.VERMELHO else 1
+                    irmao.cor = pai.cor
+                    pai.cor = Cor.PRETO
+                    irmao.direita.cor = Cor.PRETO
+                    self.rotacao_esquerda(pai, capturar_estado)
+                    x = self.raiz
+                    absorvido = True
+            else:
+                irmao = pai.esquerda
+                
+                if irmao.cor == Cor.VERMELHO:
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 1 Exclusão: Irmão {irmao.valor} é VERMELHO")
+                        self._marcar(irmao, pai)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 2
+                    irmao.cor = Cor.PRETO
+                    pai.cor = Cor.VERMELHO
+                    self.rotacao_direita(pai, capturar_estado)
+                    irmao = pai.esquerda
+                
+                if irmao.direita.cor == Cor.PRETO and irmao.esquerda.cor == Cor.PRETO:
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 2 Exclusão: Irmão e filhos são PRETOS")
+                        self._marcar(irmao)
+                    if instrumentacao is not None:
+                        instrumentacao.recoloracoes += 1
+                    irmao.cor = Cor.VERMELHO
+                    x = pai
+                    pai = x.pai
+                    if capturar_estado:
+                        self._capturar_estado(f"Recolorindo irmão para VERMELHO")
+                else:
+                    if irmao.esquerda.cor == Cor.PRETO:
+                        if capturar_estado:
+                            self._capturar_estado(f"Caso 3 Exclusão: Preparando rotação")
+                            self._marcar(irmao, irmao.esquerda, irmao.direita)
+                        if instrumentacao is not None:
+                            instrumentacao.recoloracoes += 2
+                        irmao.direita.cor = Cor.PRETO
+                        irmao.cor = Cor.VERMELHO
+                        self.rotacao_esquerda(irmao, capturar_estado)
+                        irmao = pai.esquerda
+                    
+                    if capturar_estado:
+                        self._capturar_estado(f"Caso 4 Exclusão: Ajuste final")
+                        self._marcar(irmao, pai, irmao.esquerda, irmao.direita)
+                    if instrumentacao is not None:
+                        # Irmão e pai só trocam de cor se o pai era vermelho
+                        instrumentacao.recoloracoes += 3 if pai.cor == Cor.VERMELHO else 1
+                    irmao.cor = pai.cor
+                    pai.cor = Cor.PRETO
+                    irmao.esquerda.cor = Cor.PRETO
+                    self.rotacao_direita(pai, capturar_estado)
+                    x = self.raiz
+                    absorvido = True
+        
+        # O preto extra chegou a uma raiz preta: todos os caminhos perderam um
+        if x is self.raiz and x.cor == Cor.PRETO and not absorvido:
+            self._altura_preta -= 1
+        if capturar_estado:
+            self._marcar(x)
+        if x.cor == Cor.VERMELHO:
+            if instrumentacao is not None:
+                instrumentacao.recoloracoes += 1
+            x.cor = Cor.PRETO
+        if capturar_estado:
+            self._capturar_estado(f"Garantindo propriedades finais")
+    
+    def _transplantar(self, u, v):
+        """Substitui subárvore u por v"""
+        if u.pai is None:
+            self.raiz = v
+        elif u == u.pai.esquerda:
+            u.pai.esquerda = v
+        else:
+            u.pai.direita = v
+        if v is not self.NIL:
+            v.pai = u.pai
+    
+    def _minimo(self, no):
+        """Encontra valor mínimo na subárvore"""
+        while no.esquerda != self.NIL:
+            no = no.esquerda
+        return no
+    
+    def _maximo(self, no):
+        """Encontra valor máximo na subárvore"""
+        while no.direita != self.NIL:
+            no = no.direita
+        return no
+    
+    def _sucessor_no(self, no):
+        """Próximo nó em ordem, subindo pelos ponteiros de pai se preciso"""
+        if no.direita is not self.NIL:
+            return self._minimo(no.direita)
+        pai = no.pai
+        while pai is not None and no is pai.direita:
+            no = pai
+            pai = pai.pai
+        return pai
+    
+    def _antecessor_no(self, no):
+        """Nó anterior em ordem, subindo pelos ponteiros de pai se preciso"""
+        if no.esquerda is not self.NIL:
+            return self._maximo(no.esquerda)
+        pai = no.pai
+        while pai is not None and no is pai.esquerda:
+            no = pai
+            pai = pai.pai
+        return pai
+    
+    def _teto_no(self, valor, estrito=False):
+        """Menor nó com valor >= valor (> valor se estrito), ou None"""
+        NIL = self.NIL
+        no = self.raiz
+        candidato = None
+        while no is not NIL:
+            if valor < no.valor or (not estrito and not no.valor < valor):
+                candidato = no
+                no = no.esquerda
+            else:
+                no = no.direita
+        return candidato
+    
+    def _piso_no(self, valor, estrito=False):
+        """Maior nó com valor <= valor (< valor se estrito), ou None"""
+        NIL = self.NIL
+        no = self.raiz
+        candidato = None
+        while no is not NIL:
+            if no.valor < valor or (not estrito and not valor < no.valor):
+                candidato = no
+                no = no.direita
+            else:
+                no = no.esquerda
+        return candidato
+    
+    def minimo(self):
+        """Retorna o menor valor da árvore, ou None se vazia"""
+        return self._minimo(self.raiz).valor if self.raiz is not self.NIL else None
+    
+    def maximo(self):
+        """Retorna o maior valor da árvore, ou None se vazia"""
+        return self._maximo(self.raiz).valor if self.raiz is not self.NIL else None
+    
+    def piso(self, valor):
+        """Maior valor da árvore <= valor, ou None"""
+        no = self._piso_no(valor)
+        return no.valor if no is not None else None
+    
+    def teto(self, valor):
+        """Menor valor da árvore >= valor, ou None"""
+        no = self._teto_no(valor)
+        return no.valor if no is not None else None
+    
+    def sucessor(self, valor):
+        """Menor valor da árvore estritamente maior que valor, ou None"""
+        no = self._teto_no(valor, estrito=True)
+        return no.valor if no is not None else None
+    
+    def antecessor(self, valor):
+        """Maior valor da árvore estritamente menor que valor, ou None"""
+        no = self._piso_no(valor, estrito=True)
+        return no.valor if no is not None else None
+    
+    def intervalo(self, a, b):
+        """Gera em ordem os valores v com a <= v <= b, em O(log n + k)"""
+        NIL = self.NIL
+        no = self._teto_no(a)
+        while no is not None and not b < no.valor:
+            yield no.valor
+            # Sucessor inline: evita uma chamada de método por valor
+            if no.direita is not NIL:
+                no = no.direita
+                while no.esquerda is not NIL:
+                    no = no.esquerda
+            else:
+                filho = no
+                no = no.pai
+                while no is not None and filho is no.direita:
+                    filho = no
+                    no = no.pai
+    
+    def cursor(self, valor=None):
+        """Cria um cursor no menor valor >= valor (ou no mínimo, se valor é None)"""
+        if valor is None:
+            no = self._minimo(self.raiz) if self.raiz is not self.NIL else None
+        else:
+            no = self._teto_no(valor)
+        return Cursor(self, no, depois_do_fim=no is None)
+    
+    def _exigir_estatisticas(self):
+        if not self.estatisticas_ordem:
+            raise ErroArvore("estatísticas de ordem desativadas nesta árvore")
+    
+    def selecionar(self, k):
+        """Retorna o k-ésimo menor valor (k começa em 0; negativos contam do fim)"""
+        self._exigir_estatisticas()
+        if k < 0:
+            k += self.tamanho
+        if not 0 <= k < self.tamanho:
+            raise IndexError(f"posição {k} fora da árvore de {self.tamanho} nós")
+        
+        no = self.raiz
+        while True:
+            tamanho_esquerda = no.esquerda.tamanho
+            if k < tamanho_esquerda:
+                no = no.esquerda
+            elif k == tamanho_esquerda:
+                return no.valor
+            else:
+                k -= tamanho_esquerda + 1
+                no = no.direita
+    
+    def rank(self, valor):
+        """Retorna quantos valores da árvore são menores que valor"""
+        self._exigir_estatisticas()
+        return self._contar_menores(valor, inclusivo=False)
+    
+    def contar_intervalo(self, a, b):
+        """Retorna quantos valores v da árvore satisfazem a <= v <= b"""
+        self._exigir_estatisticas()
+        if b < a:
+            return 0
+        return self._contar_menores(b, inclusivo=True) - self._contar_menores(a, inclusivo=False)
+    
+    def _contar_menores(self, valor, inclusivo):
+        """Conta valores < valor (ou <= valor, se inclusivo) em uma descida"""
+        NIL = self.NIL
+        no = self.raiz
+        total = 0
+        while no is not NIL:
+            if valor < no.valor:
+                no = no.esquerda
+            elif no.valor < valor:
+                total += no.esquerda.tamanho + 1
+                no = no.direita
+            else:
+                return total + no.esquerda.tamanho + (1 if inclusivo else 0)
+        return total
+    
+    def juntar(self, valor, outra):
+        """Junta esta árvore, `valor` e `outra` em O(log n), usando a altura preta.
+        
+        Exige que os valores desta árvore sejam menores que `valor` e os de
+        `outra` maiores (ValueError caso contrário). O resultado fica nesta
+        árvore, que é retornada; `outra` fica vazia.
+        """
+        self._preparar_combinacao(outra)
+        if (self.raiz is not self.NIL and not self.maximo() < valor) or (
+                outra.raiz is not outra.NIL and not valor < outra.minimo()):
+            raise ValueError(f"juntar exige esta árvore < {valor!r} < outra")
+        self._assumir(*self._juntar_raizes(self.raiz, self._altura_preta, self.classe_no(valor),
+                                           outra.raiz, outra._altura_preta))
+        outra._esvaziar()
+        return self
+    
+    def concatenar(self, outra):
+        """Acrescenta `outra`, cujos valores são todos maiores, em O(log n); retorna esta árvore"""
+        self._preparar_combinacao(outra)
+        if (self.raiz is not self.NIL and outra.raiz is not outra.NIL
+                and not self.maximo() < outra.minimo()):
+            raise ValueError("concatenar exige que todos os valores de outra sejam maiores")
+        self._assumir(*self._concatenar_raizes(self.raiz, self._altura_preta,
+                                               outra.raiz, outra._altura_preta))
+        outra._esvaziar()
+        return self
+    
+    def dividir(self, valor):
+        """Separa a árvore em (menores, encontrado, maiores) em O(log n).
+        
+        `menores` e `maiores` são árvores novas com os valores < e > `valor`;
+        `encontrado` diz se `valor` estava na árvore. Esta árvore fica vazia.
+        """
+        self._exigir_estatisticas()
+        menor, h_menor, no, maior, h_maior = self._dividir_raiz(self.raiz, self._altura_preta, valor)
+        menores = self._parte(menor, h_menor)
+        maiores = self._parte(maior, h_maior)
+        self._esvaziar()
+        return menores, no is not None, maiores
+    
+    def uniao(self, outra):
+        """Guarda nesta árvore os valores das duas e esvazia `outra`.
+        
+        Custa O(m log(n/m + 1)), com m o tamanho da menor árvore. Para valores
+        presentes nas duas, fica o desta árvore. Retorna esta árvore.
+        """
+        self._preparar_combinacao(outra)
+        n, m = self.tamanho, outra.tamanho
+        if m * m <= n:
+            # Poucos valores: inserir um a um custa O(m log n), dentro do limite
+            instrumentacao = self.instrumentacao
+            for valor in outra.iter_em_ordem():
+                no, novo = self._inserir_folha(valor)
+                if novo:
+                    self._balancear_insercao(no)
+                if instrumentacao is not None:
+                    instrumentacao.concluir("uniao", valor)
+        elif n * n <= m:
+            instrumentacao = outra.instrumentacao
+            for valor in self.iter_em_ordem():
+                no, novo = outra._inserir_folha(valor)
+                if novo:
+                    outra._balancear_insercao(no)
+                else:
+                    no.valor = valor
+                if instrumentacao is not None:
+                    instrumentacao.concluir("uniao", valor)
+            self._assumir(outra.raiz, outra._altura_preta)
+        else:
+            self._assumir(*self._uniao_raizes(self.raiz, self._altura_preta,
+                                              outra.raiz, outra._altura_preta))
+        outra._esvaziar()
+        return self
+    
+    def intersecao(self, outra):
+        """Mantém nesta árvore só os valores também presentes em `outra`, que fica vazia"""
+        self._preparar_combinacao(outra)
+        n, m = self.tamanho, outra.tamanho
+        if m * m <= n or n * n <= m:
+            # Percorre a menor e busca na maior: O(min log max)
+            if m <= n:
+                comuns = [no.valor for no in map(self.buscar, outra.iter_em_ordem()) if no is not None]
+            else:
+                comuns = [valor for valor in self.iter_em_ordem() if outra.buscar(valor) is not None]
+            self._montar_balanceada([self.classe_no(valor) for valor in comuns])
+        else:
+            self._assumir(*self._intersecao_raizes(self.raiz, self._altura_preta,
+                                                   outra.raiz, outra._altura_preta))
+        outra._esvaziar()
+        return self
+    
+    def diferenca(self, outra):
+        """Remove desta árvore os valores presentes em `outra`, que fica vazia"""
+        self._preparar_combinacao(outra)
+        n, m = self.tamanho, outra.tamanho
+        if m * m <= n:
+            instrumentacao = self.instrumentacao
+            for valor in outra.iter_em_ordem():
+                if instrumentacao is None:
+                    no = self.buscar(valor)
+                else:
+                    no, profundidade = self._buscar_com_profundidade(valor)
+                    instrumentacao.iniciar(profundidade)
+                if no is not None:
+                    self._excluir_no(no)
+                    self.tamanho -= 1
+                if instrumentacao is not None:
+                    instrumentacao.concluir("diferenca", valor)
+        elif n * n <= m:
+            self._montar_balanceada([no for no in self._iter_nos_em_ordem()
+                                     if outra.buscar(no.valor) is None])
+        else:
+            self._assumir(*self._diferenca_raizes(self.raiz, self._altura_preta,
+                                                  outra.raiz, outra._altura_preta))
+        outra._esvaziar()
+        return self
+    
+    def _preparar_combinacao(self, outra):
+        """Exige estatísticas de ordem e faz as duas árvores usarem a mesma sentinela.
+        
+        Toda árvore nasce com `SENTINELA`, então normalmente não há nada a
+        fazer. Só uma árvore com sentinela própria (atribuída à mão) tem as
+        folhas religadas, em O(menor), antes da combinação.
+        """
+        self._exigir_estatisticas()
+        outra._exigir_estatisticas()
+        if outra is self:
+            raise ValueError("a operação precisa de duas árvores diferentes")
+        if outra.NIL is self.NIL:
+            return
+        menor, maior = (self, outra) if self.tamanho <= outra.tamanho else (outra, self)
+        menor._religar_sentinela(maior.NIL)
+    
+    def _religar_sentinela(self, NIL):
+        """Troca a sentinela desta árvore por `NIL` em todas as folhas"""
+        antiga = self.NIL
+        pilha = [self.raiz] if self.raiz is not antiga else []
+        while pilha:
+            no = pilha.pop()
+            if no.esquerda is antiga:
+                no.esquerda = NIL
+            else:
+                pilha.append(no.esquerda)
+            if no.direita is antiga:
+                no.direita = NIL
+            else:
+                pilha.append(no.direita)
+        if self.raiz is antiga:
+            self.raiz = NIL
+        self.NIL = NIL
+    
+    def _assumir(self, raiz, altura_preta):
+        """Passa a ter `raiz` (de uma árvore com a mesma sentinela) como raiz"""
+        self.raiz = raiz
+        self.tamanho = raiz.tamanho
+        self._altura_preta = altura_preta
+        self._altura_cache = None
+        self.versao += 1
+    
+    def _nova_vazia(self):
+        """Árvore vazia com as mesmas opções, observador e instrumentação.
+        
+        Subclasses cujo construtor exige outros argumentos a sobrescrevem.
+        """
+        vazia = type(self)(estrito=self.estrito, estatisticas_ordem=self.estatisticas_ordem)
+        vazia.observador = self.observador
+        vazia.instrumentacao = self.instrumentacao
+        return vazia
+    
+    def _parte(self, raiz, altura_preta):
+        """Árvore nova com a subárvore `raiz`, sem copiar nós e com a mesma sentinela"""
+        parte = self._nova_vazia()
+        parte.NIL = self.NIL
+        parte._assumir(raiz, altura_preta)
+        return parte
+    
+    def _esvaziar(self):
+        """Deixa a árvore vazia, com a sentinela compartilhada"""
+        self.NIL = SENTINELA
+        self.raiz = self.NIL
+        self.tamanho = 0
+        self._altura_preta = 1
+        self._altura_cache = 0
+        self.versao += 1
+    
+    # As rotinas *_raizes trabalham com subárvores soltas, dadas por (raiz,
+    # altura preta): a raiz é sempre preta e tem pai None. A árvore serve só
+    # de contexto (sentinela, rotações e correções), e seus campos raiz,
+    # tamanho e altura preta são usados como rascunho.
+    
+    def _soltar(self, no, altura_preta):
+        """Desliga `no` do pai e o pinta de preto; retorna (no, altura preta)"""
+        if no is self.NIL:
+            return no, 1
+        no.pai = None
+        if no.cor == Cor.VERMELHO:
+            no.cor = Cor.PRETO
+            altura_preta += 1
+        return no, altura_preta
+    
+    def _juntar_raizes(self, esquerda, h_esquerda, no, direita, h_direita):
+        """Liga a subárvore `esquerda`, o nó solto `no` e a subárvore `direita`.
+        
+        Com alturas pretas iguais, `no` vira a raiz preta. Senão, desce pela
+        borda da subárvore mais alta até um nó preto com a altura preta da
+        mais baixa, pendura ali `no` vermelho com a mais baixa como filho e
+        corrige com a mesma rotina da inserção. Retorna (raiz, altura preta).
+        """
+        NIL = self.NIL
+        no.pai = None
+        if h_esquerda == h_direita:
+            no.esquerda, no.direita = esquerda, direita
+            no.cor = Cor.PRETO
+            raiz, altura_preta = no, h_esquerda + 1
+        elif h_esquerda > h_direita:
+            # Desce pela borda direita da esquerda
+            acrescimo = direita.tamanho + 1
+            pai, c, h = None, esquerda, h_esquerda
+            while not (c.cor == Cor.PRETO and h == h_direita):
+                if c.cor == Cor.PRETO:
+                    h -= 1
+                c.tamanho += acrescimo
+                pai, c = c, c.direita
+            no.esquerda, no.direita, no.pai = c, direita, pai
+            pai.direita = no
+            raiz, altura_preta = esquerda, h_esquerda
+        else:
+            # Desce pela borda esquerda da direita
+            acrescimo = esquerda.tamanho + 1
+            pai, c, h = None, direita, h_direita
+            while not (c.cor == Cor.PRETO and h == h_esquerda):
+                if c.cor == Cor.PRETO:
+                    h -= 1
+                c.tamanho += acrescimo
+                pai, c = c, c.esquerda
+            no.esquerda, no.direita, no.pai = esquerda, c, pai
+            pai.esquerda = no
+            raiz, altura_preta = direita, h_direita
+        
+        if no.esquerda is not NIL:
+            no.esquerda.pai = no
+        if no.direita is not NIL:
+            no.direita.pai = no
+        no.tamanho = no.esquerda.tamanho + no.direita.tamanho + 1
+        if no.pai is not None:
+            no.cor = Cor.VERMELHO
+            if no.pai.cor == Cor.VERMELHO:
+                self.raiz, self._altura_preta = raiz, altura_preta
+                self._corrigir_insercao(no)
+                raiz, altura_preta = self.raiz, self._altura_preta
+        return raiz, altura_preta
+    
+    def _concatenar_raizes(self, esquerda, h_esquerda, direita, h_direita):
+        """Junta sem valor do meio: o mínimo da direita é retirado e faz esse papel"""
+        if direita is self.NIL:
+            return esquerda, h_esquerda
+        self.raiz, self._altura_preta = direita, h_direita
+        no = self._minimo(direita)
+        self._excluir_no(no)
+        return self._juntar_raizes(esquerda, h_esquerda, no, self.raiz, self._altura_preta)
+    
+    def _dividir_raiz(self, raiz, altura_preta, valor):
+        """Retorna (menores, h, nó de `valor` ou None, maiores, h) como subárvores soltas"""
+        NIL = self.NIL
+        if raiz is NIL:
+            return NIL, 1, None, NIL, 1
+        esquerda, h_esquerda = self._soltar(raiz.esquerda, altura_preta - 1)
+        direita, h_direita = self._soltar(raiz.direita, altura_preta - 1)
+        if valor < raiz.valor:
+            menor, h_menor, no, maior, h_maior = self._dividir_raiz(esquerda, h_esquerda, valor)
+            maior, h_maior = self._juntar_raizes(maior, h_maior, raiz, direita, h_direita)
+            return menor, h_menor, no, maior, h_maior
+        if raiz.valor < valor:
+            menor, h_menor, no, maior, h_maior = self._dividir_raiz(direita, h_direita, valor)
+            menor, h_menor = self._juntar_raizes(esquerda, h_esquerda, raiz, menor, h_menor)
+            return menor, h_menor, no, maior, h_maior
+        return esquerda, h_esquerda, raiz, direita, h_direita
+    
+    def _uniao_raizes(self, a, h_a, b, h_b):
+        """União de duas subárvores soltas (algoritmo de Blelloch et al. sobre juntar)"""
+        NIL = self.NIL
+        if a is NIL:
+            return b, h_b
+        if b is NIL:
+            return a, h_a
+        esquerda_a, h_esquerda_a = self._soltar(a.esquerda, h_a - 1)
+        direita_a, h_direita_a = self._soltar(a.direita, h_a - 1)
+        esquerda_b, h_esquerda_b, _, direita_b, h_direita_b = self._dividir_raiz(b, h_b, a.valor)
+        esquerda, h_esquerda = self._uniao_raizes(esquerda_a, h_esquerda_a, esquerda_b, h_esquerda_b)
+        direita, h_direita = self._uniao_raizes(direita_a, h_direita_a, direita_b, h_direita_b)
+        return self._juntar_raizes(esquerda, h_esquerda, a, direita, h_direita)
+    
+    def _intersecao_raizes(self, a, h_a, b, h_b):
+        """Valores de `a` também presentes em `b`, como subárvore solta"""
+        NIL = self.NIL
+        if a is NIL or b is NIL:
+            return NIL, 1
+        esquerda_a, h_esquerda_a = self._soltar(a.esquerda, h_a - 1)
+        direita_a, h_direita_a = self._soltar(a.direita, h_a - 1)
+        esquerda_b, h_esquerda_b, no, direita_b, h_direita_b = self._dividir_raiz(b, h_b, a.valor)
+        esquerda, h_esquerda = self._intersecao_raizes(esquerda_a, h_esquerda_a, esquerda_b, h_esquerda_b)
+        direita, h_direita = self._intersecao_raizes(direita_a, h_direita_a, direita_b, h_direita_b)
+        if no is not None:
+            return self._juntar_raizes(esquerda, h_esquerda, a, direita, h_direita)
+        return self._concatenar_raizes(esquerda, h_esquerda, direita, h_direita)
+    
+    def _diferenca_raizes(self, a, h_a, b, h_b):
+        """Valores de `a` ausentes de `b`, como subárvore solta"""
+        NIL = self.NIL
+        if a is NIL or b is NIL:
+            return a, h_a
+        esquerda_b, h_esquerda_b = self._soltar(b.esquerda, h_b - 1)
+        direita_b, h_direita_b = self._soltar(b.direita, h_b - 1)
+        esquerda_a, h_esquerda_a, _, direita_a, h_direita_a = self._dividir_raiz(a, h_a, b.valor)
+        esquerda, h_esquerda = self._diferenca_raizes(esquerda_a, h_esquerda_a, esquerda_b, h_esquerda_b)
+        direita, h_direita = self._diferenca_raizes(direita_a, h_direita_a, direita_b, h_direita_b)
+        return self._concatenar_raizes(esquerda, h_esquerda, direita, h_direita)
+    
+    def em_ordem(self):
+        """Percurso em ordem"""
+        return list(self.iter_em_ordem())
+    
+    def iter_em_ordem(self):
+        """Gera os valores em ordem seguindo ponteiros de pai (memória O(1))"""
+        NIL = self.NIL
+        no = self.raiz
+        if no is NIL:
+            return
+        while no.esquerda is not NIL:
+            no = no.esquerda
+        while no is not None:
+            yield no.valor
+            if no.direita is not NIL:
+                no = no.direita
+                while no.esquerda is not NIL:
+                    no = no.esquerda
+            else:
+                filho = no
+                no = no.pai
+                while no is not None and filho is no.direita:
+                    filho = no
+                    no = no.pai
+    
+    def _iter_nos_em_ordem(self):
+        """Gera os nós (não os valores) em ordem seguindo ponteiros de pai"""
+        NIL = self.NIL
+        no = self.raiz
+        if no is NIL:
+            return
+        while no.esquerda is not NIL:
+            no = no.esquerda
+        while no is not None:
+            # Calcula o sucessor antes de entregar o nó, que pode ser religado
+            if no.direita is not NIL:
+                proximo = no.direita
+                while proximo.esquerda is not NIL:
+                    proximo = proximo.esquerda
+            else:
+                filho = no
+                proximo = no.pai
+                while proximo is not None and filho is proximo.direita:
+                    filho = proximo
+                    proximo = proximo.pai
+            yield no
+            no = proximo
+    
+    def iter_ordem_reversa(self):
+        """Gera os valores em ordem decrescente seguindo ponteiros de pai"""
+        NIL = self.NIL
+        no = self.raiz
+        if no is NIL:
+            return
+        while no.direita is not NIL:
+            no = no.direita
+        while no is not None:
+            yield no.valor
+            if no.esquerda is not NIL:
+                no = no.esquerda
+                while no.direita is not NIL:
+                    no = no.direita
+            else:
+                filho = no
+                no = no.pai
+                while no is not None and filho is no.esquerda:
+                    filho = no
+                    no = no.pai
+    
+    def pre_ordem(self):
+        """Percurso em pré-ordem"""
+        return list(self.iter_pre_ordem())
+    
+    def iter_pre_ordem(self):
+        """Gera os valores em pré-ordem usando pilha explícita"""
+        NIL = self.NIL
+        if self.raiz is NIL:
+            return
+        pilha = [self.raiz]
+        while pilha:
+            no = pilha.pop()
+            yield no.valor
+            if no.direita is not NIL:
+                pilha.append(no.direita)
+            if no.esquerda is not NIL:
+                pilha.append(no.esquerda)
+    
+    def pos_ordem(self):
+        """Percurso em pós-ordem"""
+        return list(self.iter_pos_ordem())
+    
+    def iter_pos_ordem(self):
+        """Gera os valores em pós-ordem usando pilha explícita"""
+        NIL = self.NIL
+        pilha = []
+        no = self.raiz
+        ultimo = None
+        while pilha or no is not NIL:
+            if no is not NIL:
+                pilha.append(no)
+                no = no.esquerda
+            else:
+                topo = pilha[-1]
+                if topo.direita is not NIL and ultimo is not topo.direita:
+                    no = topo.direita
+                else:
+                    yield topo.valor
+                    ultimo = pilha.pop()
+    
+    def altura(self):
+        """Retorna altura da árvore, recalculando só se o cache foi invalidado"""
+        if self._altura_cache is None:
+            self._altura_cache = self._calcular_altura()
+        return self._altura_cache
+    
+    def _calcular_altura(self):
+        """Calcula altura da árvore (percurso por níveis, sem recursão)"""
+        NIL = self.NIL
+        if self.raiz is NIL:
+            return 0
+        altura = 0
+        nivel = [self.raiz]
+        while nivel:
+            altura += 1
+            proximo = []
+            for no in nivel:
+                if no.esquerda is not NIL:
+                    proximo.append(no.esquerda)
+                if no.direita is not NIL:
+                    proximo.append(no.direita)
+            nivel = proximo
+        return altura
+    
+    def altura_preta(self):
+        """Retorna altura preta da árvore (conta a folha NIL) em O(1)"""
+        return self._altura_preta
+    
+    def _calcular_altura_preta(self):
+        """Calcula altura preta descendo pelo caminho mais à esquerda"""
+        NIL = self.NIL
+        altura = 1
+        no = self.raiz
+        while no is not NIL:
+            if no.cor == Cor.PRETO:
+                altura += 1
+            no = no.esquerda
+        return altura
+    
+    def validar(self):
+        """Confere todas as propriedades em uma só passada iterativa, em O(n).
+        
+        Verifica ordem dos valores, raiz e sentinela pretas, ausência de
+        vermelhos consecutivos, altura preta uniforme (e igual à mantida pela
+        árvore), ponteiros de pai, `tamanho` de cada nó e a contagem total.
+        Retorna True ou levanta ErroInvariante descrevendo a primeira violação.
+        Não usa recursão, então funciona em árvores de qualquer profundidade,
+        inclusive corrompidas (ciclos são detectados pelos ponteiros de pai).
+        """
+        for _ in self._validar_em_etapas(None):
+            pass
+        return True
+    
+    def validar_em_etapas(self, passo=1024):
+        """Mesma verificação de `validar`, pausando a cada `passo` nós.
+        
+        É um gerador: cada `next` confere mais `passo` nós e retorna quantos
+        já foram conferidos. Entre uma etapa e outra a árvore pode ser usada
+        (com `ArvoreConcorrente`, cada etapa segura a trava de leitura só
+        durante aquele trecho). Se a
+        árvore mudar no meio, a etapa seguinte levanta ErroArvore e a
+        verificação deve recomeçar.
+        """
+        if passo < 1:
+            raise ValueError("passo deve ser pelo menos 1")
+        return self._validar_em_etapas(passo)
+    
+    def _validar_em_etapas(self, passo):
+        """Percurso em ordem com pilha explícita, conferindo cada nó uma vez"""
+        NIL = self.NIL
+        versao = self.versao
+        contar = self.estatisticas_ordem
+        if NIL.cor != Cor.PRETO:
+            raise ErroInvariante("a sentinela NIL não é preta")
+        if contar and NIL.tamanho != 0:
+            raise ErroInvariante(f"a sentinela NIL tem tamanho {NIL.tamanho}")
+        raiz = self.raiz
+        if raiz is not NIL:
+            if raiz.pai is not None:
+                raise ErroInvariante(f"a raiz {raiz.valor!r} tem pai")
+            if raiz.cor != Cor.PRETO:
+                raise ErroInvariante(f"a raiz {raiz.valor!r} não é preta")
+        
+        altura_preta = None
+        anterior = None
+        visitados = 0
+        conferidos = 0  # nós já retirados da pilha, em ordem
+        pilha = []
+        no, pretos = raiz, 0
+        while True:
+            while no is not NIL:
+                if no.cor == Cor.PRETO:
+                    pretos += 1
+                elif no.cor != Cor.VERMELHO:
+                    raise ErroInvariante(f"nó {no.valor!r} com cor inválida {no.cor!r}")
+                elif no.esquerda.cor == Cor.VERMELHO or no.direita.cor == Cor.VERMELHO:
+                    raise ErroInvariante(f"nó vermelho {no.valor!r} com filho vermelho")
+                if no.esquerda is not NIL and no.esquerda.pai is not no:
+                    raise ErroInvariante(f"filho esquerdo de {no.valor!r} aponta para outro pai")
+                if no.direita is not NIL and no.direita.pai is not no:
+                    raise ErroInvariante(f"filho direito de {no.valor!r} aponta para outro pai")
+                if contar and no.tamanho != no.esquerda.tamanho + no.direita.tamanho + 1:
+                    raise ErroInvariante(f"nó {no.valor!r} com tamanho {no.tamanho}, esperado "
+                                         f"{no.esquerda.tamanho + no.direita.tamanho + 1}")
+                visitados += 1
+                if visitados > self.tamanho:
+                    raise ErroInvariante(f"mais nós alcançáveis que o tamanho {self.tamanho}")
+                pilha.append((no, pretos))
+                no = no.esquerda
+            
+            # Chegou a uma folha NIL: o caminho até ela conta a própria folha
+            if altura_preta is None:
+                altura_preta = pretos + 1
+            elif pretos + 1 != altura_preta:
+                raise ErroInvariante(f"caminhos com alturas pretas {altura_preta} e {pretos + 1}")
+            if not pilha:
+                break
+            
+            no, pretos = pilha.pop()
+            if anterior is not None and not anterior.valor < no.valor:
+                raise ErroInvariante(f"valores fora de ordem: {anterior.valor!r}, {no.valor!r}")
+            anterior = no
+            no = no.direita
+            
+            conferidos += 1
+            if passo is not None and conferidos % passo == 0:
+                yield conferidos
+                if self.versao != versao:
+                    raise ErroArvore("árvore modificada durante a validação")
+        
+        if visitados != self.tamanho:
+            raise ErroInvariante(f"{visitados} nós alcançáveis, mas tamanho {self.tamanho}")
+        if altura_preta != self._altura_preta:
+            raise ErroInvariante(f"altura preta {altura_preta}, mas a árvore registra "
+                                 f"{self._altura_preta}")
+    
+    def validar_caminhos(self, amostras=16, gerador=None):
+        """Confere `amostras` caminhos aleatórios da raiz até uma folha, em O(amostras · log n).
+        
+        Em cada nó do caminho confere cor, vermelhos consecutivos, ponteiros
+        de pai, `tamanho` e se o valor está entre os limites impostos pelos
+        ancestrais; na folha, compara a altura preta do caminho com a mantida
+        pela árvore. Barato o bastante para rodar periodicamente em produção;
+        não substitui `validar`, que olha todos os nós. Retorna True ou
+        levanta ErroInvariante.
+        """
+        NIL = self.NIL
+        gerador = gerador if gerador is not None else random
+        contar = self.estatisticas_ordem
+        limite_nos = self.tamanho
+        for _ in range(amostras):
+            no = self.raiz
+            if no is not NIL and (no.pai is not None or no.cor != Cor.PRETO):
+                raise ErroInvariante(f"a raiz {no.valor!r} tem pai ou não é preta")
+            minimo = maximo = None
+            pretos = 1
+            profundidade = 0
+            while no is not NIL:
+                profundidade += 1
+                if profundidade > limite_nos:
+                    raise ErroInvariante("caminho mais longo que o número de nós (ciclo?)")
+                if minimo is not None and not minimo.valor < no.valor:
+                    raise ErroInvariante(f"{no.valor!r} fora de ordem em relação a {minimo.valor!r}")
+                if maximo is not None and not no.valor < maximo.valor:
+                    raise ErroInvariante(f"{no.valor!r} fora de ordem em relação a {maximo.valor!r}")
+                if no.cor == Cor.PRETO:
+                    pretos += 1
+                elif no.cor != Cor.VERMELHO:
+                    raise ErroInvariante(f"nó {no.valor!r} com cor inválida {no.cor!r}")
+                elif no.esquerda.cor == Cor.VERMELHO or no.direita.cor == Cor.VERMELHO:
+                    raise ErroInvariante(f"nó vermelho {no.valor!r} com filho vermelho")
+                if contar and no.tamanho != no.esquerda.tamanho + no.direita.tamanho + 1:
+                    raise ErroInvariante(f"nó {no.valor!r} com tamanho {no.tamanho} inconsistente")
+                if gerador.random() < 0.5:
+                    filho, maximo = no.esquerda, no
+                else:
+                    filho, minimo = no.direita, no
+                if filho is not NIL and filho.pai is not no:
+                    raise ErroInvariante(f"filho de {no.valor!r} aponta para outro pai")
+                no = filho
+            if pretos != self._altura_preta:
+                raise ErroInvariante(f"caminho com altura preta {pretos}, mas a árvore registra "
+                                     f"{self._altura_preta}")
+        return True
+    
+    def __len__(self):
+        """Retorna número de nós"""
+        return self.tamanho
+    
+    def __iter__(self):
+        """Itera sobre os valores em ordem crescente"""
+        return self.iter_em_ordem()
+    
+    def __reversed__(self):
+        """Itera sobre os valores em ordem decrescente"""
+        return self.iter_ordem_reversa()
+    
+    def __contains__(self, valor):
+        """Permite usar `valor in arvore`"""
+        return self.buscar(valor) is not None
+    
+    def _capturar_estado(self, descricao):
+        """Fecha um passo da animação com os nós alterados desde o anterior"""
+        if self._diario is None:
+            self._iniciar_diario()
+        self._diario.capturar()
+        self.descricoes_animacao.append(descricao)
+    
+    def _marcar(self, *nos):
+        """Marca nós prestes a mudar durante uma operação animada"""
+        if self._diario is not None:
+            self._diario.marcar(*nos)
+    
+    def _iniciar_diario(self):
+        """Descarta a animação anterior e começa um novo diário de quadros"""
+        self._diario = DiarioAnimacao(self)
+        self.estados_animacao = self._diario
+        self.descricoes_animacao = []
+    
+    def _encerrar_diario(self):
+        """Encerra o diário; os quadros ficam ligados à versão atual da árvore"""
+        if self._diario is not None:
+            self._diario.versao = self.versao
+            self._diario = None
+    
+    def inserir_animado(self, valor):
+        """Insere valor capturando estados para animação"""
+        self._iniciar_diario()
+        try:
+            return self._inserir_capturando(valor)
+        finally:
+            self._encerrar_diario()
+            if self.instrumentacao is not None:
+                self.instrumentacao.concluir("inserir_animado", valor)
+    
+    def _inserir_capturando(self, valor):
+        """Passos da inserção animada"""
+        # Captura estado inicial
+        self._capturar_estado(f"Estado inicial antes de inserir {valor}")
+        
+        novo_no, novo = self._inserir_folha(valor)
+        if not novo:
+            self._rejeitar(Evento.DUPLICADO, valor)
+            return False
+        
+        # Captura estado após inserção como folha vermelha
+        self._capturar_estado(f"Inserido {valor} como nó VERMELHO")
+        
+        # Se for a raiz, apenas muda para preto
+        if novo_no.pai is None:
+            self._marcar(novo_no)
+            novo_no.cor = Cor.PRETO
+            self._altura_preta += 1
+            self._capturar_estado(f"Nó {valor} é raiz - mudando para PRETO")
+            return True
+        
+        # Se o avô não existe, não precisa balancear
+        if novo_no.pai.pai is None:
+            return True
+        
+        # Corrige a árvore para manter propriedades Rubro-Negra
+        self._corrigir_insercao(novo_no, capturar_estado=True)
+        
+        # Captura estado final
+        self._capturar_estado(f"Inserção de {valor} completa - Árvore balanceada")
+        
+        return True
+    
+    def excluir_animado(self, valor):
+        """Remove valor capturando estados para animação"""
+        self._iniciar_diario()
+        try:
+            return self._excluir_capturando(valor)
+        finally:
+            self._encerrar_diario()
+            if self.instrumentacao is not None:
+                self.instrumentacao.concluir("excluir_animado", valor)
+    
+    def _excluir_capturando(self, valor):
+        """Passos da exclusão animada"""
+        # Captura estado inicial
+        self._capturar_estado(f"Estado inicial antes de excluir {valor}")
+        
+        if self.instrumentacao is None:
+            no = self.buscar(valor)
+        else:
+            no, profundidade = self._buscar_com_profundidade(valor)
+            self.instrumentacao.iniciar(profundidade)
+        if no is None:
+            self._rejeitar(Evento.NAO_ENCONTRADO, valor)
+            return False
+        
+        self._capturar_estado(f"Encontrado nó {valor} para exclusão")
+        
+        y = no
+        y_cor_original = y.cor
+        
+        self.versao += 1
+        self._altura_cache = None
+        if self.estatisticas_ordem:
+            self._descontar_remocao(no)
+        
+        if no.esquerda == self.NIL:
+            x, x_pai = no.direita, no.pai
+            self._capturar_estado(f"Nó {valor} tem apenas filho direito")
+            self._marcar(no.pai, x)
+            self._diario.remover(no)
+            self._transplantar(no, no.direita)
+        elif no.direita == self.NIL:
+            x, x_pai = no.esquerda, no.pai
+            self._capturar_estado(f"Nó {valor} tem apenas filho esquerdo")
+            self._marcar(no.pai, x)
+            self._diario.remover(no)
+            self._transplantar(no, no.esquerda)
+        else:
+            # Encontra o sucessor
+            y = self._minimo(no.direita)
+            y_cor_original = y.cor
+            x = y.direita
+            
+            self._capturar_estado(f"Nó {valor} tem dois filhos - encontrando sucessor {y.valor}")
+            self._marcar(y, y.pai, x, no.pai, no.esquerda, no.direita)
+            self._diario.remover(no)
+            
+            if y.pai == no:
+                x_pai = y
+            else:
+                x_pai = y.pai
+                self._transplantar(y, y.direita)
+                y.direita = no.direita
+                y.direita.pai = y
+            
+            self._transplantar(no, y)
+            y.esquerda = no.esquerda
+            y.esquerda.pai = y
+            y.cor = no.cor
+            y.tamanho = no.tamanho
+            
+            self._capturar_estado(f"Substituindo {valor} pelo sucessor {y.valor}")
+        
+        self.tamanho -= 1
+        
+        if y_cor_original == Cor.PRETO:
+            self._corrigir_exclusao(x, x_pai, capturar_estado=True)
+        
+        # Captura estado final
+        self._capturar_estado(f"Exclusão de {valor} completa - Árvore balanceada")
+        
+        return True
+    
+    def animar_operacao(self, intervalo=1.5):
+        """Exibe animação dos estados capturados; retorna False se não houver nenhum"""
+        if len(self.estados_animacao) == 0:
+            return False
+        
+        # Importação tardia: matplotlib só é carregado quando há o que desenhar
+        from visualizacao import animar_estados
+        animar_estados(self, intervalo)
+        return True
+    
+    def exportar_animacao(self, destino, intervalo=1.5, dpi=100):
+        """Grava a última operação animada em MP4, GIF ou PNGs, sem abrir janelas.
+        
+        O formato vem da extensão de `destino`. Retorna o tempo de
+        renderização de cada quadro em segundos (lista vazia se não houver
+        quadros).
+        """
+        if len(self.estados_animacao) == 0:
+            return []
+        
+        from visualizacao import exportar_animacao
+        return exportar_animacao(self, destino, intervalo, dpi)
+    
+    def visualizar(self, titulo="Árvore Rubro-Negra", salvar=None, profundidade_maxima=None,
+                   backend="matplotlib"):
+        """Visualiza árvore usando matplotlib; retorna False se estiver vazia.
+        
+        Árvores grandes são desenhadas só até `profundidade_maxima` (escolhida
+        automaticamente se None), com as subárvores mais fundas resumidas.
+        `backend="networkx"` usa o desenho antigo baseado em networkx.
+        """
+        if self.raiz == self.NIL:
+            return False
+        
+        from visualizacao import visualizar_arvore
+        visualizar_arvore(self, titulo, salvar, profundidade_maxima, backend)
+        return True
+    
+    def exportar(self, destino, formato=None, **opcoes):
+        """Grava a estrutura em texto (.txt), Graphviz (.dot/.gv) ou SVG (.svg).
+        
+        `destino` é um caminho ou um objeto com `write`; o formato vem da
+        extensão, ou de `formato` (ex.: "svg"). A escrita é incremental e não
+        carrega bibliotecas gráficas. Opções extras vão para o exportador
+        (ex.: `compacto=True` no texto).
+        """
+        from exportadores import EXPORTADORES
+        
+        if formato is None:
+            formato = os.path.splitext(destino)[1] if isinstance(destino, (str, os.PathLike)) else ".txt"
+        formato = "." + str(formato).lower().lstrip(".")
+        if formato not in EXPORTADORES:
+            raise ValueError(f"formato de exportação desconhecido: {formato!r} "
+                             f"(use {', '.join(sorted(EXPORTADORES))})")
+        exportador = EXPORTADORES[formato]
+        
+        if hasattr(destino, "write"):
+            exportador(self, destino, **opcoes)
+        else:
+            with open(destino, "w", encoding="utf-8") as saida:
+                exportador(self, saida, **opcoes)
+    
+    def imprimir_estrutura(self):
+        """Imprime estrutura hierárquica da árvore"""
+        from exportadores import exportar_texto
+        
+        print("\n" + "="*60)
+        print("ESTRUTURA DA ÁRVORE RUBRO-NEGRA")
+        print("="*60)
+        exportar_texto(self, sys.stdout)
+        print("="*60 + "\n")
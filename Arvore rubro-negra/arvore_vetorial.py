@@ -0,0 +1,562 @@
+"""Árvore Rubro-Negra com nós armazenados em colunas paralelas (array)
+
+Em vez de um objeto `No` por chave, cada nó é um índice inteiro em colunas
+paralelas: valores, cores (um byte por nó) e índices de esquerda, direita e
+pai. O índice 0 é a sentinela NIL, e posições liberadas na exclusão voltam
+para uma lista livre e são reutilizadas pelas próximas inserções.
+
+É uma implementação parcial, feita para comparar layouts de memória. Só
+oferece as operações básicas de `ArvoreRubroNegra`, com a mesma semântica:
+`inserir`, `inserir_ou_atualizar`, `excluir`, `buscar`, os percursos
+(`em_ordem`, `pre_ordem`, `pos_ordem` e seus `iter_*`, `iter_ordem_reversa`),
+`altura`, `altura_preta`, `len`, `in` e iteração. Não há estatísticas de
+ordem (`selecionar`, `rank`), consultas de vizinhança e intervalo (`piso`,
+`teto`, `intervalo`), operações de conjunto (`juntar`, `dividir`, `uniao`),
+`validar`, instrumentação, persistência, animação nem visualização.
+"""
+
+from array import array
+
+from arvore_rubro_negra import Cor, Evento, ErroValorDuplicado, ErroValorNaoEncontrado
+
+
+NIL = 0
+
+
+class NoVetorial:
+    """Visão leve de um nó da árvore vetorial, com a mesma interface de `No`"""
+    __slots__ = ('arvore', 'indice')
+
+    def __init__(self, arvore, indice):
+        self.arvore = arvore
+        self.indice = indice
+
+    @property
+    def valor(self):
+        return self.arvore._valores[self.indice] if self.indice != NIL else None
+
+    @property
+    def cor(self):
+        return self.arvore._cores[self.indice]
+
+    @property
+    def esquerda(self):
+        return NoVetorial(self.arvore, self.arvore._esquerdas[self.indice])
+
+    @property
+    def direita(self):
+        return NoVetorial(self.arvore, self.arvore._direitas[self.indice])
+
+    @property
+    def pai(self):
+        pai = self.arvore._pais[self.indice]
+        return NoVetorial(self.arvore, pai) if pai != NIL else None
+
+    def __eq__(self, outro):
+        return (isinstance(outro, NoVetorial) and self.arvore is outro.arvore
+                and self.indice == outro.indice)
+
+    def __hash__(self):
+        return hash((id(self.arvore), self.indice))
+
+    def __str__(self):
+        cor_texto = "V" if self.cor == Cor.VERMELHO else "P"
+        return f"{self.valor}({cor_texto})"
+
+
+class ArvoreRubroNegraVetorial:
+    """Árvore Rubro-Negra com nós em colunas `array` e lista livre
+
+    `tipo_chave` é um código de tipo do módulo `array` (por exemplo 'q' para
+    inteiros de 64 bits ou 'd' para floats) e guarda as chaves sem um objeto
+    Python por chave. Com o padrão None, as chaves ficam em uma lista e podem
+    ser de qualquer tipo comparável.
+    """
+
+    def __init__(self, tipo_chave=None, estrito=False):
+        self._valores = array(tipo_chave, [0]) if tipo_chave else [None]
+        self._cores = bytearray([Cor.PRETO])
+        self._esquerdas = array('i', [NIL])
+        self._direitas = array('i', [NIL])
+        self._pais = array('i', [NIL])
+        self._livres = array('i')
+        self._raiz = NIL
+        self.tamanho = 0
+        self.NIL = NoVetorial(self, NIL)
+        self.estrito = estrito
+        self.observador = None
+
+    def _rejeitar(self, evento, valor):
+        """Notifica o observador e, no modo estrito, levanta a exceção"""
+        if self.observador is not None:
+            self.observador(evento, valor)
+        if self.estrito:
+            if evento == Evento.DUPLICADO:
+                raise ErroValorDuplicado(valor)
+            raise ErroValorNaoEncontrado(valor)
+
+    @property
+    def raiz(self):
+        return NoVetorial(self, self._raiz)
+
+    def _novo_no(self, valor, pai):
+        """Ocupa uma posição livre (ou nova) das colunas com um nó vermelho"""
+        if self._livres:
+            i = self._livres.pop()
+            self._valores[i] = valor
+            self._cores[i] = Cor.VERMELHO
+            self._esquerdas[i] = NIL
+            self._direitas[i] = NIL
+            self._pais[i] = pai
+            return i
+
+        self._valores.append(valor)
+        self._cores.append(Cor.VERMELHO)
+        self._esquerdas.append(NIL)
+        self._direitas.append(NIL)
+        self._pais.append(pai)
+        return len(self._cores) - 1
+
+    def _liberar_no(self, i):
+        """Devolve a posição i para a lista livre"""
+        if isinstance(self._valores, list):
+            self._valores[i] = None
+        self._esquerdas[i] = NIL
+        self._direitas[i] = NIL
+        self._pais[i] = NIL
+        self._livres.append(i)
+
+    def _rotacao_esquerda(self, x):
+        """Realiza rotação à esquerda no índice x"""
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+
+        y = direitas[x]
+        direitas[x] = esquerdas[y]
+        if esquerdas[y] != NIL:
+            pais[esquerdas[y]] = x
+
+        pai = pais[x]
+        pais[y] = pai
+        if pai == NIL:
+            self._raiz = y
+        elif x == esquerdas[pai]:
+            esquerdas[pai] = y
+        else:
+            direitas[pai] = y
+
+        esquerdas[y] = x
+        pais[x] = y
+
+    def _rotacao_direita(self, y):
+        """Realiza rotação à direita no índice y"""
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+
+        x = esquerdas[y]
+        esquerdas[y] = direitas[x]
+        if direitas[x] != NIL:
+            pais[direitas[x]] = y
+
+        pai = pais[y]
+        pais[x] = pai
+        if pai == NIL:
+            self._raiz = x
+        elif y == direitas[pai]:
+            direitas[pai] = x
+        else:
+            esquerdas[pai] = x
+
+        direitas[x] = y
+        pais[y] = x
+
+    def inserir(self, valor):
+        """Insere um valor na árvore"""
+        i, novo = self._inserir_folha(valor)
+        if not novo:
+            self._rejeitar(Evento.DUPLICADO, valor)
+            return False
+
+        self._corrigir_insercao(i)
+        return True
+
+    def inserir_ou_atualizar(self, valor):
+        """Insere o valor ou substitui o valor igual já armazenado.
+
+        Retorna True se a chave era nova e False se apenas foi atualizada.
+        """
+        i, novo = self._inserir_folha(valor)
+        if not novo:
+            self._valores[i] = valor
+            return False
+
+        self._corrigir_insercao(i)
+        return True
+
+    def _inserir_folha(self, valor):
+        """Desce uma única vez da raiz e liga a nova folha (ou acha a duplicata)"""
+        valores = self._valores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pai = NIL
+        atual = self._raiz
+        a_esquerda = False
+
+        while atual != NIL:
+            pai = atual
+            if valor < valores[atual]:
+                atual = esquerdas[atual]
+                a_esquerda = True
+            elif valores[atual] < valor:
+                atual = direitas[atual]
+                a_esquerda = False
+            else:
+                return atual, False
+
+        i = self._novo_no(valor, pai)
+        if pai == NIL:
+            self._raiz = i
+        elif a_esquerda:
+            esquerdas[pai] = i
+        else:
+            direitas[pai] = i
+
+        self.tamanho += 1
+        return i, True
+
+    def _corrigir_insercao(self, no):
+        """Corrige propriedades da árvore após inserção"""
+        cores = self._cores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+
+        # O pai da raiz é NIL, que é preto: o laço para na raiz
+        while cores[pais[no]] == Cor.VERMELHO:
+            pai = pais[no]
+            avo = pais[pai]
+            if pai == direitas[avo]:
+                tio = esquerdas[avo]
+                if cores[tio] == Cor.VERMELHO:
+                    # Caso 1: Tio é vermelho - recoloração
+                    cores[tio] = Cor.PRETO
+                    cores[pai] = Cor.PRETO
+                    cores[avo] = Cor.VERMELHO
+                    no = avo
+                else:
+                    # Caso 2: Tio é preto e nó é filho esquerdo
+                    if no == esquerdas[pai]:
+                        no = pai
+                        self._rotacao_direita(no)
+                        pai = pais[no]
+                    # Caso 3: Tio é preto e nó é filho direito
+                    cores[pai] = Cor.PRETO
+                    cores[avo] = Cor.VERMELHO
+                    self._rotacao_esquerda(avo)
+            else:
+                tio = direitas[avo]
+                if cores[tio] == Cor.VERMELHO:
+                    cores[tio] = Cor.PRETO
+                    cores[pai] = Cor.PRETO
+                    cores[avo] = Cor.VERMELHO
+                    no = avo
+                else:
+                    if no == direitas[pai]:
+                        no = pai
+                        self._rotacao_esquerda(no)
+                        pai = pais[no]
+                    cores[pai] = Cor.PRETO
+                    cores[avo] = Cor.VERMELHO
+                    self._rotacao_direita(avo)
+
+        cores[self._raiz] = Cor.PRETO
+
+    def _buscar_indice(self, valor):
+        """Retorna o índice do nó com o valor, ou NIL"""
+        valores = self._valores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        no = self._raiz
+        while no != NIL:
+            if valor < valores[no]:
+                no = esquerdas[no]
+            elif valores[no] < valor:
+                no = direitas[no]
+            else:
+                return no
+        return NIL
+
+    def buscar(self, valor):
+        """Busca um valor na árvore"""
+        i = self._buscar_indice(valor)
+        return NoVetorial(self, i) if i != NIL else None
+
+    def excluir(self, valor):
+        """Remove um valor da árvore"""
+        i = self._buscar_indice(valor)
+        if i == NIL:
+            self._rejeitar(Evento.NAO_ENCONTRADO, valor)
+            return False
+
+        self._excluir_no(i)
+        self.tamanho -= 1
+        return True
+
+    def _excluir_no(self, z):
+        """Remove o nó de índice z e libera sua posição"""
+        cores = self._cores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+
+        y = z
+        y_cor_original = cores[y]
+
+        if esquerdas[z] == NIL:
+            x = direitas[z]
+            self._transplantar(z, x)
+        elif direitas[z] == NIL:
+            x = esquerdas[z]
+            self._transplantar(z, x)
+        else:
+            # Encontra o sucessor (menor nó da subárvore direita)
+            y = self._minimo(direitas[z])
+            y_cor_original = cores[y]
+            x = direitas[y]
+
+            if pais[y] == z:
+                pais[x] = y
+            else:
+                self._transplantar(y, direitas[y])
+                direitas[y] = direitas[z]
+                pais[direitas[y]] = y
+
+            self._transplantar(z, y)
+            esquerdas[y] = esquerdas[z]
+            pais[esquerdas[y]] = y
+            cores[y] = cores[z]
+
+        if y_cor_original == Cor.PRETO:
+            self._corrigir_exclusao(x)
+
+        self._liberar_no(z)
+
+    def _corrigir_exclusao(self, x):
+        """Corrige propriedades da árvore após exclusão"""
+        cores = self._cores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+
+        while x != self._raiz and cores[x] == Cor.PRETO:
+            pai = pais[x]
+            if x == esquerdas[pai]:
+                irmao = direitas[pai]
+
+                # Caso 1: Irmão é vermelho
+                if cores[irmao] == Cor.VERMELHO:
+                    cores[irmao] = Cor.PRETO
+                    cores[pai] = Cor.VERMELHO
+                    self._rotacao_esquerda(pai)
+                    irmao = direitas[pai]
+
+                # Caso 2: Irmão é preto e ambos os filhos do irmão são pretos
+                if cores[esquerdas[irmao]] == Cor.PRETO and cores[direitas[irmao]] == Cor.PRETO:
+                    cores[irmao] = Cor.VERMELHO
+                    x = pai
+                else:
+                    # Caso 3: Irmão é preto, filho esquerdo é vermelho e direito é preto
+                    if cores[direitas[irmao]] == Cor.PRETO:
+                        cores[esquerdas[irmao]] = Cor.PRETO
+                        cores[irmao] = Cor.VERMELHO
+                        self._rotacao_direita(irmao)
+                        irmao = direitas[pai]
+
+                    # Caso 4: Irmão é preto e filho direito é vermelho
+                    cores[irmao] = cores[pai]
+                    cores[pai] = Cor.PRETO
+                    cores[direitas[irmao]] = Cor.PRETO
+                    self._rotacao_esquerda(pai)
+                    x = self._raiz
+            else:
+                irmao = esquerdas[pai]
+
+                if cores[irmao] == Cor.VERMELHO:
+                    cores[irmao] = Cor.PRETO
+                    cores[pai] = Cor.VERMELHO
+                    self._rotacao_direita(pai)
+                    irmao = esquerdas[pai]
+
+                if cores[direitas[irmao]] == Cor.PRETO and cores[esquerdas[irmao]] == Cor.PRETO:
+                    cores[irmao] = Cor.VERMELHO
+                    x = pai
+                else:
+                    if cores[esquerdas[irmao]] == Cor.PRETO:
+                        cores[direitas[irmao]] = Cor.PRETO
+                        cores[irmao] = Cor.VERMELHO
+                        self._rotacao_esquerda(irmao)
+                        irmao = esquerdas[pai]
+
+                    cores[irmao] = cores[pai]
+                    cores[pai] = Cor.PRETO
+                    cores[esquerdas[irmao]] = Cor.PRETO
+                    self._rotacao_direita(pai)
+                    x = self._raiz
+
+        cores[x] = Cor.PRETO
+
+    def _transplantar(self, u, v):
+        """Substitui subárvore u por v"""
+        pais = self._pais
+        pai = pais[u]
+        if pai == NIL:
+            self._raiz = v
+        elif u == self._esquerdas[pai]:
+            self._esquerdas[pai] = v
+        else:
+            self._direitas[pai] = v
+        pais[v] = pai
+
+    def _minimo(self, no):
+        """Encontra o índice do menor nó na subárvore"""
+        esquerdas = self._esquerdas
+        while esquerdas[no] != NIL:
+            no = esquerdas[no]
+        return no
+
+    def em_ordem(self):
+        """Percurso em ordem"""
+        return list(self.iter_em_ordem())
+
+    def iter_em_ordem(self):
+        """Gera os valores em ordem seguindo os índices de pai"""
+        valores = self._valores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+        no = self._raiz
+        if no == NIL:
+            return
+        while esquerdas[no] != NIL:
+            no = esquerdas[no]
+        while no != NIL:
+            yield valores[no]
+            if direitas[no] != NIL:
+                no = direitas[no]
+                while esquerdas[no] != NIL:
+                    no = esquerdas[no]
+            else:
+                filho = no
+                no = pais[no]
+                while no != NIL and filho == direitas[no]:
+                    filho = no
+                    no = pais[no]
+
+    def iter_ordem_reversa(self):
+        """Gera os valores em ordem decrescente seguindo os índices de pai"""
+        valores = self._valores
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pais = self._pais
+        no = self._raiz
+        if no == NIL:
+            return
+        while direitas[no] != NIL:
+            no = direitas[no]
+        while no != NIL:
+            yield valores[no]
+            if esquerdas[no] != NIL:
+                no = esquerdas[no]
+                while direitas[no] != NIL:
+                    no = direitas[no]
+            else:
+                filho = no
+                no = pais[no]
+                while no != NIL and filho == esquerdas[no]:
+                    filho = no
+                    no = pais[no]
+
+    def pre_ordem(self):
+        """Percurso em pré-ordem"""
+        return list(self.iter_pre_ordem())
+
+    def iter_pre_ordem(self):
+        """Gera os valores em pré-ordem usando pilha explícita"""
+        if self._raiz == NIL:
+            return
+        pilha = [self._raiz]
+        while pilha:
+            no = pilha.pop()
+            yield self._valores[no]
+            if self._direitas[no] != NIL:
+                pilha.append(self._direitas[no])
+            if self._esquerdas[no] != NIL:
+                pilha.append(self._esquerdas[no])
+
+    def pos_ordem(self):
+        """Percurso em pós-ordem"""
+        return list(self.iter_pos_ordem())
+
+    def iter_pos_ordem(self):
+        """Gera os valores em pós-ordem usando pilha explícita"""
+        esquerdas = self._esquerdas
+        direitas = self._direitas
+        pilha = []
+        no = self._raiz
+        ultimo = NIL
+        while pilha or no != NIL:
+            if no != NIL:
+                pilha.append(no)
+                no = esquerdas[no]
+            else:
+                topo = pilha[-1]
+                if direitas[topo] != NIL and ultimo != direitas[topo]:
+                    no = direitas[topo]
+                else:
+                    yield self._valores[topo]
+                    ultimo = pilha.pop()
+
+    def altura(self):
+        """Retorna altura da árvore (percurso por níveis)"""
+        if self._raiz == NIL:
+            return 0
+        altura = 0
+        nivel = [self._raiz]
+        while nivel:
+            altura += 1
+            proximo = []
+            for no in nivel:
+                if self._esquerdas[no] != NIL:
+                    proximo.append(self._esquerdas[no])
+                if self._direitas[no] != NIL:
+                    proximo.append(self._direitas[no])
+            nivel = proximo
+        return altura
+
+    def altura_preta(self):
+        """Retorna altura preta da árvore (conta a folha NIL)"""
+        altura = 1
+        no = self._raiz
+        while no != NIL:
+            if self._cores[no] == Cor.PRETO:
+                altura += 1
+            no = self._esquerdas[no]
+        return altura
+
+    def __len__(self):
+        """Retorna número de nós"""
+        return self.tamanho
+
+    def __iter__(self):
+        """Itera sobre os valores em ordem crescente"""
+        return self.iter_em_ordem()
+
+    def __reversed__(self):
+        """Itera sobre os valores em ordem decrescente"""
+        return self.iter_ordem_reversa()
+
+    def __contains__(self, valor):
+        """Permite usar `valor in arvore`"""
+        return self._buscar_indice(valor) != NIL
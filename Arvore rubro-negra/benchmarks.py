@@ -0,0 +1,410 @@
+"""
+BENCHMARKS - ÁRVORE RUBRO-NEGRA
+===============================
+Medições de desempenho e de uso de memória das implementações da árvore
+"""
+
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+from arvore_rubro_negra import ArvoreRubroNegra, Cor
+from arvore_vetorial import ArvoreRubroNegraVetorial
+
+
+class NoComDict:
+    """Layout antigo do nó (sem __slots__), mantido apenas para comparação"""
+    def __init__(self, valor):
+        self.valor = valor
+        self.cor = Cor.VERMELHO
+        self.pai = None
+        self.esquerda = None
+        self.direita = None
+        self.tamanho = 1
+
+
+class ArvoreNoComDict(ArvoreRubroNegra):
+    """Árvore que cria nós com __dict__ por instância"""
+    classe_no = NoComDict
+
+
+def medir_memoria(construir):
+    """Retorna (objeto, bytes alocados) ao executar construir()"""
+    tracemalloc.start()
+    try:
+        antes, _ = tracemalloc.get_traced_memory()
+        objeto = construir()
+        depois, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return objeto, depois - antes
+
+
+def benchmark_memoria_por_chave(n=200_000, semente=42):
+    """Compara bytes por chave entre os layouts de nó"""
+    print(f"\n📏 BENCHMARK: Memória por chave ({n} chaves aleatórias)")
+    print("-"*60)
+
+    gerador = random.Random(semente)
+    # As chaves são criadas fora da medição: contamos só a estrutura da árvore
+    chaves = gerador.sample(range(10**6, 10**6 + 10 * n), n)
+
+    layouts = [
+        ("No com __dict__", ArvoreNoComDict),
+        ("No com __slots__", ArvoreRubroNegra),
+        ("Vetorial (lista de chaves)", ArvoreRubroNegraVetorial),
+        ("Vetorial (chaves array 'q')", lambda: ArvoreRubroNegraVetorial('q')),
+    ]
+
+    resultados = {}
+    for nome, criar in layouts:
+        def construir():
+            arvore = criar()
+            for chave in chaves:
+                arvore.inserir(chave)
+            return arvore
+
+        arvore, total = medir_memoria(construir)
+        assert len(arvore) == n
+        resultados[nome] = total / n
+        print(f"   {nome:.<40} {total / n:8.1f} bytes/chave")
+
+    return resultados
+
+
+# Orçamento de tempo para `import main`; acima disso o benchmark acusa regressão
+LIMITE_IMPORTACAO_MS = 50.0
+
+SCRIPT_IMPORTACAO = """
+import sys, time
+inicio = time.perf_counter()
+import {modulo}
+print(time.perf_counter() - inicio)
+print(int(any(m in sys.modules for m in ('matplotlib', 'networkx'))))
+"""
+
+
+def medir_importacao(modulo="main"):
+    """Importa o módulo em um interpretador novo; retorna (segundos, carregou_graficos)"""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    saida = subprocess.run(
+        [sys.executable, "-c", SCRIPT_IMPORTACAO.format(modulo=modulo)],
+        cwd=diretorio, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(saida[0]), saida[1] == "1"
+
+
+def benchmark_tempo_importacao(repeticoes=7, limite_ms=LIMITE_IMPORTACAO_MS):
+    """Mede o tempo de `import main` e acusa regressões"""
+    print(f"\n⏱️  BENCHMARK: Tempo de importação ({repeticoes} repetições)")
+    print("-"*60)
+
+    tempos = []
+    carregou_graficos = False
+    for _ in range(repeticoes):
+        segundos, graficos = medir_importacao("main")
+        tempos.append(segundos * 1000)
+        carregou_graficos = carregou_graficos or graficos
+
+    tempos.sort()
+    mediana = tempos[len(tempos) // 2]
+    print(f"   import main: mediana {mediana:.2f} ms (mín {tempos[0]:.2f} ms)")
+
+    ok = mediana <= limite_ms and not carregou_graficos
+    if carregou_graficos:
+        print("   ❌ REGRESSÃO: matplotlib/networkx carregados na importação")
+    elif mediana > limite_ms:
+        print(f"   ❌ REGRESSÃO: acima do limite de {limite_ms:.0f} ms")
+    else:
+        print(f"   ✅ Dentro do limite de {limite_ms:.0f} ms, sem pilha gráfica")
+    return ok
+
+
+def medir_renderizacao(arvore, backend):
+    """Segundos para desenhar a árvore inteira (sem nível de detalhe) e rasterizá-la"""
+    # Importação tardia: o restante dos benchmarks não depende de matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from visualizacao import desenhar_arvore
+
+    inicio = time.perf_counter()
+    fig = Figure(figsize=(16, 10))
+    FigureCanvasAgg(fig)
+    desenhar_arvore(fig, arvore, profundidade_maxima=arvore.altura(), backend=backend)
+    fig.canvas.draw()
+    return time.perf_counter() - inicio
+
+
+def benchmark_renderizacao(tamanhos=(1_000, 10_000, 100_000)):
+    """Compara o desenho direto (LineCollection + scatter) com o backend networkx"""
+    print(f"\n🖼️  BENCHMARK: Renderização de visualizar ({', '.join(map(str, tamanhos))} nós)")
+    print("-"*60)
+
+    resultados = {}
+    for n in tamanhos:
+        arvore = ArvoreRubroNegra.from_sorted(range(n))
+        direto = medir_renderizacao(arvore, "matplotlib")
+        networkx = medir_renderizacao(arvore, "networkx")
+        resultados[n] = (direto, networkx)
+        print(f"   {n:>7} nós: direto {direto:7.2f} s | networkx {networkx:7.2f} s "
+              f"| {networkx / direto:5.1f}x")
+
+    return resultados
+
+
+def benchmark_persistencia(n=1_000_000, consultas=100_000, semente=42):
+    """Tempo para salvar, reconstruir e abrir mapeado um índice de n chaves"""
+    print(f"\n💾 BENCHMARK: Persistência binária ({n} chaves)")
+    print("-"*60)
+
+    import tempfile
+
+    arvore = ArvoreRubroNegra.from_sorted(range(0, 2 * n, 2))
+    gerador = random.Random(semente)
+    alvos = [gerador.randrange(2 * n) for _ in range(consultas)]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "indice.arn")
+
+        inicio = time.perf_counter()
+        arvore.salvar(caminho)
+        t_salvar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        carregada = ArvoreRubroNegra.carregar(caminho)
+        t_carregar = time.perf_counter() - inicio
+        assert len(carregada) == n
+        del carregada
+
+        inicio = time.perf_counter()
+        mapeada = ArvoreRubroNegra.carregar(caminho, somente_leitura=True)
+        t_abrir = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        encontrados = sum(1 for alvo in alvos if alvo in mapeada)
+        t_consultas = time.perf_counter() - inicio
+        mapeada.fechar()
+
+        print(f"   Arquivo: {os.path.getsize(caminho) / n:.1f} bytes/chave")
+        print(f"   {'salvar':.<34} {t_salvar:9.3f} s")
+        print(f"   {'carregar (reconstrução O(n))':.<34} {t_carregar:9.3f} s")
+        print(f"   {'abrir mapeado (mmap)':.<34} {t_abrir * 1000:9.3f} ms")
+        print(f"   {f'{consultas} buscas no mapeado':.<34} {t_consultas:9.3f} s "
+              f"({encontrados} encontradas)")
+
+    return t_salvar, t_carregar, t_abrir, t_consultas
+
+
+def benchmark_registro_operacoes(n=20_000, semente=42):
+    """Vazão de inserções/exclusões registradas no log, por política de fsync"""
+    print(f"\n📝 BENCHMARK: Registro de operações ({n} mutações)")
+    print("-"*60)
+
+    import tempfile
+    from registro_operacoes import ArvoreDuravel, Sincronizacao
+
+    gerador = random.Random(semente)
+    operacoes = [(gerador.random() < 0.7, gerador.randrange(n)) for _ in range(n)]
+
+    def aplicar(alvo):
+        inicio = time.perf_counter()
+        for inserir, valor in operacoes:
+            if inserir:
+                alvo.inserir(valor)
+            else:
+                alvo.excluir(valor)
+        return time.perf_counter() - inicio
+
+    resultados = {"sem log": n / aplicar(ArvoreRubroNegra())}
+    print(f"   {'sem log':.<24} {resultados['sem log']:11,.0f} ops/s")
+    politicas = [
+        (Sincronizacao.NUNCA, {}),
+        (Sincronizacao.LOTE, {"tamanho_lote": 256}),
+        (Sincronizacao.LOTE, {"tamanho_lote": 32}),
+        (Sincronizacao.SEMPRE, {}),
+    ]
+    for politica, opcoes in politicas:
+        with tempfile.TemporaryDirectory() as diretorio:
+            with ArvoreDuravel(diretorio, politica, compactar_apos=None, **opcoes) as duravel:
+                tempo = aplicar(duravel)
+                fsyncs = duravel.log.fsyncs
+            rotulo = politica + (f" ({opcoes['tamanho_lote']})" if opcoes else "")
+            resultados[rotulo] = n / tempo
+
+            inicio = time.perf_counter()
+            with ArvoreDuravel(diretorio) as reaberta:
+                reaplicadas = reaberta.reaplicadas
+            t_reaplicar = time.perf_counter() - inicio
+        print(f"   {rotulo:.<24} {n / tempo:11,.0f} ops/s | {fsyncs:6} fsyncs")
+    print(f"   Reabrir reaplicando {reaplicadas} registros: {t_reaplicar:.3f} s")
+
+    return resultados
+
+
+class ArvoreComMutex:
+    """Referência: uma única trava exclusiva para todas as operações"""
+    def __init__(self, arvore):
+        self.arvore = arvore
+        self.trava = threading.Lock()
+
+    def buscar(self, valor):
+        with self.trava:
+            return self.arvore.buscar(valor)
+
+    def inserir(self, valor):
+        with self.trava:
+            return self.arvore.inserir(valor)
+
+    def excluir(self, valor):
+        with self.trava:
+            return self.arvore.excluir(valor)
+
+
+def medir_vazao_concorrente(alvo, operacoes_por_thread):
+    """Executa uma lista de operações por thread ao mesmo tempo; retorna ops/s"""
+    largada = threading.Barrier(len(operacoes_por_thread) + 1)
+
+    def trabalhar(operacoes):
+        buscar, inserir, excluir = alvo.buscar, alvo.inserir, alvo.excluir
+        largada.wait()
+        for tipo, valor in operacoes:
+            if tipo == 0:
+                buscar(valor)
+            elif tipo == 1:
+                inserir(valor)
+            else:
+                excluir(valor)
+
+    threads = [threading.Thread(target=trabalhar, args=(operacoes,))
+               for operacoes in operacoes_por_thread]
+    for thread in threads:
+        thread.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    tempo = time.perf_counter() - inicio
+    return sum(len(operacoes) for operacoes in operacoes_por_thread) / tempo
+
+
+def benchmark_concorrencia(n=100_000, operacoes=200_000, threads=(1, 2, 4, 8), semente=42):
+    """Vazão com várias threads: trava de leitura/escrita vs trava única"""
+    print(f"\n🧵 BENCHMARK: Acesso concorrente ({n} chaves, {operacoes} operações)")
+    print("-"*60)
+
+    from arvore_concorrente import ArvoreConcorrente
+
+    cargas = {"leitura (95% buscas)": 0.95, "mista (50% buscas)": 0.50}
+    gerador = random.Random(semente)
+    resultados = {}
+    for nome_carga, fracao_buscas in cargas.items():
+        print(f"   {nome_carga}:")
+        for quantidade in threads:
+            por_thread = operacoes // quantidade
+            listas = []
+            for _ in range(quantidade):
+                lista = []
+                for _ in range(por_thread):
+                    sorteio = gerador.random()
+                    tipo = 0 if sorteio < fracao_buscas else (1 if sorteio < (1 + fracao_buscas) / 2 else 2)
+                    lista.append((tipo, gerador.randrange(2 * n)))
+                listas.append(lista)
+
+            vazoes = []
+            for envolver in (ArvoreConcorrente, ArvoreComMutex):
+                alvo = envolver(ArvoreRubroNegra.from_sorted(range(0, 2 * n, 2)))
+                vazoes.append(medir_vazao_concorrente(alvo, listas))
+            resultados[(nome_carga, quantidade)] = tuple(vazoes)
+            print(f"      {quantidade} thread(s): leitura/escrita {vazoes[0]:10,.0f} ops/s "
+                  f"| trava única {vazoes[1]:10,.0f} ops/s")
+
+    return resultados
+
+
+def benchmark_particionada(n=1_000_000, consultas=200_000, trabalhadores=(1, 4), semente=42):
+    """Carga em lote, buscas em lote e percurso: árvore única vs particionada"""
+    print(f"\n🧩 BENCHMARK: Árvore particionada ({n} chaves, {consultas} buscas)")
+    print("-"*60)
+
+    from arvore_particionada import ArvoreParticionada
+
+    gerador = random.Random(semente)
+    valores = [gerador.randrange(4 * n) for _ in range(n)]
+    alvos = [gerador.randrange(4 * n) for _ in range(consultas)]
+
+    def medir(alvo, buscar_lote):
+        inicio = time.perf_counter()
+        alvo.inserir_lote(valores)
+        t_carga = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        buscar_lote(alvos)
+        t_buscas = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        alvo.em_ordem()
+        t_percurso = time.perf_counter() - inicio
+        return t_carga, t_buscas, t_percurso
+
+    resultados = {}
+    unica = ArvoreRubroNegra()
+    resultados["árvore única"] = medir(unica, lambda alvos: [unica.buscar(v) for v in alvos])
+    for quantidade in trabalhadores:
+        with ArvoreParticionada(trabalhadores=quantidade) as particionada:
+            resultados[f"particionada ({quantidade} threads)"] = medir(particionada, particionada.buscar_lote)
+            particoes = len(particionada.particoes)
+
+    print(f"   {'':<28} {'carga':>8} {'buscas':>8} {'percurso':>9}")
+    for rotulo, (t_carga, t_buscas, t_percurso) in resultados.items():
+        print(f"   {rotulo:.<28} {t_carga:7.2f}s {t_buscas:7.2f}s {t_percurso:8.2f}s")
+    print(f"   Partições: {particoes}")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    print("""
+╔══════════════════════════════════════════════════════════╗
+║                                                          ║
+║        BENCHMARKS - ÁRVORE RUBRO-NEGRA                  ║
+║                                                          ║
+╚══════════════════════════════════════════════════════════╝
+    """)
+
+    print("Escolha uma opção:")
+    print("1 - Memória por chave (layouts de nó)")
+    print("2 - Tempo de importação")
+    print("3 - Renderização (direta vs networkx)")
+    print("4 - Persistência (salvar, carregar, mmap)")
+    print("5 - Registro de operações (políticas de fsync)")
+    print("6 - Acesso concorrente (várias threads)")
+    print("7 - Árvore particionada (operações em lote)")
+    print("8 - Suíte de desempenho (cargas padronizadas, JSON)")
+    print("9 - Estresse diferencial (resistência)")
+
+    opcao = input("\nOpção: ").strip()
+
+    if opcao == "1":
+        benchmark_memoria_por_chave()
+    elif opcao == "2":
+        benchmark_tempo_importacao()
+    elif opcao == "3":
+        benchmark_renderizacao()
+    elif opcao == "4":
+        benchmark_persistencia()
+    elif opcao == "5":
+        benchmark_registro_operacoes()
+    elif opcao == "6":
+        benchmark_concorrencia()
+    elif opcao == "7":
+        benchmark_particionada()
+    elif opcao == "8":
+        from suite_desempenho import main
+        main([])
+    elif opcao == "9":
+        from estresse import main
+        main([])
+    else:
+        print("Opção inválida!")
+        benchmark_memoria_por_chave()
@@ -0,0 +1,232 @@
+"""
+TESTE DE ESTRESSE DIFERENCIAL - ÁRVORE RUBRO-NEGRA
+==================================================
+Executa milhões de `inserir`, `excluir` e `buscar` intercalados, sorteados a
+partir de uma semente, e confere cada resultado com uma lista ordenada de
+referência (`bisect`). A cada `validar_a_cada` operações a árvore passa por
+`validar()` e seus valores em ordem são comparados com a referência.
+
+Na primeira divergência, o traço de operações até ali é reduzido (delta
+debugging) a um reprodutor mínimo, impresso como código Python. Como as
+operações dependem só da semente, qualquer falha se repete com a mesma
+linha de comando.
+
+A vazão é informada durante a execução, então o mesmo programa serve de
+teste de resistência (soak):
+
+    python estresse.py --operacoes 5000000 --universo 100000 --semente 7
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from bisect import bisect_left
+from itertools import islice
+
+from arvore_rubro_negra import ArvoreRubroNegra
+
+PROPORCOES = (("inserir", 0.40), ("excluir", 0.30), ("buscar", 0.30))
+# Chance de continuar uma sequência crescente, que provoca longas cadeias de rotações
+CHANCE_SEQUENCIA = 0.10
+
+
+class Divergencia(AssertionError):
+    """Resultado da árvore diferente do da referência"""
+
+
+def gerar_operacoes(semente, universo, proporcoes=PROPORCOES):
+    """Gera (operação, valor) sem fim; a sequência depende só dos argumentos"""
+    gerador = random.Random(semente)
+    nomes = [nome for nome, _ in proporcoes]
+    pesos = [peso for _, peso in proporcoes]
+    anterior = 0
+    while True:
+        if gerador.random() < CHANCE_SEQUENCIA:
+            valor = (anterior + 1) % universo
+        else:
+            valor = gerador.randrange(universo)
+        anterior = valor
+        yield gerador.choices(nomes, pesos)[0], valor
+
+
+def aplicar(arvore, referencia, operacao, valor):
+    """Executa uma operação nas duas estruturas e levanta Divergencia se diferirem"""
+    posicao = bisect_left(referencia, valor)
+    presente = posicao < len(referencia) and referencia[posicao] == valor
+    if operacao == "inserir":
+        obtido, esperado = arvore.inserir(valor), not presente
+        if esperado:
+            referencia.insert(posicao, valor)
+    elif operacao == "excluir":
+        obtido, esperado = arvore.excluir(valor), presente
+        if esperado:
+            del referencia[posicao]
+    else:
+        no = arvore.buscar(valor)
+        if no is not None and no.valor != valor:
+            raise Divergencia(f"buscar({valor!r}) retornou o nó {no.valor!r}")
+        obtido, esperado = no is not None, presente
+    if obtido != esperado:
+        raise Divergencia(f"{operacao}({valor!r}) retornou {obtido}, esperado {esperado}")
+    if len(arvore) != len(referencia):
+        raise Divergencia(f"após {operacao}({valor!r}): {len(arvore)} valores, esperado {len(referencia)}")
+
+
+def conferir(arvore, referencia):
+    """Invariantes completas e conteúdo igual ao da referência"""
+    arvore.validar()
+    if arvore.em_ordem() != referencia:
+        raise Divergencia("valores em ordem diferentes dos da referência")
+
+
+def reproduzir(traco, fabrica=ArvoreRubroNegra):
+    """Aplica o traço a uma árvore nova; retorna a mensagem de falha ou None.
+
+    Valida cerca de 64 vezes ao longo do traço (a cada operação nos traços
+    curtos), para que a redução não perca falhas que só aparecem no meio.
+    """
+    arvore = fabrica()
+    referencia = []
+    a_cada = max(1, len(traco) // 64)
+    try:
+        for i, (operacao, valor) in enumerate(traco, 1):
+            aplicar(arvore, referencia, operacao, valor)
+            if i % a_cada == 0:
+                conferir(arvore, referencia)
+        conferir(arvore, referencia)
+    except Exception as erro:
+        return f"{type(erro).__name__}: {erro}"
+    return None
+
+
+def assinatura_falha(falha):
+    """Tipo e mensagem da falha com os números trocados por '#'.
+
+    Os valores envolvidos mudam à medida que o traço encolhe ("alturas
+    pretas 6 e 5", depois "3 e 2"); o tipo e o texto da verificação, não.
+    """
+    if falha is None:
+        return None
+    return re.sub(r"-?\d+(\.\d+)?", "#", falha)
+
+
+def reduzir(traco, fabrica=ArvoreRubroNegra):
+    """Reduz um traço que falha por delta debugging.
+
+    Remove blocos cada vez menores enquanto a falha persistir com o mesmo
+    tipo e a mesma mensagem do traço completo; candidatos que falham de
+    outro jeito são descartados, para o reprodutor não trocar de defeito. O
+    resultado é mínimo no sentido de que tirar qualquer operação faz essa
+    falha sumir, mas não necessariamente o menor traço possível.
+    """
+    traco = list(traco)
+    falha = reproduzir(traco, fabrica)
+    if falha is None:
+        return traco
+    assinatura = assinatura_falha(falha)
+    pedacos = 2
+    while len(traco) >= 2:
+        tamanho = -(-len(traco) // pedacos)
+        for inicio in range(0, len(traco), tamanho):
+            candidato = traco[:inicio] + traco[inicio + tamanho:]
+            if assinatura_falha(reproduzir(candidato, fabrica)) == assinatura:
+                traco = candidato
+                pedacos = max(pedacos - 1, 2)
+                break
+        else:
+            if pedacos >= len(traco):
+                break
+            pedacos = min(2 * pedacos, len(traco))
+    return traco
+
+
+def formatar_reprodutor(traco, fabrica=ArvoreRubroNegra):
+    """Código Python que refaz o traço com a mesma fábrica usada no estresse"""
+    linhas = [f"arvore = {fabrica.__name__}()"]
+    linhas += [f"arvore.{operacao}({valor!r})" for operacao, valor in traco]
+    linhas.append("arvore.validar()")
+    return "\n".join(linhas)
+
+
+def executar_estresse(operacoes=1_000_000, universo=10_000, semente=42, validar_a_cada=10_000,
+                      proporcoes=PROPORCOES, fabrica=ArvoreRubroNegra, relatar_a_cada=None,
+                      saida=sys.stdout):
+    """Roda o estresse diferencial e retorna um dicionário com o resumo.
+
+    Em caso de falha, o resumo traz a mensagem, o índice da operação em que
+    foi notada e o traço reduzido em "reprodutor".
+    """
+    arvore = fabrica()
+    referencia = []
+    validacoes = 0
+    executadas = 0
+    falha = None
+    inicio = ultimo_relato = time.perf_counter()
+    try:
+        for operacao, valor in islice(gerar_operacoes(semente, universo, proporcoes), operacoes):
+            aplicar(arvore, referencia, operacao, valor)
+            executadas += 1
+            if executadas % validar_a_cada == 0:
+                conferir(arvore, referencia)
+                validacoes += 1
+            if relatar_a_cada and executadas % relatar_a_cada == 0 and saida is not None:
+                agora = time.perf_counter()
+                saida.write(f"   {executadas:>12,} ops | {relatar_a_cada / (agora - ultimo_relato):>10,.0f} ops/s"
+                            f" | {len(arvore):>9,} valores | altura {arvore.altura()}\n")
+                ultimo_relato = agora
+        conferir(arvore, referencia)
+        validacoes += 1
+    except Exception as erro:
+        falha = f"{type(erro).__name__}: {erro}"
+    segundos = time.perf_counter() - inicio
+
+    resumo = {
+        "operacoes": executadas,
+        "segundos": segundos,
+        "ops_por_segundo": executadas / segundos if segundos else 0.0,
+        "validacoes": validacoes,
+        "tamanho_final": len(referencia),
+        "falha": falha,
+    }
+    if falha is not None:
+        # A operação que falhou ainda não foi contada em `executadas`
+        traco = list(islice(gerar_operacoes(semente, universo, proporcoes), executadas + 1))
+        resumo["indice_falha"] = executadas
+        resumo["reprodutor"] = reduzir(traco, fabrica)
+    return resumo
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Estresse diferencial da Árvore Rubro-Negra")
+    parser.add_argument("--operacoes", type=int, default=1_000_000)
+    parser.add_argument("--universo", type=int, default=10_000,
+                        help="valores sorteados em [0, universo)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--validar-a-cada", type=int, default=10_000)
+    parser.add_argument("--proporcoes", type=float, nargs=3, metavar=("INSERIR", "EXCLUIR", "BUSCAR"),
+                        default=[peso for _, peso in PROPORCOES])
+    parser.add_argument("--relatar-a-cada", type=int, default=100_000)
+    opcoes = parser.parse_args(argumentos)
+
+    proporcoes = tuple(zip(("inserir", "excluir", "buscar"), opcoes.proporcoes))
+    print(f"\n🔥 ESTRESSE DIFERENCIAL ({opcoes.operacoes:,} operações, universo {opcoes.universo:,}, "
+          f"semente {opcoes.semente})")
+    print("-"*60)
+    resumo = executar_estresse(opcoes.operacoes, opcoes.universo, opcoes.semente, opcoes.validar_a_cada,
+                               proporcoes, relatar_a_cada=opcoes.relatar_a_cada)
+    print(f"\n   {resumo['operacoes']:,} operações em {resumo['segundos']:.1f} s "
+          f"({resumo['ops_por_segundo']:,.0f} ops/s), {resumo['validacoes']} validações completas")
+
+    if resumo["falha"] is None:
+        print("✅ Nenhuma divergência")
+        return 0
+    print(f"\n❌ Falha na operação {resumo['indice_falha']:,}: {resumo['falha']}")
+    print(f"   Reprodutor mínimo ({len(resumo['reprodutor'])} operações):\n")
+    print(formatar_reprodutor(resumo["reprodutor"]))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Exportação da estrutura da árvore para texto, Graphviz DOT e SVG
+
+Os exportadores escrevem em qualquer objeto com `write` à medida que
+percorrem a árvore (em pré-ordem, com pilha explícita): a memória usada é
+proporcional à altura, não ao número de nós, e nenhuma biblioteca gráfica é
+carregada. Servem para inspecionar offline árvores grandes demais para o
+matplotlib.
+"""
+
+from html import escape
+
+from arvore_rubro_negra import Cor
+
+
+# Conectores do texto: (filho esquerdo, filho direito, continuação, vazio)
+CONECTORES_UNICODE = ("├── ", "└── ", "│   ", "    ")
+CONECTORES_COMPACTOS = ("+-", "\\-", "| ", "  ")
+
+# Geometria do SVG, em pixels
+ESPACO_X = 28
+ESPACO_Y = 56
+RAIO = 11
+MARGEM = 20
+
+
+def exportar_texto(arvore, saida, compacto=False):
+    """Escreve a árvore como texto indentado, uma linha por nó.
+
+    O formato padrão é o de `imprimir_estrutura`. Com `compacto=True`, usa
+    só caracteres ASCII e dois caracteres de recuo por nível.
+    """
+    esquerdo, direito, continua, vazio = CONECTORES_COMPACTOS if compacto else CONECTORES_UNICODE
+    NIL = arvore.NIL
+    if arvore.raiz is NIL:
+        return
+
+    # Cada item: (nó, prefixo da linha, é o filho direito)
+    pilha = [(arvore.raiz, "", True)]
+    while pilha:
+        no, prefixo, e_direito = pilha.pop()
+        saida.write(f"{prefixo}{direito if e_direito else esquerdo}{no}\n")
+        if no.esquerda is NIL and no.direita is NIL:
+            continue
+        prefixo_filhos = prefixo + (vazio if e_direito else continua)
+        # Direito empilhado antes para o esquerdo sair primeiro
+        if no.direita is not NIL:
+            pilha.append((no.direita, prefixo_filhos, True))
+        if no.esquerda is not NIL:
+            pilha.append((no.esquerda, prefixo_filhos, False))
+
+
+def exportar_dot(arvore, saida, nome="ArvoreRubroNegra"):
+    """Escreve a árvore na linguagem DOT do Graphviz"""
+    NIL = arvore.NIL
+    saida.write(f'digraph "{_escapar_dot(nome)}" {{\n')
+    saida.write('    node [shape=circle, style=filled, fontcolor=white, fontname="Helvetica"];\n')
+    saida.write('    edge [arrowhead=none];\n')
+
+    pilha = [arvore.raiz] if arvore.raiz is not NIL else []
+    while pilha:
+        no = pilha.pop()
+        cor = "red" if no.cor == Cor.VERMELHO else "black"
+        saida.write(f'    n{id(no)} [label="{_escapar_dot(no.valor)}", fillcolor={cor}];\n')
+        if no.pai is not None:
+            saida.write(f'    n{id(no.pai)} -> n{id(no)};\n')
+        if no.direita is not NIL:
+            pilha.append(no.direita)
+        if no.esquerda is not NIL:
+            pilha.append(no.esquerda)
+
+    saida.write("}\n")
+
+
+def exportar_svg(arvore, saida):
+    """Escreve a árvore como SVG, com x = posição do nó na ordem e y = nível.
+
+    Com as estatísticas de ordem ligadas, a posição de cada filho sai do
+    tamanho das subárvores, e o percurso guarda só a pilha. Sem elas, as
+    posições vêm de um percurso em ordem prévio (memória O(n)).
+    """
+    NIL = arvore.NIL
+    n = len(arvore)
+    largura = 2 * MARGEM + max(n - 1, 0) * ESPACO_X
+    altura = 2 * MARGEM + max(arvore.altura() - 1, 0) * ESPACO_Y
+    saida.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{largura}" height="{altura}" '
+                f'viewBox="0 0 {largura} {altura}" font-family="Helvetica" font-size="10" '
+                f'text-anchor="middle">\n')
+    if arvore.raiz is not NIL:
+        if arvore.estatisticas_ordem:
+            posicao = None
+            x_raiz = arvore.raiz.esquerda.tamanho
+        else:
+            posicao = {id(no): i for i, no in enumerate(arvore._iter_nos_em_ordem())}
+            x_raiz = posicao[id(arvore.raiz)]
+
+        # Cada item: (nó, posição na ordem, nível, posição do pai, nível do pai)
+        pilha = [(arvore.raiz, x_raiz, 0, None, None)]
+        while pilha:
+            no, x, nivel, x_pai, nivel_pai = pilha.pop()
+            cx, cy = MARGEM + x * ESPACO_X, MARGEM + nivel * ESPACO_Y
+            if x_pai is not None:
+                saida.write(_aresta_svg(MARGEM + x_pai * ESPACO_X, MARGEM + nivel_pai * ESPACO_Y, cx, cy))
+            cor = "red" if no.cor == Cor.VERMELHO else "black"
+            saida.write(f'<circle cx="{cx}" cy="{cy}" r="{RAIO}" fill="{cor}"/>'
+                        f'<text x="{cx}" y="{cy + 3.5}" fill="white">{escape(str(no.valor))}</text>\n')
+
+            for filho, e_direito in ((no.direita, True), (no.esquerda, False)):
+                if filho is NIL:
+                    continue
+                if posicao is not None:
+                    x_filho = posicao[id(filho)]
+                elif e_direito:
+                    x_filho = x + 1 + filho.esquerda.tamanho
+                else:
+                    x_filho = x - 1 - filho.direita.tamanho
+                pilha.append((filho, x_filho, nivel + 1, x, nivel))
+    saida.write("</svg>\n")
+
+
+def _aresta_svg(x1, y1, x2, y2):
+    """Linha entre dois centros, encurtada para não cobrir os círculos.
+
+    Como o pai é escrito antes do filho, uma linha inteira passaria por
+    cima do círculo do pai; cortá-la nas bordas dispensa uma segunda passada.
+    """
+    dx, dy = x2 - x1, y2 - y1
+    distancia = (dx * dx + dy * dy) ** 0.5
+    fx, fy = dx * RAIO / distancia, dy * RAIO / distancia
+    return (f'<line x1="{x1 + fx:.1f}" y1="{y1 + fy:.1f}" x2="{x2 - fx:.1f}" y2="{y2 - fy:.1f}" '
+            f'stroke="gray"/>\n')
+
+
+def _escapar_dot(texto):
+    """Escapa um texto para uso entre aspas no DOT"""
+    return str(texto).replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Formato por extensão de arquivo, usado por `ArvoreRubroNegra.exportar`
+EXPORTADORES = {
+    ".txt": exportar_texto,
+    ".dot": exportar_dot,
+    ".gv": exportar_dot,
+    ".svg": exportar_svg,
+}
@@ -0,0 +1,197 @@
+"""Layout "tidy tree" para desenhar árvores binárias grandes
+
+Implementa o algoritmo de Reingold–Tilford em tempo linear e de forma
+iterativa: cada subárvore é empurrada para o lado só o necessário para não
+encostar na vizinha, nível a nível, em vez de dividir um espaço fixo pela
+metade a cada nível. O módulo não depende de matplotlib; `visualizacao.py`
+converte o resultado em artistas.
+
+Com `profundidade_maxima`, subárvores abaixo desse nível são recolhidas em
+um único nó-resumo (nível de detalhe), o que mantém o desenho de árvores com
+centenas de milhares de nós em poucos milhares de elementos.
+"""
+
+# Máximo de nós desenhados antes de o nível de detalhe entrar em ação
+LIMITE_NOS_DETALHADOS = 1023
+
+
+class Layout:
+    """Posições calculadas, indexadas pela ordem de pré-ordem dos nós.
+
+    `nos[i]` é o nó original, `xs[i]`/`ys[i]` sua posição e `pais[i]` o índice
+    do pai (-1 na raiz). `resumos` mapeia o índice de um nó recolhido para
+    (quantidade de nós da subárvore, altura da subárvore).
+    """
+
+    __slots__ = ('nos', 'xs', 'ys', 'pais', 'resumos')
+
+    def __init__(self, nos, xs, ys, pais, resumos):
+        self.nos = nos
+        self.xs = xs
+        self.ys = ys
+        self.pais = pais
+        self.resumos = resumos
+
+    def __len__(self):
+        return len(self.nos)
+
+    def limites(self):
+        """Retorna (x_min, x_max, y_min, y_max) das posições"""
+        if not self.nos:
+            return 0.0, 0.0, 0.0, 0.0
+        return min(self.xs), max(self.xs), min(self.ys), max(self.ys)
+
+    def segmentos(self):
+        """Arestas pai-filho como pares de pontos"""
+        xs, ys = self.xs, self.ys
+        return [((xs[p], ys[p]), (xs[i], ys[i]))
+                for i, p in enumerate(self.pais) if p >= 0]
+
+
+def profundidade_para(total_nos, limite=LIMITE_NOS_DETALHADOS):
+    """Profundidade máxima que mantém o desenho com até `limite` nós (None: sem corte)"""
+    if total_nos <= limite:
+        return None
+    return max(1, (limite + 1).bit_length() - 1)
+
+
+def calcular_layout(raiz, filhos, profundidade_maxima=None, distancia=1.0):
+    """Posiciona os nós de uma árvore binária sem sobreposição, em O(n).
+
+    `filhos(no)` retorna (esquerdo, direito), com None para filho ausente.
+    Nós na profundidade `profundidade_maxima` (raiz = 1) que tenham filhos
+    viram resumos da subárvore. `distancia` é o afastamento horizontal mínimo
+    entre nós do mesmo nível. A raiz fica em x = 0 e o nível k em y = -k.
+    """
+    nos = []
+    pais = []
+    niveis = []
+    esquerdos = []
+    direitos = []
+    resumos = {}
+
+    # 1) Numeração em pré-ordem; filhos sempre têm índice maior que o pai
+    pilha = [(raiz, -1, False, 1)] if raiz is not None else []
+    while pilha:
+        no, pai, eh_direito, nivel = pilha.pop()
+        i = len(nos)
+        nos.append(no)
+        pais.append(pai)
+        niveis.append(nivel)
+        esquerdos.append(-1)
+        direitos.append(-1)
+        if pai >= 0:
+            if eh_direito:
+                direitos[pai] = i
+            else:
+                esquerdos[pai] = i
+
+        esquerdo, direito = filhos(no)
+        if esquerdo is None and direito is None:
+            continue
+        if profundidade_maxima is not None and nivel >= profundidade_maxima:
+            resumos[i] = _resumir(no, filhos)
+            continue
+        # O direito é empilhado primeiro para o esquerdo ser numerado antes
+        if direito is not None:
+            pilha.append((direito, i, True, nivel + 1))
+        if esquerdo is not None:
+            pilha.append((esquerdo, i, False, nivel + 1))
+
+    n = len(nos)
+    deslocamentos = [0.0] * n
+
+    # 2) Pós-ordem (pré-ordem invertida): junta os contornos dos filhos.
+    # Cada contorno é uma lista do nível mais fundo para o mais raso, mais um
+    # deslocamento comum (valor real = entrada + deslocamento, relativo à raiz
+    # da subárvore). Guardá-lo invertido permite acrescentar a raiz com
+    # append, e reaproveitar a lista do filho mais alto faz a junção custar
+    # O(altura do filho mais baixo): O(n) no total.
+    contornos = [None] * n
+    metade = distancia / 2
+    for i in range(n - 1, -1, -1):
+        e, d = esquerdos[i], direitos[i]
+        if e < 0 and d < 0:
+            contornos[i] = ([0.0], 0.0, [0.0], 0.0)
+            continue
+        if d < 0:
+            deslocamentos[e] = -metade
+            contornos[i] = _subir_contorno(contornos[e], -metade)
+            contornos[e] = None
+            continue
+        if e < 0:
+            deslocamentos[d] = metade
+            contornos[i] = _subir_contorno(contornos[d], metade)
+            contornos[d] = None
+            continue
+
+        ee, off_ee, ed, off_ed = contornos[e]
+        de, off_de, dd, off_dd = contornos[d]
+        contornos[e] = contornos[d] = None
+
+        # Menor separação entre os filhos que respeita `distancia` em todo nível comum
+        comum = min(len(ed), len(de))
+        separacao = distancia
+        for k in range(1, comum + 1):
+            folga = (ed[-k] + off_ed) - (de[-k] + off_de) + distancia
+            if folga > separacao:
+                separacao = folga
+        meio = separacao / 2
+        deslocamentos[e] = -meio
+        deslocamentos[d] = meio
+
+        esquerda = _juntar_contorno(ee, off_ee - meio, de, off_de + meio)
+        direita = _juntar_contorno(dd, off_dd + meio, ed, off_ed - meio)
+        contornos[i] = esquerda + direita
+
+    # 3) Pré-ordem: posições absolutas a partir dos deslocamentos relativos
+    xs = [0.0] * n
+    ys = [0.0] * n
+    for i in range(n):
+        if pais[i] >= 0:
+            xs[i] = xs[pais[i]] + deslocamentos[i]
+        ys[i] = -float(niveis[i])
+
+    return Layout(nos, xs, ys, pais, resumos)
+
+
+def _subir_contorno(contorno, deslocamento):
+    """Contorno de um pai com filho único deslocado por `deslocamento`"""
+    esquerda, off_e, direita, off_d = contorno
+    off_e += deslocamento
+    off_d += deslocamento
+    esquerda.append(-off_e)
+    direita.append(-off_d)
+    return esquerda, off_e, direita, off_d
+
+
+def _juntar_contorno(principal, off_principal, outro, off_outro):
+    """Contorno de um lado do pai: `principal` nos níveis que ele cobre, `outro` abaixo.
+
+    A lista mais longa é reaproveitada; só os níveis da mais curta são
+    reescritos. Termina acrescentando a raiz (x = 0).
+    """
+    if len(principal) >= len(outro):
+        lista, deslocamento = principal, off_principal
+    else:
+        lista, deslocamento = outro, off_outro
+        for k in range(1, len(principal) + 1):
+            lista[-k] = principal[-k] + off_principal - deslocamento
+    lista.append(-deslocamento)
+    return (lista, deslocamento)
+
+
+def _resumir(no, filhos):
+    """(quantidade de nós, altura) da subárvore de `no`, iterativamente"""
+    quantidade = 0
+    altura = 0
+    pilha = [(no, 1)]
+    while pilha:
+        atual, nivel = pilha.pop()
+        quantidade += 1
+        if nivel > altura:
+            altura = nivel
+        for filho in filhos(atual):
+            if filho is not None:
+                pilha.append((filho, nivel + 1))
+    return quantidade, altura
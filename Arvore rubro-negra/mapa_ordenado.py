@@ -0,0 +1,180 @@
+"""Mapa ordenado (chave → dado) sobre a Árvore Rubro-Negra
+
+`MapaOrdenado` usa a mesma descida, inserção e correções de
+`ArvoreRubroNegra`; cada nó guarda, além do `valor` usado nas comparações,
+a chave original e o dado associado. A ordem pode ser personalizada:
+
+    MapaOrdenado()                              ordem natural das chaves
+    MapaOrdenado(funcao_chave=str.lower)        ordena por funcao_chave(chave)
+    MapaOrdenado(comparador=cmp)                cmp(a, b) < 0, == 0 ou > 0
+
+Sem `funcao_chave` nem `comparador`, a própria chave é o `valor` do nó e as
+comparações de ints, floats e strs acontecem direto em C, sem nenhuma camada
+em Python. Com `funcao_chave`, o nó guarda o resultado já calculado, que é
+comparado diretamente. Só o `comparador` exige um invólucro por chave
+(`functools.cmp_to_key`, implementado em C).
+"""
+
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from functools import cmp_to_key
+
+from arvore_rubro_negra import ArvoreRubroNegra, Cor, No
+
+
+class NoMapa(No):
+    """Nó com a chave original e o dado associado"""
+    __slots__ = ('chave', 'dado')
+
+    def __init__(self, valor):
+        super().__init__(valor)
+        self.chave = valor
+        self.dado = None
+
+    def __str__(self):
+        cor_texto = "V" if self.cor == Cor.VERMELHO else "P"
+        return f"{self.chave}({cor_texto})"
+
+
+class ArvoreDoMapa(ArvoreRubroNegra):
+    """Árvore cujos nós carregam chave e dado"""
+    classe_no = NoMapa
+
+
+class _ItensOrdenados(ItemsView):
+    """Pares (chave, dado) em ordem, sem buscar cada chave de novo"""
+
+    def __iter__(self):
+        for no in self._mapping.arvore._iter_nos_em_ordem():
+            yield no.chave, no.dado
+
+
+class _DadosOrdenados(ValuesView):
+    """Dados na ordem das chaves"""
+
+    def __iter__(self):
+        for no in self._mapping.arvore._iter_nos_em_ordem():
+            yield no.dado
+
+
+class MapaOrdenado(MutableMapping):
+    """Dicionário com as chaves sempre em ordem, com operações em O(log n).
+
+    Chaves equivalentes pela ordem escolhida (mesma `funcao_chave` ou
+    `comparador` igual a 0) ocupam a mesma entrada; como em `dict`, atribuir
+    a uma entrada existente troca só o dado e mantém a chave original.
+    """
+
+    def __init__(self, itens=(), funcao_chave=None, comparador=None, **opcoes):
+        if comparador is not None:
+            envolver = cmp_to_key(comparador)
+            if funcao_chave is not None:
+                self._transformar = lambda chave: envolver(funcao_chave(chave))
+            else:
+                self._transformar = envolver
+        else:
+            self._transformar = funcao_chave
+        self.funcao_chave = funcao_chave
+        self.comparador = comparador
+        self.arvore = ArvoreDoMapa(**opcoes)
+        self.update(itens)
+
+    def _no(self, chave):
+        """Nó da chave, ou None"""
+        if self._transformar is None:
+            return self.arvore.buscar(chave)
+        return self.arvore.buscar(self._transformar(chave))
+
+    def __getitem__(self, chave):
+        no = self._no(chave)
+        if no is None:
+            raise KeyError(chave)
+        return no.dado
+
+    def get(self, chave, padrao=None):
+        no = self._no(chave)
+        return padrao if no is None else no.dado
+
+    def __setitem__(self, chave, dado):
+        transformar = self._transformar
+        valor = chave if transformar is None else transformar(chave)
+        arvore = self.arvore
+        no, novo = arvore._inserir_folha(valor)
+        no.dado = dado
+        if novo:
+            no.chave = chave
+            arvore._balancear_insercao(no)
+        else:
+            # Como em inserir_ou_atualizar: trocar o dado também é uma mutação
+            arvore.versao += 1
+        if arvore.instrumentacao is not None:
+            arvore.instrumentacao.concluir("inserir_ou_atualizar", chave)
+
+    def __delitem__(self, chave):
+        arvore = self.arvore
+        instrumentacao = arvore.instrumentacao
+        if instrumentacao is None:
+            no = self._no(chave)
+        else:
+            valor = chave if self._transformar is None else self._transformar(chave)
+            no, profundidade = arvore._buscar_com_profundidade(valor)
+            instrumentacao.iniciar(profundidade)
+        if no is None:
+            if instrumentacao is not None:
+                instrumentacao.concluir("excluir", chave)
+            raise KeyError(chave)
+        arvore._excluir_no(no)
+        arvore.tamanho -= 1
+        if instrumentacao is not None:
+            instrumentacao.concluir("excluir", chave)
+
+    def __contains__(self, chave):
+        return self._no(chave) is not None
+
+    def __len__(self):
+        return len(self.arvore)
+
+    def __iter__(self):
+        """Chaves em ordem"""
+        for no in self.arvore._iter_nos_em_ordem():
+            yield no.chave
+
+    def __reversed__(self):
+        """Chaves em ordem decrescente"""
+        arvore = self.arvore
+        if arvore.raiz is arvore.NIL:
+            return
+        no = arvore._maximo(arvore.raiz)
+        while no is not None:
+            anterior = arvore._antecessor_no(no)
+            yield no.chave
+            no = anterior
+
+    def items(self):
+        return _ItensOrdenados(self)
+
+    def values(self):
+        return _DadosOrdenados(self)
+
+    def primeiro(self):
+        """Par (chave, dado) com a menor chave; KeyError se vazio"""
+        arvore = self.arvore
+        if arvore.raiz is arvore.NIL:
+            raise KeyError("mapa vazio")
+        no = arvore._minimo(arvore.raiz)
+        return no.chave, no.dado
+
+    def ultimo(self):
+        """Par (chave, dado) com a maior chave; KeyError se vazio"""
+        arvore = self.arvore
+        if arvore.raiz is arvore.NIL:
+            raise KeyError("mapa vazio")
+        no = arvore._maximo(arvore.raiz)
+        return no.chave, no.dado
+
+    def clear(self):
+        """Esvazia a própria árvore, que mantém observador e instrumentação"""
+        self.arvore._esvaziar()
+
+    def __repr__(self):
+        itens = ", ".join(f"{chave!r}: {dado!r}" for chave, dado in self.items())
+        return f"MapaOrdenado({{{itens}}})"
@@ -0,0 +1,302 @@
+"""Persistência binária da Árvore Rubro-Negra
+
+O arquivo guarda só as chaves, em ordem crescente: a forma e as cores de
+qualquer árvore rubro-negra válida são recalculadas em O(n) por
+`ArvoreRubroNegra.from_sorted`, então não precisam ser gravadas.
+
+Formato (little-endian):
+
+    cabeçalho   16 bytes: b"ARN1", versão (u8), tipo (b'q', b'd' ou b's'),
+                2 bytes reservados, quantidade de chaves (u64)
+    tipo q/d    quantidade × 8 bytes (int64 / float64)
+    tipo s      (quantidade + 1) deslocamentos u64, seguidos das chaves em
+                UTF-8 concatenadas; a chave i ocupa [desl[i], desl[i+1])
+
+Chaves de tamanho fixo ficam alinhadas em 8 bytes, o que permite mapear o
+arquivo com `mmap` e consultar as chaves no próprio buffer (`ArvoreMapeada`),
+sem construir nenhum nó.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGICO = b"ARN1"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sBcxxQ")
+
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+# Chaves gravadas por bloco, para não materializar a árvore inteira
+TAMANHO_BLOCO = 1 << 16
+
+
+def tipo_das_chaves(chaves):
+    """Código do formato para uma sequência de chaves: 'q', 'd' ou 's'"""
+    tipo = None
+    for chave in chaves:
+        if isinstance(chave, bool):
+            raise TypeError("chaves booleanas não são suportadas")
+        if isinstance(chave, int):
+            if not INT64_MIN <= chave <= INT64_MAX:
+                raise ValueError(f"chave inteira fora do intervalo de 64 bits: {chave}")
+            atual = 'q'
+        elif isinstance(chave, float):
+            atual = 'd'
+        elif isinstance(chave, str):
+            atual = 's'
+        else:
+            raise TypeError(f"tipo de chave não suportado: {type(chave).__name__}")
+        if tipo is None or tipo == atual:
+            tipo = atual
+        elif {tipo, atual} == {'q', 'd'}:
+            raise TypeError("chaves misturam int e float; converta-as para um só tipo")
+        else:
+            raise TypeError("chaves de tipos diferentes não podem ser gravadas juntas")
+    return tipo or 'q'
+
+
+def salvar(arvore, caminho):
+    """Grava as chaves da árvore em `caminho`; a troca do arquivo é atômica"""
+    n = len(arvore)
+    tipo = tipo_das_chaves(arvore.iter_em_ordem())
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO, tipo.encode(), n))
+        if tipo == 's':
+            _gravar_textos(arquivo, arvore.iter_em_ordem(), n)
+        else:
+            _gravar_numeros(arquivo, arvore.iter_em_ordem(), tipo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def _gravar_numeros(arquivo, chaves, tipo):
+    """Escreve as chaves em blocos de `array`"""
+    bloco = array(tipo)
+    for chave in chaves:
+        bloco.append(chave)
+        if len(bloco) == TAMANHO_BLOCO:
+            _gravar_bloco(arquivo, bloco)
+            bloco = array(tipo)
+    _gravar_bloco(arquivo, bloco)
+
+
+def _gravar_bloco(arquivo, bloco):
+    if sys.byteorder != "little":
+        bloco.byteswap()
+    bloco.tofile(arquivo)
+
+
+def _gravar_textos(arquivo, chaves, n):
+    """Escreve os textos depois da tabela de deslocamentos, que é preenchida no fim"""
+    inicio_textos = CABECALHO.size + (n + 1) * 8
+    arquivo.seek(inicio_textos)
+    deslocamentos = array('Q', [0])
+    posicao = 0
+    for chave in chaves:
+        dados = chave.encode("utf-8")
+        arquivo.write(dados)
+        posicao += len(dados)
+        deslocamentos.append(posicao)
+    arquivo.seek(CABECALHO.size)
+    _gravar_bloco(arquivo, deslocamentos)
+
+
+def ler_cabecalho(dados):
+    """Valida o cabeçalho; retorna (tipo, quantidade)"""
+    if len(dados) < CABECALHO.size:
+        raise ValueError("arquivo curto demais para uma árvore salva")
+    magico, versao, tipo, n = CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ValueError("arquivo não é uma árvore rubro-negra salva")
+    if versao != VERSAO:
+        raise ValueError(f"versão de arquivo não suportada: {versao}")
+    tipo = tipo.decode()
+    if tipo not in ('q', 'd', 's'):
+        raise ValueError(f"tipo de chave desconhecido no arquivo: {tipo!r}")
+    return tipo, n
+
+
+def ler_chaves(caminho):
+    """Lista com as chaves gravadas, em ordem"""
+    with open(caminho, "rb") as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        tipo, n = ler_cabecalho(arquivo.read(CABECALHO.size))
+        if tipo == 's':
+            _conferir_tamanho(tamanho, CABECALHO.size + (n + 1) * 8, minimo=True)
+            deslocamentos = _ler_array(arquivo, 'Q', n + 1)
+            _conferir_tamanho(tamanho, CABECALHO.size + (n + 1) * 8 + deslocamentos[-1])
+            dados = arquivo.read()
+            return [dados[deslocamentos[i]:deslocamentos[i + 1]].decode("utf-8")
+                    for i in range(n)]
+        _conferir_tamanho(tamanho, CABECALHO.size + n * 8)
+        return _ler_array(arquivo, tipo, n).tolist()
+
+
+def _conferir_tamanho(tamanho, esperado, minimo=False):
+    """Recusa arquivos cujo tamanho não bate com o que o cabeçalho anuncia.
+
+    Com `minimo`, só exige que o arquivo tenha ao menos `esperado` bytes
+    (usado antes de ler a tabela de deslocamentos dos textos).
+    """
+    if tamanho < esperado or (not minimo and tamanho != esperado):
+        raise ValueError("arquivo truncado ou corrompido")
+
+
+def _ler_array(arquivo, tipo, n):
+    valores = array(tipo)
+    valores.fromfile(arquivo, n)
+    if sys.byteorder != "little":
+        valores.byteswap()
+    return valores
+
+
+class _TextosMapeados:
+    """Sequência de textos decodificados sob demanda a partir do buffer"""
+
+    __slots__ = ('dados', 'deslocamentos', 'inicio')
+
+    def __init__(self, dados, deslocamentos, inicio):
+        self.dados = dados
+        self.deslocamentos = deslocamentos
+        self.inicio = inicio
+
+    def __len__(self):
+        return len(self.deslocamentos) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        a = self.inicio + self.deslocamentos[i]
+        b = self.inicio + self.deslocamentos[i + 1]
+        return str(self.dados[a:b], "utf-8")
+
+
+class ArvoreMapeada:
+    """Consultas somente leitura direto sobre um arquivo salvo, via mmap.
+
+    Abrir custa O(1) independentemente do tamanho: as chaves ordenadas do
+    arquivo são consultadas por busca binária no buffer mapeado, e o sistema
+    operacional carrega só as páginas tocadas. Oferece a mesma interface de
+    consulta da árvore (busca, mínimo/máximo, piso/teto, rank, seleção,
+    intervalos e iteração), mas nenhuma operação de escrita.
+    """
+
+    def __init__(self, caminho):
+        if sys.byteorder != "little":
+            raise ValueError("mapeamento direto exige máquina little-endian; use carregar()")
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mapa)
+        try:
+            self.tipo, n = ler_cabecalho(self._buffer)
+            inicio = CABECALHO.size
+            tamanho = len(self._buffer)
+            if self.tipo == 's':
+                _conferir_tamanho(tamanho, inicio + (n + 1) * 8, minimo=True)
+                self._vistas = [self._buffer[inicio:inicio + (n + 1) * 8].cast('Q')]
+                _conferir_tamanho(tamanho, inicio + (n + 1) * 8 + self._vistas[0][-1])
+                self._chaves = _TextosMapeados(self._buffer, self._vistas[0], inicio + (n + 1) * 8)
+            else:
+                _conferir_tamanho(tamanho, inicio + n * 8)
+                self._vistas = [self._buffer[inicio:inicio + n * 8].cast(self.tipo)]
+                self._chaves = self._vistas[0]
+        except Exception:
+            self.fechar()
+            raise
+
+    def fechar(self):
+        """Libera o mapeamento; a árvore deixa de responder consultas"""
+        for vista in getattr(self, '_vistas', ()):
+            vista.release()
+        self._vistas = []
+        self._chaves = ()
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __iter__(self):
+        return iter(self._chaves)
+
+    def __reversed__(self):
+        chaves = self._chaves
+        return (chaves[i] for i in range(len(chaves) - 1, -1, -1))
+
+    def __contains__(self, valor):
+        return self.buscar(valor) is not None
+
+    def buscar(self, valor):
+        """Retorna a chave igual a `valor`, ou None"""
+        i = bisect_left(self._chaves, valor)
+        if i < len(self._chaves) and self._chaves[i] == valor:
+            return self._chaves[i]
+        return None
+
+    def em_ordem(self):
+        return list(self._chaves)
+
+    def minimo(self):
+        return self._chaves[0] if len(self._chaves) else None
+
+    def maximo(self):
+        return self._chaves[-1] if len(self._chaves) else None
+
+    def piso(self, valor):
+        """Maior chave <= valor, ou None"""
+        i = bisect_right(self._chaves, valor)
+        return self._chaves[i - 1] if i else None
+
+    def teto(self, valor):
+        """Menor chave >= valor, ou None"""
+        i = bisect_left(self._chaves, valor)
+        return self._chaves[i] if i < len(self._chaves) else None
+
+    def sucessor(self, valor):
+        """Menor chave > valor, ou None"""
+        i = bisect_right(self._chaves, valor)
+        return self._chaves[i] if i < len(self._chaves) else None
+
+    def antecessor(self, valor):
+        """Maior chave < valor, ou None"""
+        i = bisect_left(self._chaves, valor)
+        return self._chaves[i - 1] if i else None
+
+    def rank(self, valor):
+        """Quantidade de chaves menores que `valor`"""
+        return bisect_left(self._chaves, valor)
+
+    def selecionar(self, k):
+        """k-ésima menor chave (base 0; negativos contam do fim)"""
+        n = len(self._chaves)
+        if not -n <= k < n:
+            raise IndexError(f"índice {k} fora da árvore de {n} elementos")
+        return self._chaves[k]
+
+    def contar_intervalo(self, a, b):
+        """Quantidade de chaves em [a, b]"""
+        if b < a:
+            return 0
+        return bisect_right(self._chaves, b) - bisect_left(self._chaves, a)
+
+    def intervalo(self, a, b):
+        """Gera as chaves em [a, b], em ordem"""
+        chaves = self._chaves
+        for i in range(bisect_left(chaves, a), bisect_right(chaves, b)):
+            yield chaves[i]
@@ -0,0 +1,316 @@
+"""Registro de operações (write-ahead log) para uma árvore persistente
+
+`ArvoreDuravel` mantém em um diretório um snapshot (formato de
+`persistencia.py`) e um log somente de acréscimo com cada inserção ou
+exclusão efetiva. Uma operação só retorna depois de registrada no log, com
+a política de fsync escolhida:
+
+    Sincronizacao.SEMPRE  fsync a cada operação (nada se perde)
+    Sincronizacao.LOTE    group commit: um fsync cobre até `tamanho_lote`
+                          operações; uma thread faz o fsync das pendentes
+                          há `intervalo` s, mesmo que o log fique ocioso
+    Sincronizacao.NUNCA   cada registro é entregue ao sistema operacional,
+                          sem fsync: sobrevive à queda do processo, não à
+                          do sistema
+
+Ao abrir, o snapshot é carregado e o log é reaplicado; um registro final
+incompleto (queda no meio da escrita) é detectado pelo CRC e descartado.
+Quando o log passa de `compactar_apos` registros, a árvore vira um novo
+snapshot e o log recomeça vazio.
+
+Formato de cada registro (little-endian):
+
+    crc32 (u32) | operação (b'I' ou b'E') | tipo (b'q', b'd' ou b's') |
+    tamanho do valor (u32) | valor
+
+O CRC cobre tudo o que vem depois dele.
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+
+from arvore_rubro_negra import ArvoreRubroNegra
+from persistencia import tipo_das_chaves
+
+ARQUIVO_SNAPSHOT = "snapshot.arn"
+ARQUIVO_LOG = "operacoes.log"
+
+INSERIR = b'I'
+EXCLUIR = b'E'
+
+CABECALHO_REGISTRO = struct.Struct("<IccI")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+
+
+class Sincronizacao:
+    """Políticas de fsync do log"""
+    SEMPRE = "sempre"
+    LOTE = "lote"
+    NUNCA = "nunca"
+
+
+def codificar_registro(operacao, valor):
+    """Bytes de um registro do log"""
+    tipo = tipo_das_chaves((valor,))
+    if tipo == 'q':
+        dados = _INT64.pack(valor)
+    elif tipo == 'd':
+        dados = _FLOAT64.pack(valor)
+    else:
+        dados = valor.encode("utf-8")
+    corpo = CABECALHO_REGISTRO.pack(0, operacao, tipo.encode(), len(dados))[4:] + dados
+    return struct.pack("<I", zlib.crc32(corpo)) + corpo
+
+
+def ler_registros(caminho):
+    """Lê os registros íntegros do log.
+
+    Retorna (lista de (operação, valor), bytes válidos). A leitura para no
+    primeiro registro incompleto ou com CRC inválido.
+    """
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    registros = []
+    posicao = 0
+    tamanho_cabecalho = CABECALHO_REGISTRO.size
+    while posicao + tamanho_cabecalho <= len(dados):
+        crc, operacao, tipo, tamanho = CABECALHO_REGISTRO.unpack_from(dados, posicao)
+        fim = posicao + tamanho_cabecalho + tamanho
+        if fim > len(dados) or zlib.crc32(dados[posicao + 4:fim]) != crc:
+            break
+        carga = dados[posicao + tamanho_cabecalho:fim]
+        if tipo == b'q':
+            valor = _INT64.unpack(carga)[0]
+        elif tipo == b'd':
+            valor = _FLOAT64.unpack(carga)[0]
+        else:
+            valor = carga.decode("utf-8")
+        registros.append((operacao, valor))
+        posicao = fim
+    return registros, posicao
+
+
+def _sincronizar_diretorio(diretorio):
+    """fsync do diretório, para que renomeações sobrevivam a uma queda"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows não permite abrir diretórios
+    descritor = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+class RegistroOperacoes:
+    """Log somente de acréscimo com fsync em lote (group commit).
+
+    `registrar` sempre entrega o registro ao sistema operacional antes de
+    retornar, então só uma queda do sistema (não a do processo) perde dados.
+    No modo LOTE, `registrar` retorna antes do fsync: uma queda pode perder
+    as operações ainda pendentes, no máximo as `tamanho_lote` mais recentes
+    e nunca as retornadas há mais de `intervalo` s (mais o tempo do próprio
+    fsync). Com registros pendentes, uma thread de fundo faz o fsync quando o
+    prazo vence e termina assim que o log fica em dia. `sincronizar()` dá
+    um ponto de durabilidade explícito.
+    """
+
+    def __init__(self, caminho, sincronizacao=Sincronizacao.LOTE, tamanho_lote=64, intervalo=0.05):
+        if sincronizacao not in (Sincronizacao.SEMPRE, Sincronizacao.LOTE, Sincronizacao.NUNCA):
+            raise ValueError(f"política de sincronização desconhecida: {sincronizacao!r}")
+        self.caminho = caminho
+        self.sincronizacao = sincronizacao
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.registros = 0          # registros no arquivo
+        self.pendentes = 0          # registros escritos ainda sem fsync
+        self.fsyncs = 0
+        self._primeiro_pendente = 0.0
+        self._trava = threading.Lock()
+        self._prazo = threading.Condition(self._trava)
+        self._sincronizador = None
+        self._arquivo = open(caminho, "ab")
+
+    def registrar(self, operacao, valor):
+        """Acrescenta um registro e aplica a política de fsync"""
+        registro = codificar_registro(operacao, valor)
+        with self._trava:
+            self._arquivo.write(registro)
+            # Sai do buffer do Python já aqui: uma queda do processo não perde o registro
+            self._arquivo.flush()
+            self.registros += 1
+            if self.pendentes == 0:
+                self._primeiro_pendente = time.monotonic()
+                if self.sincronizacao == Sincronizacao.LOTE and self._sincronizador is None:
+                    self._sincronizador = threading.Thread(target=self._sincronizar_no_prazo, daemon=True,
+                                                           name="registro-operacoes-fsync")
+                    self._sincronizador.start()
+            self.pendentes += 1
+            if self.sincronizacao == Sincronizacao.SEMPRE:
+                self._sincronizar()
+            elif self.sincronizacao == Sincronizacao.LOTE and (
+                    self.pendentes >= self.tamanho_lote
+                    or time.monotonic() - self._primeiro_pendente >= self.intervalo):
+                self._sincronizar()
+
+    def _sincronizar_no_prazo(self):
+        """Thread do modo LOTE: fsync quando o registro pendente mais antigo completa `intervalo` s"""
+        with self._prazo:
+            while self.pendentes and not self._arquivo.closed:
+                restante = self._primeiro_pendente + self.intervalo - time.monotonic()
+                if restante > 0:
+                    self._prazo.wait(restante)
+                else:
+                    self._sincronizar()
+            self._sincronizador = None
+
+    def sincronizar(self):
+        """Força o fsync dos registros pendentes"""
+        with self._trava:
+            self._sincronizar()
+
+    def _sincronizar(self):
+        self._arquivo.flush()
+        if self.pendentes:
+            os.fsync(self._arquivo.fileno())
+            self.fsyncs += 1
+            self.pendentes = 0
+
+    def reiniciar(self):
+        """Troca o log por um arquivo vazio (depois de um snapshot)"""
+        with self._trava:
+            self._arquivo.close()
+            temporario = f"{self.caminho}.tmp"
+            with open(temporario, "wb") as vazio:
+                os.fsync(vazio.fileno())
+            os.replace(temporario, self.caminho)
+            _sincronizar_diretorio(os.path.dirname(os.path.abspath(self.caminho)))
+            self._arquivo = open(self.caminho, "ab")
+            self.registros = 0
+            self.pendentes = 0
+
+    def fechar(self):
+        with self._trava:
+            if not self._arquivo.closed:
+                self._sincronizar()
+                self._arquivo.close()
+            self._prazo.notify_all()
+
+
+class ArvoreDuravel:
+    """Árvore rubro-negra cujas mutações sobrevivem a reinícios e quedas.
+
+    As consultas vão direto para `self.arvore`; as mutações devem passar por
+    `inserir` e `excluir` desta classe, que registram no log as operações que
+    vão mudar a árvore antes de aplicá-las (write-ahead): se o registro
+    falhar, a árvore em memória fica como estava.
+    """
+
+    def __init__(self, diretorio, sincronizacao=Sincronizacao.LOTE, tamanho_lote=64, intervalo=0.05,
+                 compactar_apos=100_000, **opcoes):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.compactar_apos = compactar_apos
+        self.caminho_snapshot = os.path.join(diretorio, ARQUIVO_SNAPSHOT)
+        caminho_log = os.path.join(diretorio, ARQUIVO_LOG)
+
+        if os.path.exists(self.caminho_snapshot):
+            self.arvore = ArvoreRubroNegra.carregar(self.caminho_snapshot, **opcoes)
+        else:
+            self.arvore = ArvoreRubroNegra(**opcoes)
+        self.reaplicadas = self._reaplicar(caminho_log)
+
+        self.log = RegistroOperacoes(caminho_log, sincronizacao, tamanho_lote, intervalo)
+        self.log.registros = self.reaplicadas
+        # Uma chave qualquer da árvore, para recusar valores de outro tipo
+        self._exemplo = None
+
+    def _reaplicar(self, caminho_log):
+        """Reaplica o log sobre o snapshot e corta um final corrompido"""
+        if not os.path.exists(caminho_log):
+            return 0
+        registros, validos = ler_registros(caminho_log)
+        if validos < os.path.getsize(caminho_log):
+            with open(caminho_log, "r+b") as arquivo:
+                arquivo.truncate(validos)
+                os.fsync(arquivo.fileno())
+        # Reaplicar é idempotente: o estado final de cada chave é o da sua última operação
+        arvore = self.arvore
+        estrito, arvore.estrito = arvore.estrito, False
+        try:
+            for operacao, valor in registros:
+                if operacao == INSERIR:
+                    arvore.inserir(valor)
+                else:
+                    arvore.excluir(valor)
+        finally:
+            arvore.estrito = estrito
+        return len(registros)
+
+    def inserir(self, valor):
+        """Registra e insere; mesmo retorno de `ArvoreRubroNegra.inserir`"""
+        self._conferir_tipo(valor)
+        if valor in self.arvore:
+            return self.arvore.inserir(valor)  # rejeição como na árvore (observador, modo estrito)
+        self.log.registrar(INSERIR, valor)
+        self.arvore.inserir(valor)
+        self._compactar_se_preciso()
+        return True
+
+    def excluir(self, valor):
+        """Registra e exclui; mesmo retorno de `ArvoreRubroNegra.excluir`"""
+        if valor not in self.arvore:
+            return self.arvore.excluir(valor)
+        self.log.registrar(EXCLUIR, valor)
+        self.arvore.excluir(valor)
+        self._compactar_se_preciso()
+        return True
+
+    def _conferir_tipo(self, valor):
+        """Recusa valores que o log ou o snapshot não gravariam junto das chaves atuais"""
+        if not len(self.arvore):
+            self._exemplo = None
+        elif self._exemplo is None:
+            self._exemplo = self.arvore.minimo()
+        tipo_das_chaves((valor,) if self._exemplo is None else (self._exemplo, valor))
+
+    def _compactar_se_preciso(self):
+        if self.compactar_apos is not None and self.log.registros >= self.compactar_apos:
+            self.compactar()
+
+    def compactar(self):
+        """Grava a árvore como novo snapshot e esvazia o log.
+
+        O snapshot é trocado atomicamente antes de o log ser esvaziado: uma
+        queda entre os dois passos só faz o log antigo ser reaplicado sobre o
+        snapshot novo, o que dá o mesmo resultado.
+        """
+        self.log.sincronizar()
+        self.arvore.salvar(self.caminho_snapshot)
+        _sincronizar_diretorio(self.diretorio)
+        self.log.reiniciar()
+
+    def sincronizar(self):
+        """Garante em disco todas as operações já retornadas"""
+        self.log.sincronizar()
+
+    def fechar(self):
+        self.log.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def __len__(self):
+        return len(self.arvore)
+
+    def __contains__(self, valor):
+        return valor in self.arvore
+
+    def __iter__(self):
+        return iter(self.arvore)
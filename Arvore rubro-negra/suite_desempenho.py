@@ -0,0 +1,255 @@
+"""
+SUÍTE DE DESEMPENHO - ÁRVORE RUBRO-NEGRA
+========================================
+Cargas padronizadas e reproduzíveis (mesma semente, mesmas operações), com
+resultados em JSON e comparação contra uma execução de referência.
+
+Cargas:
+    sequencial   insere 0..n-1 em ordem crescente, a partir da árvore vazia
+    aleatoria    insere uma permutação aleatória de 0..n-1
+    zipf         n chaves pré-carregadas; 90% buscas, 5% inserções e 5%
+                 exclusões com chaves em distribuição de Zipf (s = 1,1)
+    exclusao     n chaves pré-carregadas; 80% exclusões e 20% inserções
+    mista        n chaves pares pré-carregadas; 50% buscas, 25% inserções e
+                 25% exclusões em [0, 2n)
+
+Para cada carga e tamanho são medidos:
+    - vazão (ops/s), a melhor de `repeticoes` execuções cronometradas;
+    - latência por operação (p50, p90, p99, p99.9 e máxima, em ns), em uma
+      amostra de uma a cada `PASSO_LATENCIA` operações;
+    - pico de memória (tracemalloc) e os contadores de `arvore.instrumentar()`
+      (rotações, recolorações, iterações de correção e profundidade média),
+      em uma execução à parte, para não distorcer os tempos.
+
+Uso:
+    python suite_desempenho.py --tamanhos 1000 100000 --saida atual.json
+    python suite_desempenho.py --base atual.json --tolerancia 0.1
+
+Com `--base`, a vazão, o p99 e a memória são comparados com a referência; o
+programa termina com código 1 se alguma métrica piorou além da tolerância.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+from itertools import accumulate
+
+from arvore_rubro_negra import ArvoreRubroNegra
+
+CARGAS = ("sequencial", "aleatoria", "zipf", "exclusao", "mista")
+TAMANHOS = (1_000, 10_000, 100_000)
+PASSO_LATENCIA = 16
+PERCENTIS = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("p99.9", 0.999))
+
+BUSCAR, INSERIR, EXCLUIR = 0, 1, 2
+
+
+def gerar_carga(carga, n, semente):
+    """Retorna (chaves pré-carregadas, tipos, valores) de uma carga.
+
+    `tipos` e `valores` são colunas compactas (bytearray e array), o que
+    permite gerar 10^7 operações sem uma tupla por operação.
+    """
+    gerador = random.Random(f"{carga}-{n}-{semente}")
+    tipos = bytearray()
+    valores = array('q')
+
+    if carga == "sequencial":
+        return range(0), bytearray([INSERIR]) * n, array('q', range(n))
+
+    if carga == "aleatoria":
+        return range(0), bytearray([INSERIR]) * n, array('q', gerador.sample(range(n), n))
+
+    if carga == "zipf":
+        pesos = list(accumulate(1.0 / (posicao ** 1.1) for posicao in range(1, n + 1)))
+        posicoes = gerador.choices(range(n), cum_weights=pesos, k=n)
+        # Espalha as chaves quentes pela árvore em vez de concentrá-las à esquerda
+        valores.extend((posicao * 2654435761) % n for posicao in posicoes)
+        for _ in range(n):
+            sorteio = gerador.random()
+            tipos.append(BUSCAR if sorteio < 0.90 else (INSERIR if sorteio < 0.95 else EXCLUIR))
+        return range(n), tipos, valores
+
+    if carga == "exclusao":
+        for _ in range(n):
+            tipos.append(EXCLUIR if gerador.random() < 0.8 else INSERIR)
+            valores.append(gerador.randrange(n))
+        return range(n), tipos, valores
+
+    if carga == "mista":
+        for _ in range(n):
+            sorteio = gerador.random()
+            tipos.append(BUSCAR if sorteio < 0.50 else (INSERIR if sorteio < 0.75 else EXCLUIR))
+            valores.append(gerador.randrange(2 * n))
+        return range(0, 2 * n, 2), tipos, valores
+
+    raise ValueError(f"carga desconhecida: {carga!r}")
+
+
+def executar_operacoes(arvore, tipos, valores, latencias=None):
+    """Aplica as operações; com `latencias`, cronometra uma a cada PASSO_LATENCIA"""
+    funcoes = (arvore.buscar, arvore.inserir, arvore.excluir)
+    if latencias is None:
+        for tipo, valor in zip(tipos, valores):
+            funcoes[tipo](valor)
+        return
+    relogio = time.perf_counter_ns
+    for i, (tipo, valor) in enumerate(zip(tipos, valores)):
+        if i % PASSO_LATENCIA:
+            funcoes[tipo](valor)
+        else:
+            inicio = relogio()
+            funcoes[tipo](valor)
+            latencias.append(relogio() - inicio)
+
+
+def percentis(latencias):
+    """Percentis e máximo de uma lista de latências em ns"""
+    if not latencias:
+        return {}
+    ordenadas = sorted(latencias)
+    resultado = {nome: ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))]
+                 for nome, q in PERCENTIS}
+    resultado["max"] = ordenadas[-1]
+    return resultado
+
+
+def medir_carga(carga, n, repeticoes=3, semente=42):
+    """Mede uma carga em um tamanho; retorna um dicionário pronto para JSON"""
+    preenchimento, tipos, valores = gerar_carga(carga, n, semente)
+
+    melhor = None
+    for _ in range(repeticoes):
+        arvore = ArvoreRubroNegra.from_sorted(preenchimento)
+        latencias = []
+        inicio = time.perf_counter()
+        executar_operacoes(arvore, tipos, valores, latencias)
+        tempo = time.perf_counter() - inicio
+        if melhor is None or tempo < melhor[0]:
+            melhor = (tempo, latencias, len(arvore))
+
+    tempo, latencias, tamanho_final = melhor
+
+    # Execução à parte: memória e rebalanceamento (tracemalloc e contadores custam tempo)
+    tracemalloc.start()
+    arvore = ArvoreRubroNegra.from_sorted(preenchimento)
+    instrumentacao = arvore.instrumentar()
+    executar_operacoes(arvore, tipos, valores)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "carga": carga,
+        "n": n,
+        "operacoes": len(tipos),
+        "tamanho_final": tamanho_final,
+        "segundos": tempo,
+        "ops_por_segundo": len(tipos) / tempo if tempo else 0.0,
+        "latencia_ns": percentis(latencias),
+        "pico_memoria_bytes": pico,
+        "rotacoes": instrumentacao.rotacoes,
+        "recoloracoes": instrumentacao.recoloracoes,
+        "iteracoes_correcao": instrumentacao.iteracoes,
+        "profundidade_media": instrumentacao.profundidade_media,
+    }
+
+
+def executar_suite(cargas=CARGAS, tamanhos=TAMANHOS, repeticoes=3, semente=42, saida=sys.stdout):
+    """Roda todas as combinações de carga e tamanho; retorna o documento de resultados"""
+    resultados = []
+    for n in tamanhos:
+        for carga in cargas:
+            resultado = medir_carga(carga, n, repeticoes, semente)
+            resultados.append(resultado)
+            if saida is not None:
+                latencia = resultado["latencia_ns"]
+                saida.write(f"   {carga:<11} n={n:<9} {resultado['ops_por_segundo']:>11,.0f} ops/s | "
+                            f"p50 {latencia['p50']:>6} ns | p99 {latencia['p99']:>7} ns | "
+                            f"{resultado['pico_memoria_bytes'] / 2**20:7.1f} MiB | "
+                            f"{resultado['rotacoes']:>9} rotações\n")
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "processadores": os.cpu_count(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "semente": semente,
+        "repeticoes": repeticoes,
+        "passo_latencia": PASSO_LATENCIA,
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, base, tolerancia=0.10):
+    """Compara dois documentos de resultados; retorna a lista de regressões.
+
+    Cada regressão é (carga, n, métrica, valor da base, valor atual). A
+    vazão piora quando cai mais que `tolerancia`; p99 e memória, quando sobem
+    mais que `tolerancia`. Rotações são determinísticas: qualquer diferença
+    entra na lista, porque indica mudança no algoritmo de balanceamento.
+    """
+    referencia = {(r["carga"], r["n"]): r for r in base["resultados"]}
+    regressoes = []
+    for resultado in atual["resultados"]:
+        anterior = referencia.get((resultado["carga"], resultado["n"]))
+        if anterior is None:
+            continue
+        chave = (resultado["carga"], resultado["n"])
+        if resultado["ops_por_segundo"] < anterior["ops_por_segundo"] * (1 - tolerancia):
+            regressoes.append((*chave, "ops_por_segundo", anterior["ops_por_segundo"],
+                               resultado["ops_por_segundo"]))
+        if resultado["latencia_ns"]["p99"] > anterior["latencia_ns"]["p99"] * (1 + tolerancia):
+            regressoes.append((*chave, "p99_ns", anterior["latencia_ns"]["p99"],
+                               resultado["latencia_ns"]["p99"]))
+        if resultado["pico_memoria_bytes"] > anterior["pico_memoria_bytes"] * (1 + tolerancia):
+            regressoes.append((*chave, "pico_memoria_bytes", anterior["pico_memoria_bytes"],
+                               resultado["pico_memoria_bytes"]))
+        if resultado["rotacoes"] != anterior["rotacoes"] and resultado["operacoes"] == anterior["operacoes"]:
+            regressoes.append((*chave, "rotacoes", anterior["rotacoes"], resultado["rotacoes"]))
+    return regressoes
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Suíte de desempenho da Árvore Rubro-Negra")
+    parser.add_argument("--cargas", nargs="+", choices=CARGAS, default=list(CARGAS))
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=list(TAMANHOS),
+                        help="quantidades de chaves (ex.: 1000 ... 10000000)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--base", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="piora relativa aceita antes de acusar regressão (padrão 0.10)")
+    opcoes = parser.parse_args(argumentos)
+
+    print(f"\n📏 SUÍTE DE DESEMPENHO (semente {opcoes.semente}, {opcoes.repeticoes} repetições)")
+    print("-"*60)
+    atual = executar_suite(opcoes.cargas, opcoes.tamanhos, opcoes.repeticoes, opcoes.semente)
+
+    if opcoes.saida:
+        with open(opcoes.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados gravados em {opcoes.saida}")
+
+    if opcoes.base:
+        with open(opcoes.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(atual, base, opcoes.tolerancia)
+        if not regressoes:
+            print(f"\n✅ Nenhuma regressão em relação a {opcoes.base} "
+                  f"(tolerância {opcoes.tolerancia:.0%})")
+            return 0
+        print(f"\n⚠️  {len(regressoes)} regressões em relação a {opcoes.base}:")
+        for carga, n, metrica, antes, depois in regressoes:
+            print(f"   {carga:<11} n={n:<9} {metrica:<20} {antes:>14,.0f} -> {depois:>14,.0f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
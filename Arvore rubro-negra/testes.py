@@ -4,7 +4,26 @@ TESTES E EXEMPLOS - ÁRVORE RUBRO-NEGRA
 Este arquivo demonstra o uso da árvore e valida suas propriedades
 """
 
-from main import ArvoreRubroNegra, Cor
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from arvore_concorrente import ArvoreConcorrente
+from arvore_particionada import ArvoreParticionada
+from arvore_rubro_negra import (ArvoreRubroNegra, Cor, Evento, ErroArvore, ErroInvariante, ErroValorDuplicado,
+                                ErroValorNaoEncontrado, No)
+from arvore_vetorial import ArvoreRubroNegraVetorial
+from estresse import executar_estresse, formatar_reprodutor, reduzir, reproduzir
+from layout_arvore import calcular_layout, profundidade_para
+from mapa_ordenado import MapaOrdenado
+from registro_operacoes import ARQUIVO_LOG, INSERIR, ArvoreDuravel, Sincronizacao, codificar_registro
+from suite_desempenho import CARGAS, comparar, executar_suite, gerar_carga
 
 
 def verificar_propriedades(arvore):
@@ -46,12 +65,27 @@ def verificar_propriedades(arvore):
         print("❌ Propriedade 5 VIOLADA: Altura preta não é uniforme!")
         return False
     
+    # Aumento de estatísticas de ordem: tamanho de cada subárvore
+    if getattr(arvore, 'estatisticas_ordem', False):
+        if calcular_tamanhos_verificados(arvore.raiz, arvore.NIL) == len(arvore):
+            print(f"✅ Tamanhos de subárvore consistentes ({len(arvore)} nós)")
+        else:
+            print("❌ Tamanhos de subárvore inconsistentes!")
+            return False
+    
     print("="*60)
     print("🎉 TODAS AS PROPRIEDADES VERIFICADAS COM SUCESSO!")
     print("="*60)
     return True
 
 
+def verificar_invariantes_silencioso(arvore):
+    """Executa verificar_propriedades sem imprimir o relatório e confere com `validar`"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        valida = verificar_propriedades(arvore)
+    return valida and arvore.validar()
+
+
 def verificar_nao_ha_vermelhos_consecutivos(no, NIL):
     """Verifica se não há dois nós vermelhos consecutivos"""
     if no == NIL:
@@ -65,6 +99,18 @@ def verificar_nao_ha_vermelhos_consecutivos(no, NIL):
             verificar_nao_ha_vermelhos_consecutivos(no.direita, NIL))
 
 
+def calcular_tamanhos_verificados(no, NIL):
+    """Confere o campo tamanho de cada nó; retorna o tamanho da subárvore ou -1"""
+    if no == NIL:
+        return 0 if NIL.tamanho == 0 else -1
+    
+    esquerda = calcular_tamanhos_verificados(no.esquerda, NIL)
+    direita = calcular_tamanhos_verificados(no.direita, NIL)
+    if esquerda < 0 or direita < 0 or no.tamanho != esquerda + direita + 1:
+        return -1
+    return no.tamanho
+
+
 def calcular_altura_preta(no, NIL):
     """Calcula a altura preta de um caminho"""
     if no == NIL:
@@ -145,9 +191,11 @@ def teste_elementos_repetidos():
     
     print(f"\nTentando inserir 50 novamente (deve ser ignorado):")
     resultado = arvore.inserir(50)
+    print(f"   inserir(50) retornou {resultado}")
     
     print(f"\nTentando inserir 25 novamente (deve ser ignorado):")
     resultado = arvore.inserir(25)
+    print(f"   inserir(25) retornou {resultado}")
     
     print(f"\nNúmero de nós: {len(arvore)} (deve ser 3)")
     print(f"Em ordem: {arvore.em_ordem()}")
@@ -155,6 +203,63 @@ def teste_elementos_repetidos():
     return arvore
 
 
+def teste_inserir_ou_atualizar():
+    """Testa o modo upsert e a detecção de duplicatas em uma única descida"""
+    print("\n🧪 TESTE: Inserir ou Atualizar (upsert)")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    valores = [40, 20, 60, 10, 30, 50, 70]
+    
+    novos = [arvore.inserir_ou_atualizar(valor) for valor in valores]
+    print(f"Inserindo {valores}: novos = {novos}")
+    assert all(novos)
+    
+    repetidos = [arvore.inserir_ou_atualizar(valor) for valor in [40, 10, 70]]
+    print(f"Reinserindo [40, 10, 70]: novos = {repetidos}")
+    assert not any(repetidos)
+    
+    assert arvore.inserir(30) is False
+    assert len(arvore) == len(valores)
+    assert arvore.em_ordem() == sorted(valores)
+    print(f"Número de nós: {len(arvore)} (deve ser {len(valores)})")
+    
+    verificar_propriedades(arvore)
+    
+    return arvore
+
+
+def teste_modo_estrito_e_observador():
+    """Testa o núcleo silencioso: observador de eventos e modo estrito"""
+    print("\n🧪 TESTE: Modo Estrito e Observador")
+    print("-"*60)
+    
+    eventos = []
+    arvore = ArvoreRubroNegra()
+    arvore.observador = lambda evento, valor: eventos.append((evento, valor))
+    
+    for valor in [30, 10, 50]:
+        arvore.inserir(valor)
+    assert arvore.inserir(10) is False
+    assert arvore.excluir(99) is False
+    assert eventos == [(Evento.DUPLICADO, 10), (Evento.NAO_ENCONTRADO, 99)]
+    print(f"Eventos recebidos pelo observador: {eventos}")
+    
+    estrita = ArvoreRubroNegra(estrito=True)
+    estrita.inserir(7)
+    for operacao, erro in [(lambda: estrita.inserir(7), ErroValorDuplicado),
+                           (lambda: estrita.excluir(8), ErroValorNaoEncontrado)]:
+        try:
+            operacao()
+        except erro as e:
+            print(f"✅ Modo estrito levantou {type(e).__name__}({e})")
+        else:
+            raise AssertionError(f"{erro.__name__} não foi levantado")
+    assert len(estrita) == 1
+    
+    return arvore
+
+
 def teste_exclusao():
     """Testa exclusão de elementos"""
     print("\n🧪 TESTE 4: Exclusão de Elementos")
@@ -222,6 +327,1265 @@ def teste_busca():
     return arvore
 
 
+def teste_percursos_iterativos():
+    """Compara os percursos iterativos com uma referência recursiva"""
+    print("\n🧪 TESTE: Percursos e Busca Iterativos")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    valores = [(i * 7919) % 2003 for i in range(2003)]
+    for valor in valores:
+        arvore.inserir(valor)
+    
+    def pre_ordem_recursiva(no, resultado):
+        if no != arvore.NIL:
+            resultado.append(no.valor)
+            pre_ordem_recursiva(no.esquerda, resultado)
+            pre_ordem_recursiva(no.direita, resultado)
+        return resultado
+    
+    def pos_ordem_recursiva(no, resultado):
+        if no != arvore.NIL:
+            pos_ordem_recursiva(no.esquerda, resultado)
+            pos_ordem_recursiva(no.direita, resultado)
+            resultado.append(no.valor)
+        return resultado
+    
+    assert list(arvore) == sorted(valores)
+    assert list(reversed(arvore)) == sorted(valores, reverse=True)
+    assert arvore.pre_ordem() == pre_ordem_recursiva(arvore.raiz, [])
+    assert arvore.pos_ordem() == pos_ordem_recursiva(arvore.raiz, [])
+    assert all(valor in arvore for valor in valores)
+    assert -1 not in arvore and 2003 not in arvore
+    print(f"✅ {len(arvore)} valores percorridos em ordem, reversa, pré e pós-ordem")
+    print(f"   Altura: {arvore.altura()} | Altura preta: {arvore.altura_preta()}")
+    
+    verificar_propriedades(arvore)
+    
+    return arvore
+
+
+def teste_arvore_vetorial():
+    """Compara a árvore vetorial (colunas array) com a árvore de nós"""
+    print("\n🧪 TESTE: Árvore Vetorial com Lista Livre")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    vetorial = ArvoreRubroNegraVetorial('q')
+    valores = [50, 25, 75, 12, 37, 62, 87, 6, 18, 31, 43, 56, 68, 81, 93]
+    
+    for valor in valores:
+        arvore.inserir(valor)
+        vetorial.inserir(valor)
+    
+    for valor in [12, 50, 93, 6]:
+        arvore.excluir(valor)
+        vetorial.excluir(valor)
+    
+    # Posições liberadas devem ser reutilizadas antes de crescer as colunas
+    posicoes = len(vetorial._cores)
+    for valor in [1, 2, 3]:
+        arvore.inserir(valor)
+        vetorial.inserir(valor)
+    assert len(vetorial._cores) == posicoes
+    
+    assert vetorial.em_ordem() == arvore.em_ordem()
+    assert vetorial.pre_ordem() == arvore.pre_ordem()
+    assert vetorial.altura_preta() == arvore.altura_preta()
+    assert 37 in vetorial and 50 not in vetorial
+    print(f"Em ordem: {vetorial.em_ordem()}")
+    print(f"Posições ocupadas: {posicoes - 1} para {len(vetorial)} nós")
+    
+    verificar_propriedades(vetorial)
+    
+    return vetorial
+
+
+def teste_construcao_em_lote():
+    """Testa from_sorted, from_iterable e inserir_lote"""
+    print("\n🧪 TESTE: Construção em Lote")
+    print("-"*60)
+    
+    for n in [0, 1, 2, 3, 7, 8, 21, 100, 1023, 1024]:
+        arvore = ArvoreRubroNegra.from_sorted(range(n))
+        assert arvore.em_ordem() == list(range(n)) and len(arvore) == n
+        assert n == 0 or arvore.altura() == n.bit_length()
+        assert n == 0 or verificar_invariantes_silencioso(arvore)
+    print("✅ from_sorted produz árvores válidas e de altura mínima (n = 0..1024)")
+    
+    arvore = ArvoreRubroNegra.from_iterable([5, 3, 9, 3, 1, 9, 7])
+    assert arvore.em_ordem() == [1, 3, 5, 7, 9]
+    
+    try:
+        ArvoreRubroNegra.from_sorted([1, 3, 2])
+    except ValueError:
+        print("✅ from_sorted rejeita entrada fora de ordem")
+    else:
+        raise AssertionError("from_sorted aceitou entrada fora de ordem")
+    
+    # Lote pequeno: inserções individuais; lote grande: intercala e religa
+    no_existente = arvore.buscar(5)
+    assert arvore.inserir_lote([4, 5, 6]) == 2
+    assert arvore.inserir_lote(range(0, 200, 2)) == 98
+    esperado = sorted(set([1, 3, 5, 7, 9, 4, 6]) | set(range(0, 200, 2)))
+    assert arvore.em_ordem() == esperado and len(arvore) == len(esperado)
+    assert arvore.buscar(5) is no_existente
+    assert verificar_invariantes_silencioso(arvore)
+    print(f"✅ inserir_lote: {len(arvore)} nós, altura {arvore.altura()}")
+    
+    arvore.excluir(4)
+    arvore.inserir(1000)
+    assert verificar_invariantes_silencioso(arvore)
+    
+    return arvore
+
+
+def teste_estatisticas_de_ordem():
+    """Testa selecionar, rank e contar_intervalo após inserções e exclusões"""
+    print("\n🧪 TESTE: Estatísticas de Ordem")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    valores = [(i * 37) % 211 for i in range(0, 211, 2)]
+    for valor in valores:
+        arvore.inserir(valor)
+    for valor in valores[::3]:
+        arvore.excluir(valor)
+    arvore.inserir_ou_atualizar(valores[1])
+    arvore.inserir_lote([500, 501])
+    
+    ordenados = arvore.em_ordem()
+    assert [arvore.selecionar(k) for k in range(len(ordenados))] == ordenados
+    assert arvore.selecionar(-1) == ordenados[-1]
+    for valor in range(-1, 503):
+        assert arvore.rank(valor) == sum(1 for v in ordenados if v < valor)
+    assert arvore.contar_intervalo(10, 100) == sum(1 for v in ordenados if 10 <= v <= 100)
+    assert arvore.contar_intervalo(100, 10) == 0
+    print(f"selecionar(0..{len(ordenados) - 1}), rank e contar_intervalo conferidos")
+    print(f"Mediana: {arvore.selecionar(len(arvore) // 2)}")
+    
+    assert verificar_propriedades(arvore)
+    
+    return arvore
+
+
+def teste_consultas_de_intervalo():
+    """Testa piso/teto, sucessor/antecessor, intervalo e cursor"""
+    print("\n🧪 TESTE: Consultas de Intervalo e Cursor")
+    print("-"*60)
+    
+    valores = list(range(0, 100, 5))
+    arvore = ArvoreRubroNegra.from_sorted(valores)
+    
+    assert (arvore.minimo(), arvore.maximo()) == (0, 95)
+    assert arvore.piso(42) == 40 and arvore.teto(42) == 45
+    assert arvore.piso(40) == 40 and arvore.teto(40) == 40
+    assert arvore.sucessor(40) == 45 and arvore.antecessor(40) == 35
+    assert arvore.piso(-1) is None and arvore.teto(96) is None
+    assert arvore.sucessor(95) is None and arvore.antecessor(0) is None
+    print("✅ piso, teto, sucessor e antecessor")
+    
+    assert list(arvore.intervalo(12, 33)) == [15, 20, 25, 30]
+    assert list(arvore.intervalo(15, 15)) == [15]
+    assert list(arvore.intervalo(33, 12)) == []
+    assert list(arvore.intervalo(-10, 1000)) == valores
+    print(f"intervalo(12, 33): {list(arvore.intervalo(12, 33))}")
+    
+    cursor = arvore.cursor(42)
+    assert cursor.valor == 45
+    assert cursor.avancar() and cursor.valor == 50
+    assert cursor.retroceder() and cursor.retroceder() and cursor.valor == 40
+    
+    cursor = arvore.cursor(90)
+    assert cursor.avancar() and cursor.valor == 95
+    assert not cursor.avancar() and not cursor.valido
+    assert cursor.retroceder() and cursor.valor == 95
+    
+    cursor = arvore.cursor()
+    percorridos = [cursor.valor]
+    while cursor.avancar():
+        percorridos.append(cursor.valor)
+    assert percorridos == valores
+    assert not arvore.cursor(1000).valido
+    print("✅ Cursor percorre nos dois sentidos sem reiniciar da raiz")
+    
+    vazia = ArvoreRubroNegra()
+    assert vazia.minimo() is None and list(vazia.intervalo(0, 10)) == []
+    assert not vazia.cursor().avancar()
+    
+    return arvore
+
+
+def teste_alturas_em_cache():
+    """Confere as alturas mantidas incrementalmente contra o cálculo completo"""
+    print("\n🧪 TESTE: Alturas em Cache")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    valores = [(i * 53) % 401 for i in range(401)]
+    for passo, valor in enumerate(valores):
+        arvore.inserir(valor)
+        if passo % 3 == 0:
+            arvore.excluir(valores[passo // 2])
+        assert arvore.altura_preta() == calcular_altura_preta(arvore.raiz, arvore.NIL)
+        assert arvore.altura() == arvore._calcular_altura()
+    print(f"✅ {len(valores)} inserções: altura {arvore.altura()}, altura preta {arvore.altura_preta()}")
+    
+    for valor in list(arvore):
+        arvore.excluir(valor)
+        assert arvore.altura_preta() == calcular_altura_preta(arvore.raiz, arvore.NIL)
+    assert (arvore.altura(), arvore.altura_preta()) == (0, 1)
+    print("✅ Alturas corretas até esvaziar a árvore")
+    
+    return arvore
+
+
+def clonar_estado(arvore):
+    """Cópia completa da árvore no formato dos quadros (referência dos testes)"""
+    NIL = arvore.NIL
+    estado = {}
+    pilha = [arvore.raiz] if arvore.raiz is not NIL else []
+    while pilha:
+        no = pilha.pop()
+        estado[id(no)] = {
+            'valor': no.valor,
+            'cor': no.cor,
+            'esquerda_id': id(no.esquerda) if no.esquerda is not NIL else None,
+            'direita_id': id(no.direita) if no.direita is not NIL else None,
+            'pai_id': id(no.pai) if no.pai is not None else None
+        }
+        pilha.extend(f for f in (no.esquerda, no.direita) if f is not NIL)
+    return estado
+
+
+class ArvoreComClones(ArvoreRubroNegra):
+    """Guarda, ao lado do diário, um clone completo por quadro"""
+    def _capturar_estado(self, descricao):
+        super()._capturar_estado(descricao)
+        self.clones.append(clonar_estado(self))
+
+
+def teste_diario_animacao():
+    """Compara os quadros reconstruídos do diário com clones completos"""
+    print("\n🧪 TESTE: Diário de Animação")
+    print("-"*60)
+    
+    arvore = ArvoreComClones()
+    valores = [(i * 37) % 211 for i in range(211)]
+    quadros = 0
+    for passo, valor in enumerate(valores):
+        arvore.clones = []
+        operacao = arvore.inserir_animado
+        if passo % 3 == 2:
+            operacao, valor = arvore.excluir_animado, valores[passo // 2]
+        operacao(valor)
+        reconstruidos = list(arvore.estados_animacao)
+        assert reconstruidos == arvore.clones
+        assert len(arvore.estados_animacao) == len(arvore.descricoes_animacao)
+        assert arvore.estados_animacao[-1] == clonar_estado(arvore)
+        quadros += len(reconstruidos)
+    verificar_invariantes_silencioso(arvore)
+    print(f"✅ {quadros} quadros reconstruídos idênticos aos clones completos")
+    
+    arvore.inserir(1000)
+    try:
+        list(arvore.estados_animacao)
+        assert False, "quadros de uma versão antiga não devem ser reconstruídos"
+    except ErroArvore:
+        pass
+    print("✅ Quadros antigos são recusados depois de nova mutação")
+    
+    return arvore
+
+
+def teste_exportacao_animacao():
+    """Exporta uma animação fora da tela reaproveitando a mesma figura"""
+    print("\n🧪 TESTE: Exportação de Animação")
+    print("-"*60)
+    
+    from visualizacao import RenderizadorQuadros
+    from matplotlib.figure import Figure
+    
+    arvore = ArvoreRubroNegra.from_iterable(range(0, 60, 2))
+    assert arvore.exportar_animacao("nada.gif") == []
+    arvore.inserir_animado(31)
+    total = len(arvore.estados_animacao)
+    
+    # Os mesmos artistas servem a todos os quadros
+    renderizador = RenderizadorQuadros(Figure())
+    colecoes = len(renderizador.ax.collections)
+    maior = 0
+    for i, estado in enumerate(arvore.estados_animacao):
+        renderizador.desenhar(estado, arvore.descricoes_animacao[i], i, total)
+        maior = max(maior, len(estado))
+        # Rótulos só são criados quando o quadro tem mais nós que os anteriores
+        assert len(renderizador.ax.collections) == colecoes
+        assert len(renderizador.rotulos) == maior
+        assert sum(len(c.get_offsets()) for c in renderizador.nos.values()) == len(estado)
+        assert len(renderizador.arestas.get_segments()) == len(estado) - 1
+    print(f"✅ {total} quadros desenhados sem criar novos artistas")
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        tempos = arvore.exportar_animacao(os.path.join(diretorio, "insercao.gif"), intervalo=0.5)
+        assert len(tempos) == total
+        assert os.path.getsize(os.path.join(diretorio, "insercao.gif")) > 0
+        tempos = arvore.exportar_animacao(os.path.join(diretorio, "quadro.png"))
+        assert sorted(os.listdir(diretorio))[1:] == [f"quadro_{i:03d}.png" for i in range(1, total + 1)]
+    print(f"✅ GIF e PNGs gravados; {1000 * sum(tempos) / total:.1f} ms por quadro em média")
+    
+    try:
+        arvore.exportar_animacao("animacao.avi")
+        assert False, "formato desconhecido deve ser recusado"
+    except ValueError:
+        pass
+    print("✅ Formatos desconhecidos são recusados")
+    
+    return arvore
+
+
+def teste_layout_arvore():
+    """Layout tidy-tree: sem sobreposição, pais centrados e nível de detalhe"""
+    print("\n🧪 TESTE: Layout da Árvore")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    for valor in [(i * 71) % 1009 for i in range(1009)]:
+        arvore.inserir(valor)
+    NIL = arvore.NIL
+    
+    def filhos(no):
+        return (no.esquerda if no.esquerda is not NIL else None,
+                no.direita if no.direita is not NIL else None)
+    
+    layout = calcular_layout(arvore.raiz, filhos)
+    assert len(layout) == len(arvore)
+    niveis = {}
+    for x, y in zip(layout.xs, layout.ys):
+        niveis.setdefault(y, []).append(x)
+    for xs in niveis.values():
+        xs.sort()
+        assert all(b - a >= 1 - 1e-9 for a, b in zip(xs, xs[1:]))
+    assert len(niveis) == arvore.altura()
+    print(f"✅ {len(layout)} nós em {len(niveis)} níveis, sem sobreposição")
+    
+    # Pais ficam no meio dos dois filhos
+    filhos_por_pai = {}
+    for i, pai in enumerate(layout.pais):
+        if pai >= 0:
+            filhos_por_pai.setdefault(pai, []).append(layout.xs[i])
+    for pai, xs in filhos_por_pai.items():
+        if len(xs) == 2:
+            assert abs(sum(xs) / 2 - layout.xs[pai]) < 1e-9
+    print("✅ Cada pai está centrado sobre os filhos")
+    
+    # Nível de detalhe: os resumos contam exatamente os nós escondidos
+    profundidade = profundidade_para(len(arvore), limite=63)
+    resumido = calcular_layout(arvore.raiz, filhos, profundidade)
+    assert len(resumido) <= 63 and -min(resumido.ys) == profundidade
+    escondidos = sum(quantidade - 1 for quantidade, _ in resumido.resumos.values())
+    assert len(resumido) + escondidos == len(arvore)
+    assert profundidade_para(10) is None
+    print(f"✅ Corte no nível {profundidade}: {len(resumido)} nós desenhados, {escondidos} resumidos")
+    
+    # Iterativo: uma lista encadeada de 50 mil nós não estoura a pilha
+    lista = calcular_layout(0, lambda i: (None, i + 1 if i < 49_999 else None))
+    assert len(lista) == 50_000 and lista.xs[-1] == 49_999 * 0.5
+    print("✅ Árvore degenerada com 50.000 níveis posicionada sem recursão")
+    
+    return layout
+
+
+def teste_renderizacao_direta():
+    """O desenho padrão usa uma coleção de arestas e um scatter, sem networkx"""
+    print("\n🧪 TESTE: Renderização Direta")
+    print("-"*60)
+    
+    from matplotlib.collections import LineCollection, PathCollection
+    from matplotlib.figure import Figure
+    from visualizacao import desenhar_arvore
+    
+    arvore = ArvoreRubroNegra.from_sorted(range(2000))
+    fig = Figure()
+    layout = desenhar_arvore(fig, arvore, profundidade_maxima=arvore.altura())
+    ax = fig.axes[0]
+    linhas = [c for c in ax.collections if isinstance(c, LineCollection)]
+    pontos = [c for c in ax.collections if isinstance(c, PathCollection)]
+    assert len(linhas) == 1 and len(linhas[0].get_segments()) == len(arvore) - 1
+    assert len(pontos) == 1 and len(pontos[0].get_offsets()) == len(layout) == len(arvore)
+    assert not ax.patches
+    print(f"✅ {len(arvore)} nós em 1 LineCollection + 1 scatter, nenhum patch por nó")
+    
+    codigo = ("import sys; from matplotlib.figure import Figure; "
+              "from arvore_rubro_negra import ArvoreRubroNegra; from visualizacao import desenhar_arvore; "
+              "desenhar_arvore(Figure(), ArvoreRubroNegra.from_sorted(range(100))); "
+              "print('networkx' in sys.modules)")
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True,
+                           text=True, check=True).stdout.strip()
+    assert saida == "False"
+    print("✅ networkx não é importado pelo backend padrão")
+    
+    try:
+        desenhar_arvore(Figure(), arvore, backend="graphviz")
+        assert False, "backend desconhecido deve ser recusado"
+    except ValueError:
+        pass
+    
+    return arvore
+
+
+def imprimir_recursivo(no, NIL, prefixo, e_direita, linhas):
+    """Implementação recursiva original de imprimir_estrutura (referência)"""
+    if no != NIL:
+        linhas.append(prefixo + ("└── " if e_direita else "├── ") + str(no))
+        novo_prefixo = prefixo + ("    " if e_direita else "│   ")
+        if no.esquerda != NIL or no.direita != NIL:
+            imprimir_recursivo(no.esquerda, NIL, novo_prefixo, False, linhas)
+            imprimir_recursivo(no.direita, NIL, novo_prefixo, True, linhas)
+
+
+class ContadorEscrita:
+    """Destino de escrita que só conta caracteres"""
+    def __init__(self):
+        self.caracteres = 0
+    
+    def write(self, texto):
+        self.caracteres += len(texto)
+
+
+def teste_exportadores():
+    """Exportação em texto, DOT e SVG, escrita incrementalmente"""
+    print("\n🧪 TESTE: Exportadores de Estrutura")
+    print("-"*60)
+    
+    import xml.etree.ElementTree as ET
+    import tracemalloc
+    import exportadores
+    
+    arvore = ArvoreRubroNegra()
+    for valor in [(i * 29) % 301 for i in range(301)]:
+        arvore.inserir(valor)
+    for valor in range(0, 301, 7):
+        arvore.excluir(valor)
+    n = len(arvore)
+    
+    linhas = []
+    imprimir_recursivo(arvore.raiz, arvore.NIL, "", True, linhas)
+    texto = io.StringIO()
+    arvore.exportar(texto, "txt")
+    assert texto.getvalue().splitlines() == linhas
+    compacto = io.StringIO()
+    arvore.exportar(compacto, "txt", compacto=True)
+    assert compacto.getvalue().isascii() and len(compacto.getvalue()) < len(texto.getvalue())
+    print(f"✅ Texto idêntico à versão recursiva ({n} linhas); modo compacto só ASCII")
+    
+    dot = io.StringIO()
+    arvore.exportar(dot, "dot")
+    assert dot.getvalue().count("fillcolor=red") + dot.getvalue().count("fillcolor=black") == n
+    assert dot.getvalue().count(" -> ") == n - 1
+    print("✅ DOT com um nó por chave e uma aresta por ligação pai-filho")
+    
+    svg = io.StringIO()
+    arvore.exportar(svg, "svg")
+    raiz = ET.fromstring(svg.getvalue())
+    espaco = "{http://www.w3.org/2000/svg}"
+    xs = [int(c.get("cx")) for c in raiz.iter(espaco + "circle")]
+    rotulos = [int(t.text) for t in raiz.iter(espaco + "text")]
+    assert len(list(raiz.iter(espaco + "line"))) == n - 1
+    # x cresce com a ordem das chaves
+    ordem = sorted(zip(xs, rotulos))
+    assert [x for x, _ in ordem] == [exportadores.MARGEM + i * exportadores.ESPACO_X for i in range(n)]
+    assert [v for _, v in ordem] == arvore.em_ordem()
+    arvore.estatisticas_ordem = False
+    sem_estatisticas = io.StringIO()
+    arvore.exportar(sem_estatisticas, "svg")
+    arvore.estatisticas_ordem = True
+    assert sem_estatisticas.getvalue() == svg.getvalue()
+    print("✅ SVG válido, com nós posicionados pela ordem das chaves")
+    
+    # Memória limitada: o pico não cresce com o tamanho da saída
+    grande = ArvoreRubroNegra.from_sorted(range(100_000))
+    for formato in ("txt", "dot", "svg"):
+        destino = ContadorEscrita()
+        tracemalloc.start()
+        grande.exportar(destino, formato)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert pico < 64 * 1024, (formato, pico)
+        print(f"✅ {formato.upper()}: {destino.caracteres} caracteres escritos com pico de {pico} bytes")
+    
+    try:
+        arvore.exportar(io.StringIO(), "png")
+        assert False, "formato desconhecido deve ser recusado"
+    except ValueError:
+        pass
+    
+    return arvore
+
+
+def teste_persistencia():
+    """Salvar/carregar em binário e consultas direto do arquivo mapeado"""
+    print("\n🧪 TESTE: Persistência Binária")
+    print("-"*60)
+    
+    casos = [
+        [(i * 37) % 1001 - 500 for i in range(1001)],
+        [i / 7 for i in range(300)],
+        ["ação", "árvore", "b", "", "日本", "zz", "a"],
+        [],
+    ]
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "arvore.arn")
+        for valores in casos:
+            arvore = ArvoreRubroNegra.from_iterable(valores)
+            arvore.salvar(caminho)
+            
+            carregada = ArvoreRubroNegra.carregar(caminho)
+            assert carregada.em_ordem() == arvore.em_ordem()
+            verificar_invariantes_silencioso(carregada)
+            
+            with ArvoreRubroNegra.carregar(caminho, somente_leitura=True) as mapeada:
+                assert len(mapeada) == len(arvore) and list(mapeada) == arvore.em_ordem()
+                assert list(reversed(mapeada)) == list(reversed(arvore))
+                assert (mapeada.minimo(), mapeada.maximo()) == (arvore.minimo(), arvore.maximo())
+                for valor in valores[:50]:
+                    assert valor in mapeada and mapeada.buscar(valor) == valor
+                    assert mapeada.rank(valor) == arvore.rank(valor)
+                    assert mapeada.piso(valor) == arvore.piso(valor)
+                    assert mapeada.teto(valor) == arvore.teto(valor)
+                    assert mapeada.sucessor(valor) == arvore.sucessor(valor)
+                    assert mapeada.antecessor(valor) == arvore.antecessor(valor)
+                if len(arvore) > 2:
+                    a, b = arvore.selecionar(1), arvore.selecionar(-2)
+                    assert mapeada.selecionar(1) == a and mapeada.selecionar(-2) == b
+                    assert list(mapeada.intervalo(a, b)) == list(arvore.intervalo(a, b))
+                    assert mapeada.contar_intervalo(a, b) == arvore.contar_intervalo(a, b)
+            print(f"✅ {len(arvore)} chaves do tipo {type(valores[0]).__name__ if valores else '-'}: "
+                  f"{os.path.getsize(caminho)} bytes, recarga e mmap idênticos")
+        
+        # Inteiros ocupam exatamente 8 bytes por chave mais o cabeçalho
+        ArvoreRubroNegra.from_sorted(range(1000)).salvar(caminho)
+        assert os.path.getsize(caminho) == 16 + 8 * 1000
+        
+        for invalida in ([1, 2.5], [2**70], [(1, 2)]):
+            try:
+                ArvoreRubroNegra.from_iterable(invalida).salvar(caminho)
+                assert False, f"chaves {invalida} não deveriam ser gravadas"
+            except (TypeError, ValueError):
+                pass
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(b"nada disso")
+        try:
+            ArvoreRubroNegra.carregar(caminho)
+            assert False, "arquivo inválido deve ser recusado"
+        except ValueError:
+            pass
+        print("✅ Tipos não suportados e arquivos inválidos são recusados")
+        
+        # Arquivos truncados (ou com sobra) são recusados nos dois caminhos de leitura
+        for valores in (range(100), ["ação", "árvore", "日本"] * 10):
+            ArvoreRubroNegra.from_iterable(valores).salvar(caminho)
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+            for alterado in (conteudo[:-16], conteudo[:-3], conteudo[:40], conteudo + b"\0" * 8):
+                with open(caminho, "wb") as arquivo:
+                    arquivo.write(alterado)
+                for somente_leitura in (False, True):
+                    try:
+                        ArvoreRubroNegra.carregar(caminho, somente_leitura=somente_leitura)
+                        assert False, f"arquivo de {len(alterado)} bytes deveria ser recusado"
+                    except ValueError as erro:
+                        assert str(erro) == "arquivo truncado ou corrompido"
+        print("✅ Arquivos truncados são recusados com ValueError, inclusive no mmap")
+
+
+def teste_registro_operacoes():
+    """Log de operações: reaplicação, final corrompido e compactação"""
+    print("\n🧪 TESTE: Registro de Operações (WAL)")
+    print("-"*60)
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        referencia = ArvoreRubroNegra()
+        with ArvoreDuravel(diretorio, Sincronizacao.LOTE, tamanho_lote=16, compactar_apos=None) as duravel:
+            for i in range(300):
+                valor = (i * 37) % 200
+                if i % 3 == 2:
+                    assert duravel.excluir(valor) == referencia.excluir(valor)
+                else:
+                    assert duravel.inserir(valor) == referencia.inserir(valor)
+            registros = duravel.log.registros
+            assert duravel.log.fsyncs <= registros // 16 + 2
+        
+        # Write-ahead: um registro que falha não deixa a operação só na memória
+        with ArvoreDuravel(os.path.join(diretorio, "falha"), compactar_apos=None) as duravel:
+            duravel.inserir(1)
+            antes = duravel.log.registros
+            assert not duravel.excluir(99) and duravel.log.registros == antes
+            for invalido in (1.5, "um"):
+                try:
+                    duravel.inserir(invalido)
+                    assert False, f"{invalido!r} não combina com as chaves inteiras"
+                except TypeError:
+                    pass
+            
+            def disco_cheio(operacao, valor):
+                raise OSError("disco cheio")
+            duravel.log.registrar = disco_cheio
+            for operacao, valor in (("inserir", 2), ("excluir", 1)):
+                try:
+                    getattr(duravel, operacao)(valor)
+                    assert False, "a falha do log deve chegar a quem chamou"
+                except OSError:
+                    pass
+            assert duravel.arvore.em_ordem() == [1]
+            del duravel.log.registrar
+            duravel.compactar()
+        print("✅ Operações só mudam a árvore depois de registradas; tipos misturados são recusados")
+        
+        # Sem fsync, o registro ainda sai do processo antes de `inserir` retornar
+        with ArvoreDuravel(os.path.join(diretorio, "nunca"), Sincronizacao.NUNCA, compactar_apos=None) as nunca:
+            nunca.inserir(42)
+            caminho_nunca = os.path.join(diretorio, "nunca", ARQUIVO_LOG)
+            assert os.path.getsize(caminho_nunca) == len(codificar_registro(INSERIR, 42))
+        print("✅ Modo NUNCA: cada registro é entregue ao sistema operacional ao retornar")
+        
+        # Log ocioso no modo LOTE: as pendentes recebem fsync quando o prazo vence
+        with ArvoreDuravel(os.path.join(diretorio, "ocioso"), Sincronizacao.LOTE, tamanho_lote=1000,
+                           intervalo=0.2, compactar_apos=None) as ociosa:
+            for valor in range(3):
+                ociosa.inserir(valor)
+            assert ociosa.log.pendentes == 3
+            limite = time.monotonic() + 2.0
+            while ociosa.log.pendentes and time.monotonic() < limite:
+                time.sleep(0.01)
+            assert ociosa.log.pendentes == 0 and ociosa.log.fsyncs == 1
+        print("✅ Modo LOTE: registros de um log ocioso recebem fsync após `intervalo`")
+        
+        reaberta = ArvoreDuravel(diretorio)
+        assert reaberta.reaplicadas == registros
+        assert reaberta.arvore.em_ordem() == referencia.em_ordem()
+        verificar_invariantes_silencioso(reaberta.arvore)
+        reaberta.fechar()
+        print(f"✅ {registros} registros reaplicados reproduzem a árvore")
+        
+        # Queda no meio de uma escrita: o registro incompleto é descartado
+        caminho_log = os.path.join(diretorio, ARQUIVO_LOG)
+        with open(caminho_log, "ab") as arquivo:
+            arquivo.write(codificar_registro(INSERIR, 10_000)[:-3])
+        with ArvoreDuravel(diretorio) as reaberta:
+            assert reaberta.reaplicadas == registros and 10_000 not in reaberta
+            reaberta.inserir(10_000)
+        with ArvoreDuravel(diretorio) as reaberta:
+            assert 10_000 in reaberta and reaberta.reaplicadas == registros + 1
+        print("✅ Registro final incompleto descartado sem perder os anteriores")
+        
+        # Compactação automática: snapshot novo e log vazio
+        with ArvoreDuravel(diretorio, Sincronizacao.SEMPRE, compactar_apos=50) as duravel:
+            for valor in range(1000, 1120):
+                duravel.inserir(valor)
+            esperado = duravel.arvore.em_ordem()
+            assert duravel.log.registros < 50
+        with ArvoreDuravel(diretorio) as reaberta:
+            assert reaberta.arvore.em_ordem() == esperado
+            assert reaberta.reaplicadas < 50
+        print(f"✅ Compactação: snapshot + {reaberta.reaplicadas} registros restauram {len(esperado)} nós")
+        
+        try:
+            ArvoreDuravel(diretorio).inserir((1, 2))
+            assert False, "valores que o log não grava devem ser recusados"
+        except TypeError:
+            pass
+
+
+def teste_mapa_ordenado():
+    """MapaOrdenado: dados por chave, funcao_chave e comparador"""
+    print("\n🧪 TESTE: Mapa Ordenado")
+    print("-"*60)
+    
+    mapa = MapaOrdenado()
+    referencia = {}
+    for i in range(500):
+        chave = (i * 37) % 211
+        if i % 4 == 3:
+            if chave in referencia:
+                del mapa[chave]
+                del referencia[chave]
+            else:
+                try:
+                    del mapa[chave]
+                    assert False, "excluir chave ausente deve levantar KeyError"
+                except KeyError:
+                    pass
+        else:
+            mapa[chave] = f"dado {i}"
+            referencia[chave] = f"dado {i}"
+    assert len(mapa) == len(referencia)
+    assert list(mapa) == sorted(referencia)
+    assert list(mapa.items()) == sorted(referencia.items())
+    assert list(mapa.values()) == [referencia[c] for c in sorted(referencia)]
+    assert list(reversed(mapa)) == sorted(referencia, reverse=True)
+    assert all(mapa[c] == d for c, d in referencia.items())
+    assert mapa.get(-1) is None and mapa.get(-1, 0) == 0 and -1 not in mapa
+    assert mapa.primeiro() == min(referencia.items()) and mapa.ultimo() == max(referencia.items())
+    verificar_invariantes_silencioso(mapa.arvore)
+    print(f"✅ {len(mapa)} entradas iguais às de um dict, em ordem")
+    
+    # funcao_chave: chaves equivalentes compartilham a entrada, que guarda a original
+    nomes = MapaOrdenado({"Banana": 1, "abacaxi": 2}, funcao_chave=str.lower)
+    nomes["BANANA"] = 3
+    nomes["Caju"] = 4
+    assert list(nomes.items()) == [("abacaxi", 2), ("Banana", 3), ("Caju", 4)]
+    assert nomes["banana"] == 3 and "CAJU" in nomes
+    print(f"✅ funcao_chave=str.lower: {dict(nomes.items())}")
+    
+    # comparador: ordem decrescente
+    decrescente = MapaOrdenado(((i, i * i) for i in range(10)),
+                               comparador=lambda a, b: (a < b) - (a > b))
+    assert list(decrescente) == list(range(9, -1, -1))
+    assert decrescente[3] == 9
+    del decrescente[9]
+    assert decrescente.primeiro() == (8, 64)
+    verificar_invariantes_silencioso(decrescente.arvore)
+    print("✅ comparador decrescente mantém a ordem e as propriedades")
+    
+    arvore, versao = decrescente.arvore, decrescente.arvore.versao
+    decrescente[3] = "novo"
+    assert decrescente.arvore.versao == versao + 1
+    instrumentacao = arvore.instrumentar()
+    decrescente.clear()
+    assert len(decrescente) == 0 and list(decrescente) == []
+    assert decrescente.arvore is arvore and arvore.instrumentacao is instrumentacao
+    assert arvore.versao > versao + 1
+    decrescente[1] = 1
+    assert list(decrescente.items()) == [(1, 1)] and instrumentacao.operacoes == 1
+    print("✅ Atualizar um dado muda a versão; clear esvazia a mesma árvore")
+
+
+def teste_arvore_concorrente():
+    """ArvoreConcorrente: escritores e leitores em várias threads"""
+    print("\n🧪 TESTE: Acesso Concorrente")
+    print("-"*60)
+    
+    arvore = ArvoreConcorrente()
+    erros = []
+    
+    def escrever(inicio):
+        for valor in range(inicio, 4000, 4):
+            arvore.inserir(valor)
+        for valor in range(inicio, 4000, 8):
+            arvore.excluir(valor)
+    
+    def ler():
+        try:
+            for _ in range(200):
+                arvore.buscar(1234)
+                arvore.contar_intervalo(100, 900)
+                lista = arvore.em_ordem()
+                assert lista == sorted(lista)
+        except Exception as erro:
+            erros.append(erro)
+    
+    threads = [threading.Thread(target=escrever, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=ler) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not erros, erros
+    esperado = [v for v in range(4000) if v % 8 >= 4]
+    assert arvore.em_ordem() == esperado and len(arvore) == len(esperado)
+    verificar_invariantes_silencioso(arvore.arvore)
+    print(f"✅ 4 escritores e 4 leitores: {len(arvore)} valores corretos")
+    
+    assert list(arvore.intervalo(100, 140)) == [v for v in esperado if 100 <= v <= 140]
+    iterador = iter(arvore)
+    next(iterador)
+    arvore.inserir(-1)
+    try:
+        for _ in iterador:
+            pass
+        assert False, "iterar depois de uma mutação deve levantar ErroArvore"
+    except ErroArvore:
+        pass
+    print("✅ Iteradores detectam mutações pela versão da árvore")
+    
+    inserido, quadros = arvore.inserir_animado(5000)
+    assert inserido and quadros and all(len(q) == 2 for q in quadros)
+    print(f"✅ Inserção animada devolve {len(quadros)} quadros próprios")
+
+
+def teste_arvore_particionada():
+    """ArvoreParticionada: roteamento, lotes paralelos, divisão e junção"""
+    print("\n🧪 TESTE: Árvore Particionada")
+    print("-"*60)
+    
+    with ArvoreParticionada(tamanho_maximo=40, tamanho_minimo=10, trabalhadores=4) as particionada:
+        referencia = set()
+        for i in range(3000):
+            valor = (i * 7919) % 1000
+            if i % 5 < 3:
+                assert particionada.inserir(valor) == (valor not in referencia)
+                referencia.add(valor)
+            else:
+                assert particionada.excluir(valor) == (valor in referencia)
+                referencia.discard(valor)
+        assert particionada.em_ordem() == sorted(referencia) == list(particionada)
+        print(f"✅ {len(particionada)} valores em {len(particionada.particoes)} partições")
+        
+        lote = [(i * 31) % 2500 for i in range(1500)]
+        assert particionada.inserir_lote(lote) == len(set(lote) - referencia)
+        referencia.update(lote)
+        assert particionada.em_ordem() == sorted(referencia)
+        assert particionada.limites == sorted(particionada.limites)
+        for i, particao in enumerate(particionada.particoes):
+            assert len(particao) <= 40
+            verificar_invariantes_silencioso(particao)
+            if len(particao) and i > 0:
+                assert particao.minimo() >= particionada.limites[i - 1]
+            if len(particao) and i < len(particionada.limites):
+                assert particao.maximo() < particionada.limites[i]
+        assert particionada.validar()
+        print(f"✅ Lote dividido em {len(particionada.particoes)} partições de até 40 chaves")
+        
+        consultas = list(range(-5, 2600, 3))
+        encontrados = particionada.buscar_lote(consultas)
+        assert [no is not None for no in encontrados] == [v in referencia for v in consultas]
+        assert all(no.valor == v for no, v in zip(encontrados, consultas) if no is not None)
+        assert list(particionada.intervalo(300, 700)) == [v for v in sorted(referencia) if 300 <= v <= 700]
+        print("✅ buscar_lote e intervalo respeitam a ordem da entrada e das chaves")
+        
+        antes = len(particionada.particoes)
+        for valor in sorted(referencia)[:-5]:
+            particionada.excluir(valor)
+        assert len(particionada.particoes) < antes and len(particionada) == 5
+        assert particionada.em_ordem() == sorted(referencia)[-5:]
+        print(f"✅ Exclusões juntaram {antes} partições em {len(particionada.particoes)}")
+
+
+def teste_juntar_dividir_conjuntos():
+    """juntar/dividir pela altura preta e união, interseção e diferença"""
+    print("\n🧪 TESTE: Juntar, Dividir e Operações de Conjunto")
+    print("-"*60)
+    
+    def conferir(arvore, esperado):
+        assert arvore.em_ordem() == sorted(esperado) and len(arvore) == len(esperado)
+        assert arvore.altura_preta() == arvore._calcular_altura_preta()
+        assert not esperado or verificar_invariantes_silencioso(arvore)
+    
+    # Alturas pretas diferentes dos dois lados
+    esquerda = ArvoreRubroNegra.from_iterable(range(0, 500))
+    direita = ArvoreRubroNegra.from_iterable(range(501, 510))
+    esquerda.juntar(500, direita)
+    conferir(esquerda, range(510))
+    assert len(direita) == 0
+    direita.inserir(7)
+    assert direita.em_ordem() == [7]
+    
+    menores, encontrado, maiores = esquerda.dividir(123)
+    assert encontrado and len(esquerda) == 0
+    conferir(menores, range(123))
+    conferir(maiores, range(124, 510))
+    assert menores.selecionar(-1) == 122 and maiores.rank(300) == 176
+    menores, encontrado, maiores = maiores.dividir(123)
+    assert not encontrado and len(menores) == 0
+    menores.concatenar(maiores)
+    conferir(menores, range(124, 510))
+    try:
+        menores.juntar(0, ArvoreRubroNegra.from_iterable([1000]))
+        assert False, "juntar deve exigir esquerda < valor < direita"
+    except ValueError:
+        pass
+    print("✅ juntar/dividir/concatenar preservam ordem, cores e tamanhos")
+    
+    # Sentinela única: exclusões não a alteram e juntar não percorre as árvores
+    a, b = ArvoreRubroNegra.from_iterable(range(0, 300, 3)), MapaOrdenado(zip(range(50), range(50))).arvore
+    assert a.NIL is b.NIL is ArvoreRubroNegra().NIL
+    for valor in range(0, 300, 7):
+        a.excluir(valor)
+    assert (a.NIL.pai, a.NIL.esquerda, a.NIL.direita, a.NIL.tamanho) == (None, None, None, 0)
+    assert a.NIL.cor == Cor.PRETO
+    propria = ArvoreRubroNegra.from_iterable(range(1000, 1010))
+    sentinela = No(None)
+    sentinela.cor, sentinela.tamanho = Cor.PRETO, 0
+    propria._religar_sentinela(sentinela)
+    a.concatenar(propria)
+    assert a.NIL is b.NIL and verificar_invariantes_silencioso(a)
+    print("✅ Todas as árvores usam a mesma sentinela; sentinelas próprias são religadas")
+    
+    # As partes herdam a instrumentação; subclasses escolhem como criá-las
+    instrumentada = ArvoreRubroNegra.from_iterable(range(100))
+    instrumentacao = instrumentada.instrumentar()
+    menores, _, maiores = instrumentada.dividir(50)
+    assert menores.instrumentacao is instrumentacao and maiores.instrumentacao is instrumentacao
+    maiores.inserir(1000)
+    assert instrumentacao.operacoes == 1
+    
+    class ArvoreRotulada(ArvoreRubroNegra):
+        def __init__(self, rotulo, **opcoes):
+            super().__init__(**opcoes)
+            self.rotulo = rotulo
+        def _nova_vazia(self):
+            vazia = ArvoreRotulada(self.rotulo, estrito=self.estrito)
+            vazia.instrumentacao = self.instrumentacao
+            return vazia
+    
+    rotulada = ArvoreRotulada.from_sorted(range(20), rotulo="ids")
+    menores, _, maiores = rotulada.dividir(10)
+    assert (menores.rotulo, maiores.rotulo) == ("ids", "ids") and maiores.em_ordem() == list(range(11, 20))
+    print("✅ dividir mantém a instrumentação e aceita subclasses com outro construtor")
+    
+    casos = 0
+    for tamanho_a, tamanho_b in ((0, 5), (3, 300), (300, 3), (200, 250), (1000, 900), (40, 40)):
+        a = set(range(0, 3 * tamanho_a, 3))
+        b = set(range(0, 2 * tamanho_b, 2))
+        for operacao, esperado in (("uniao", a | b), ("intersecao", a & b), ("diferenca", a - b)):
+            arvore = ArvoreRubroNegra.from_iterable(a)
+            outra = ArvoreRubroNegra()
+            for valor in sorted(b, key=lambda v: (v * 7919) % 10007):
+                outra.inserir(valor)
+            assert getattr(arvore, operacao)(outra) is arvore and len(outra) == 0
+            conferir(arvore, esperado)
+            casos += 1
+    print(f"✅ {casos} combinações de união, interseção e diferença conferidas")
+
+
+def teste_suite_desempenho():
+    """Suíte de desempenho: cargas reproduzíveis, JSON e comparação com a base"""
+    print("\n🧪 TESTE: Suíte de Desempenho")
+    print("-"*60)
+    
+    for carga in CARGAS:
+        assert gerar_carga(carga, 200, 7) == gerar_carga(carga, 200, 7)
+    print(f"✅ {len(CARGAS)} cargas geradas de forma reproduzível")
+    
+    base = executar_suite(tamanhos=(300,), repeticoes=1, saida=None)
+    atual = json.loads(json.dumps(base))
+    assert len(atual["resultados"]) == len(CARGAS)
+    for resultado in atual["resultados"]:
+        assert resultado["ops_por_segundo"] > 0 and resultado["pico_memoria_bytes"] > 0
+        assert set(resultado["latencia_ns"]) == {"p50", "p90", "p99", "p99.9", "max"}
+    sequencial = atual["resultados"][0]
+    assert sequencial["tamanho_final"] == 300 and sequencial["rotacoes"] > 0
+    assert comparar(atual, base) == []
+    print("✅ Resultados serializáveis em JSON; sem regressões contra si mesmos")
+    
+    sequencial["ops_por_segundo"] /= 2
+    sequencial["rotacoes"] += 1
+    metricas = {metrica for _, _, metrica, _, _ in comparar(atual, base)}
+    assert metricas == {"ops_por_segundo", "rotacoes"}
+    print("✅ Queda de vazão e mudança nas rotações apontadas como regressão")
+
+
+def teste_instrumentacao():
+    """Contadores de rotações, recolorações, iterações e profundidade"""
+    print("\n🧪 TESTE: Instrumentação do Rebalanceamento")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra()
+    assert arvore.instrumentacao is None
+    operacoes = []
+    instrumentacao = arvore.instrumentar(lambda *dados: operacoes.append(dados))
+    for valor in (1, 2, 3):
+        arvore.inserir(valor)
+    # 1: raiz; 2: filho vermelho sem correção; 3: caso 3 com uma rotação e duas recolorações
+    assert operacoes == [("inserir", 1, 1, 0, 0, 0), ("inserir", 2, 2, 0, 0, 0),
+                         ("inserir", 3, 3, 1, 2, 1)]
+    arvore.inserir(4)
+    assert operacoes[-1] == ("inserir", 4, 3, 0, 4, 1)  # caso 1 até a raiz e raiz enegrecida
+    arvore.inserir(4)
+    assert operacoes[-1] == ("inserir", 4, 3, 0, 0, 0)
+    print("✅ Casos da inserção contados operação a operação")
+    
+    # Exclusão: a profundidade vem da própria descida que localiza o nó
+    completa = ArvoreRubroNegra.from_sorted(range(7))
+    exclusoes = []
+    completa.instrumentar(lambda *dados: exclusoes.append(dados[:3]))
+    for valor in (3, 100, 0):
+        completa.excluir(valor)
+    assert exclusoes == [("excluir", 3, 1), ("excluir", 100, 3), ("excluir", 0, 3)]
+    print("✅ Exclusões registram os nós visitados em uma só descida")
+    
+    for valor in range(5, 200):
+        arvore.inserir(valor)
+    assert arvore.altura() <= instrumentacao.profundidade_maxima <= 2 * len(arvore).bit_length()
+    for valor in range(0, 200, 3):
+        arvore.excluir(valor)
+    assert len(operacoes) == instrumentacao.operacoes == 5 + 195 + 67
+    for campo, indice in (("rotacoes", 3), ("recoloracoes", 4), ("iteracoes", 5)):
+        assert getattr(instrumentacao, campo) == sum(dados[indice] for dados in operacoes)
+    assert any(dados[0] == "excluir" and dados[3] for dados in operacoes)
+    print(f"✅ Totais = soma das operações: {instrumentacao.como_dict()}")
+    
+    # Lotes, união, diferença e versões animadas também fecham cada operação
+    base = ArvoreRubroNegra.from_sorted(range(0, 4000, 2))
+    registradas = []
+    medicao = base.instrumentar(lambda *dados: registradas.append(dados))
+    assert base.inserir_lote([1, 3, 5, 3]) == 3
+    base.uniao(ArvoreRubroNegra.from_iterable([7, 9, 10]))
+    base.diferenca(ArvoreRubroNegra.from_iterable([0, 1, 11]))
+    base.inserir_animado(13)
+    base.excluir_animado(2)
+    assert [dados[:2] for dados in registradas] == [
+        ("inserir_lote", 1), ("inserir_lote", 3), ("inserir_lote", 5), ("uniao", 7), ("uniao", 9), ("uniao", 10),
+        ("diferenca", 0), ("diferenca", 1), ("diferenca", 11), ("inserir_animado", 13), ("excluir_animado", 2)]
+    assert medicao.operacoes == len(registradas) and all(dados[2] > 1 for dados in registradas)
+    for campo, indice in (("rotacoes", 3), ("recoloracoes", 4), ("iteracoes", 5)):
+        assert getattr(medicao, campo) == sum(dados[indice] for dados in registradas)
+    print("✅ inserir_lote, uniao, diferenca e operações animadas concluem cada valor")
+    
+    # MapaOrdenado usa os mesmos passos internos e também conclui cada operação
+    mapa = MapaOrdenado()
+    do_mapa = []
+    medicao = mapa.arvore.instrumentar(lambda *dados: do_mapa.append(dados))
+    for chave in ("a", "b", "c", "a"):
+        mapa[chave] = chave.upper()
+    del mapa["b"]
+    try:
+        del mapa["z"]
+        assert False, "chave ausente deve levantar KeyError"
+    except KeyError:
+        pass
+    assert [dados[:3] for dados in do_mapa] == [("inserir_ou_atualizar", "a", 1), ("inserir_ou_atualizar", "b", 2),
+                                                ("inserir_ou_atualizar", "c", 3), ("inserir_ou_atualizar", "a", 2),
+                                                ("excluir", "b", 1), ("excluir", "z", 1)]
+    assert medicao.operacoes == 6 and medicao.rotacoes == sum(dados[3] for dados in do_mapa) == 1
+    print("✅ MapaOrdenado: atribuições e exclusões entram nos totais e no observador")
+    
+    # Mesmas rotações do contador que sobrescreve os métodos de rotação
+    class ContandoRotacoes(ArvoreRubroNegra):
+        rotacoes = 0
+        def rotacao_esquerda(self, x, capturar_estado=False):
+            self.rotacoes += 1
+            super().rotacao_esquerda(x, capturar_estado)
+        def rotacao_direita(self, y, capturar_estado=False):
+            self.rotacoes += 1
+            super().rotacao_direita(y, capturar_estado)
+    
+    contando = ContandoRotacoes()
+    instrumentada = ArvoreRubroNegra()
+    instrumentacao = instrumentada.instrumentar()
+    for i in range(3000):
+        valor = (i * 7919) % 1000
+        operacao = "inserir" if i % 3 else "excluir"
+        getattr(contando, operacao)(valor)
+        getattr(instrumentada, operacao)(valor)
+    assert contando.rotacoes == instrumentacao.rotacoes > 0
+    instrumentada.instrumentacao = None
+    instrumentada.inserir(5000)
+    assert instrumentacao.operacoes == 3000
+    print(f"✅ {instrumentacao.rotacoes} rotações, iguais às de uma subclasse contadora")
+
+
+def teste_validacao():
+    """validar em uma passada iterativa, em etapas e por caminhos amostrados"""
+    print("\n🧪 TESTE: Validação das Invariantes")
+    print("-"*60)
+    
+    def corrompida(corromper):
+        arvore = ArvoreRubroNegra.from_iterable(range(200))
+        for valor in range(0, 200, 7):
+            arvore.excluir(valor)
+        corromper(arvore, arvore.raiz.esquerda.direita)
+        return arvore
+    
+    def recolorir_filho_vermelho(arvore, no):
+        filho = no.esquerda if no.esquerda is not arvore.NIL else no.direita
+        no.cor = filho.cor = Cor.VERMELHO
+    
+    corrupcoes = {
+        "ordem": lambda arvore, no: setattr(no, 'valor', -1),
+        "vermelhos consecutivos": recolorir_filho_vermelho,
+        "altura preta": lambda arvore, no: setattr(no, 'cor', 1 - no.cor),
+        "ponteiro de pai": lambda arvore, no: setattr(no.esquerda, 'pai', arvore.raiz),
+        "tamanho": lambda arvore, no: setattr(no, 'tamanho', no.tamanho + 1),
+        "contagem": lambda arvore, no: setattr(arvore, 'tamanho', arvore.tamanho + 1),
+        "raiz vermelha": lambda arvore, no: setattr(arvore.raiz, 'cor', Cor.VERMELHO),
+    }
+    for nome, corromper in corrupcoes.items():
+        arvore = corrompida(corromper)
+        try:
+            arvore.validar()
+            assert False, f"validar não detectou: {nome}"
+        except ErroInvariante as erro:
+            print(f"✅ {nome}: {erro}")
+    arvore = corrompida(lambda arvore, no: setattr(no, 'cor', 1 - no.cor))
+    try:
+        arvore.validar_caminhos(amostras=200)
+        assert False, "validar_caminhos não detectou a altura preta"
+    except ErroInvariante:
+        pass
+    
+    # Ciclo: um neto aponta de volta para a raiz
+    arvore = ArvoreRubroNegra.from_iterable(range(31))
+    arvore.raiz.esquerda.esquerda.esquerda = arvore.raiz
+    try:
+        arvore.validar()
+        assert False, "validar deve detectar ciclos"
+    except ErroInvariante:
+        pass
+    print("✅ Ciclo detectado sem laço infinito")
+    
+    # Cadeia de 100 mil nós: recursão estouraria a pilha; o validador não
+    NIL = ArvoreRubroNegra().NIL
+    arvore = ArvoreRubroNegra()
+    arvore.NIL = NIL
+    pai = None
+    for valor in range(100_000):
+        no = arvore.classe_no(valor)
+        no.esquerda = no.direita = NIL
+        no.pai = pai
+        no.cor = Cor.PRETO
+        if pai is None:
+            arvore.raiz = no
+        else:
+            pai.direita = no
+        pai = no
+    arvore.tamanho = 100_000
+    try:
+        arvore.validar()
+        assert False, "uma cadeia de nós pretos não tem altura preta uniforme"
+    except ErroInvariante:
+        pass
+    print("✅ Cadeia de 100 mil nós validada sem recursão")
+    
+    arvore = ArvoreRubroNegra.from_iterable(range(10_000))
+    for valor in range(0, 10_000, 3):
+        arvore.excluir(valor)
+    assert arvore.validar() and arvore.validar_caminhos(amostras=100)
+    etapas = list(arvore.validar_em_etapas(passo=1000))
+    assert len(etapas) == len(arvore) // 1000 and etapas[-1] == 6000
+    etapas = arvore.validar_em_etapas(passo=500)
+    next(etapas)
+    arvore.inserir(0)
+    try:
+        next(etapas)
+        assert False, "a validação em etapas deve notar a mutação"
+    except ErroArvore:
+        pass
+    
+    concorrente = ArvoreConcorrente(arvore)
+    assert concorrente.validar() and concorrente.validar_caminhos()
+    assert sum(1 for _ in concorrente.validar_em_etapas(passo=256)) == len(arvore) // 256
+    print("✅ Validação completa, em etapas e por amostragem em árvores válidas")
+    
+
+def teste_estresse_diferencial():
+    """Estresse diferencial contra lista ordenada e redução de traços que falham"""
+    print("\n🧪 TESTE: Estresse Diferencial")
+    print("-"*60)
+    
+    resumo = executar_estresse(30_000, universo=300, semente=3, validar_a_cada=1_000, saida=None)
+    assert resumo["falha"] is None and resumo["validacoes"] == 31
+    print(f"✅ {resumo['operacoes']:,} operações sem divergência "
+          f"({resumo['ops_por_segundo']:,.0f} ops/s)")
+    
+    class SemCorrecaoExclusao(ArvoreRubroNegra):
+        def _corrigir_exclusao(self, x, pai, capturar_estado=False):
+            x.cor = Cor.PRETO
+    
+    class BuscaCega(ArvoreRubroNegra):
+        def buscar(self, valor):
+            return None if valor == 7 else super().buscar(valor)
+    
+    for classe, maximo in ((SemCorrecaoExclusao, 10), (BuscaCega, 2)):
+        resumo = executar_estresse(50_000, universo=100, semente=5, validar_a_cada=500,
+                                   fabrica=classe, saida=None)
+        reprodutor = resumo["reprodutor"]
+        assert resumo["falha"] is not None and len(reprodutor) <= maximo
+        assert reproduzir(reprodutor, classe) is not None and reproduzir(reprodutor) is None
+        print(f"✅ {classe.__name__}: falha na operação {resumo['indice_falha']} reduzida a "
+              f"{len(reprodutor)} operações: {reprodutor}")
+    assert formatar_reprodutor(reprodutor, BuscaCega).splitlines() == [
+        "arvore = BuscaCega()", "arvore.inserir(7)", "arvore.excluir(7)", "arvore.validar()"]
+    
+    # A redução só aceita candidatos que falham do mesmo jeito que o traço original:
+    # sem o 1, inserir(0) levanta TypeError, um defeito sem relação com a busca cega
+    class FalhasDiferentes(ArvoreRubroNegra):
+        def inserir(self, valor):
+            if valor == 0 and super().buscar(1) is None:
+                raise TypeError("defeito sem relação")
+            return super().inserir(valor)
+        def buscar(self, valor):
+            return None if valor == 7 and super().buscar(1) else super().buscar(valor)
+    
+    traco = [("inserir", 1), ("inserir", 0), ("inserir", 7), ("excluir", 7)]
+    assert reproduzir(traco[1:], FalhasDiferentes).startswith("TypeError")
+    assert reduzir(traco, FalhasDiferentes) == [("inserir", 1), ("inserir", 7), ("excluir", 7)]
+    print("✅ Candidatos que falham por outro motivo são descartados na redução")
+    
+
+def teste_busca_em_lote():
+    """buscar_lote, contem_lote e posicoes_lote: descidas, percurso único e NumPy"""
+    print("\n🧪 TESTE: Busca em Lote")
+    print("-"*60)
+    
+    arvore = ArvoreRubroNegra.from_iterable(range(0, 2000, 2))
+    for consultas in ([7, 8, 8, -1, 1998, 2000], [(i * 7919) % 2500 for i in range(3000)], []):
+        esperado = [arvore.buscar(v) for v in consultas]
+        assert arvore.buscar_lote(consultas) == esperado
+        assert arvore.buscar_lote(iter(consultas)) == esperado
+        assert arvore.contem_lote(consultas) == [no is not None for no in esperado]
+        assert arvore.posicoes_lote(consultas) == [v // 2 if no else -1 for v, no in zip(consultas, esperado)]
+    print("✅ Lotes pequenos (uma descida por valor) e grandes (percurso único) iguais a buscar")
+    
+    sem_estatisticas = ArvoreRubroNegra.from_iterable(range(0, 2000, 2), estatisticas_ordem=False)
+    assert sem_estatisticas.posicoes_lote([4, 5, 1998]) == [2, -1, 999]
+    assert ArvoreRubroNegra().contem_lote([1, 2]) == [False, False]
+    palavras = ArvoreRubroNegra.from_iterable(["pera", "uva", "caqui"])
+    assert palavras.contem_lote(["uva", "kiwi"] * 10) == [True, False] * 10
+    
+    import numpy as np
+    consultas = np.arange(-5, 2005, dtype=np.int64)
+    presentes = arvore.contem_lote(consultas)
+    assert presentes.dtype == bool and presentes.sum() == 1000
+    posicoes = arvore.posicoes_lote(consultas)
+    assert posicoes.dtype == np.int64 and (posicoes[presentes] == np.arange(1000)).all()
+    assert (posicoes[~presentes] == -1).all()
+    print("✅ Arrays NumPy na entrada e na saída (bool e int64)")
+    
+    with ArvoreParticionada(tamanho_maximo=300, trabalhadores=2) as particionada:
+        particionada.inserir_lote(range(0, 2000, 2))
+        assert particionada.contem_lote(consultas) == presentes.tolist()
+        assert [no.valor for no in particionada.buscar_lote(np.array([4, 1000])) if no] == [4, 1000]
+    assert ArvoreConcorrente(arvore).contem_lote([2, 3]) == [True, False]
+    print("✅ ArvoreParticionada e ArvoreConcorrente delegam à busca em lote")
+    
+
+def teste_benchmarks_rapidos():
+    """Executa cada benchmark com entradas mínimas, para que mudanças no nó não os quebrem"""
+    print("\n🧪 TESTE: Benchmarks (execução rápida)")
+    print("-"*60)
+    
+    import benchmarks
+    
+    chamadas = [
+        (benchmarks.benchmark_memoria_por_chave, {"n": 200}),
+        (benchmarks.benchmark_tempo_importacao, {"repeticoes": 1}),
+        (benchmarks.benchmark_renderizacao, {"tamanhos": (15,)}),
+        (benchmarks.benchmark_persistencia, {"n": 500, "consultas": 100}),
+        (benchmarks.benchmark_registro_operacoes, {"n": 200}),
+        (benchmarks.benchmark_concorrencia, {"n": 200, "operacoes": 400, "threads": (1, 2)}),
+        (benchmarks.benchmark_particionada, {"n": 500, "consultas": 100, "trabalhadores": (1, 2)}),
+    ]
+    for funcao, argumentos in chamadas:
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcao(**argumentos)
+        assert resultado is not None
+        print(f"✅ {funcao.__name__}")
+
+
+def teste_importacao_leve():
+    """Garante que importar o programa não carrega matplotlib nem networkx"""
+    print("\n🧪 TESTE: Importação sem Dependências Gráficas")
+    print("-"*60)
+    
+    codigo = ("import sys, main, arvore_rubro_negra; "
+              "print(sorted(m for m in ('matplotlib', 'networkx') if m in sys.modules))")
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True,
+                           text=True, check=True).stdout.strip()
+    print(f"Módulos gráficos carregados após `import main`: {saida}")
+    assert saida == "[]"
+
+
 def teste_grande_arvore():
     """Testa árvore com muitos elementos (requisito de 21+ nós)"""
     print("\n🧪 TESTE 6: Árvore com 30 Nós")
@@ -287,8 +1651,34 @@ def executar_todos_testes():
         teste_insercao_basica,
         teste_insercao_sequencial,
         teste_elementos_repetidos,
+        teste_inserir_ou_atualizar,
+        teste_modo_estrito_e_observador,
         teste_exclusao,
         teste_busca,
+        teste_percursos_iterativos,
+        teste_arvore_vetorial,
+        teste_construcao_em_lote,
+        teste_estatisticas_de_ordem,
+        teste_consultas_de_intervalo,
+        teste_alturas_em_cache,
+        teste_diario_animacao,
+        teste_exportacao_animacao,
+        teste_layout_arvore,
+        teste_renderizacao_direta,
+        teste_exportadores,
+        teste_persistencia,
+        teste_registro_operacoes,
+        teste_mapa_ordenado,
+        teste_arvore_concorrente,
+        teste_arvore_particionada,
+        teste_juntar_dividir_conjuntos,
+        teste_suite_desempenho,
+        teste_instrumentacao,
+        teste_validacao,
+        teste_estresse_diferencial,
+        teste_busca_em_lote,
+        teste_benchmarks_rapidos,
+        teste_importacao_leve,
         teste_grande_arvore,
         teste_comparacao_altura
     ]
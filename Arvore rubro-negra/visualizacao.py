@@ -0,0 +1,359 @@
+"""Visualização da Árvore Rubro-Negra com matplotlib
+
+Este módulo concentra as dependências gráficas; ele é importado sob demanda
+por `ArvoreRubroNegra.visualizar` e `ArvoreRubroNegra.animar_operacao`.
+networkx só é usado, e importado, pelo backend opcional "networkx".
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib import animation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+from arvore_rubro_negra import Cor
+from layout_arvore import calcular_layout, profundidade_para
+
+
+class RenderizadorQuadros:
+    """Figura única cujos artistas são atualizados no lugar a cada quadro.
+
+    Arestas formam uma só `LineCollection` e os nós um `scatter` por cor; os
+    rótulos vêm de um conjunto de textos reaproveitados. Desenhar um quadro
+    só troca coordenadas, cores e textos, sem criar figura nem grafo.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = ax = fig.add_subplot()
+        ax.axis('off')
+        ax.set_aspect('equal')
+
+        self.arestas = LineCollection([], colors='#555555', linewidths=2.5, zorder=2)
+        ax.add_collection(self.arestas)
+        self.nos = {
+            Cor.VERMELHO: ax.scatter([], [], s=1100, c='red', edgecolors='black', linewidths=3, zorder=3),
+            Cor.PRETO: ax.scatter([], [], s=1100, c='black', edgecolors='black', linewidths=3, zorder=3),
+        }
+        self.rotulos = []
+        self.vazia = ax.text(0, 0, 'Árvore Vazia', ha='center', va='center', fontsize=20, visible=False)
+
+        fig.suptitle("🎬 ANIMAÇÃO: ÁRVORE RUBRO-NEGRA", fontsize=16, fontweight='bold', y=0.98)
+        self.titulo = ax.set_title("", fontsize=13, pad=20, wrap=True)
+        vermelho_patch = mpatches.Patch(color='red', label='Nó Vermelho')
+        preto_patch = mpatches.Patch(color='black', label='Nó Preto')
+        ax.legend(handles=[vermelho_patch, preto_patch], loc='upper right', fontsize=11)
+        self.info = fig.text(0.5, 0.02, "", ha='center', fontsize=12,
+                             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.9,
+                                       edgecolor='orange', linewidth=2))
+        fig.subplots_adjust(left=0.02, right=0.98, bottom=0.08, top=0.88)
+
+    def _rotulo(self, i):
+        """Texto reaproveitável de índice i, criado na primeira vez que é preciso"""
+        while len(self.rotulos) <= i:
+            self.rotulos.append(self.ax.text(0, 0, "", ha='center', va='center', fontsize=14,
+                                             fontweight='bold', color='white', zorder=4))
+        return self.rotulos[i]
+
+    def desenhar(self, estado, descricao, indice, total):
+        """Atualiza os artistas com o estado do quadro `indice` (base 0)"""
+        raiz_id = _encontrar_raiz(estado)
+        layout = calcular_layout(raiz_id, _filhos_estado(estado))
+        if layout.nos:
+            fator, escala = _enquadrar(self.ax, layout)
+        else:
+            fator, escala = 1.0, 0.0
+            self.ax.set_xlim(-5, 5)
+            self.ax.set_ylim(-2, 2)
+        pontos = [(x, y * fator, estado[node_id]['cor'], estado[node_id]['valor'])
+                  for node_id, x, y in zip(layout.nos, layout.xs, layout.ys)]
+
+        self.arestas.set_segments(_segmentos(layout, fator))
+        diametro = min(33.0, 0.7 * escala)
+        for cor, colecao in self.nos.items():
+            coordenadas = [(x, y) for x, y, c, _ in pontos if c == cor]
+            colecao.set_offsets(np.array(coordenadas, dtype=float).reshape(-1, 2))
+            colecao.set_sizes([diametro ** 2])
+        fonte = _tamanho_fonte(14.0, escala, (valor for _, _, _, valor in pontos))
+        for i, (x, y, _, valor) in enumerate(pontos):
+            rotulo = self._rotulo(i)
+            rotulo.set_position((x, y))
+            rotulo.set_text(str(valor))
+            rotulo.set_fontsize(fonte)
+            rotulo.set_visible(fonte >= TAMANHO_MINIMO_FONTE)
+        for rotulo in self.rotulos[len(pontos):]:
+            rotulo.set_visible(False)
+
+        self.vazia.set_visible(not pontos)
+
+        self.titulo.set_text(f"Passo {indice+1}/{total}: {descricao}")
+        self.info.set_text(f"Frame {indice+1}/{total}")
+
+
+# Abaixo deste tamanho (em pontos) os rótulos dos nós deixam de ser desenhados
+TAMANHO_MINIMO_FONTE = 5.0
+
+
+def _filhos_estado(estado):
+    """Acesso aos filhos de um nó de quadro de animação, para `calcular_layout`"""
+    def filhos(node_id):
+        dados = estado[node_id]
+        esquerda, direita = dados['esquerda_id'], dados['direita_id']
+        return (esquerda if esquerda in estado else None,
+                direita if direita in estado else None)
+    return filhos
+
+
+def _filhos_no(arvore):
+    """Acesso aos filhos de um nó da árvore viva, para `calcular_layout`"""
+    NIL = arvore.NIL
+    def filhos(no):
+        return (no.esquerda if no.esquerda is not NIL else None,
+                no.direita if no.direita is not NIL else None)
+    return filhos
+
+
+def _segmentos(layout, fator):
+    """Arestas do layout com os níveis esticados por `fator`"""
+    return [((x0, y0 * fator), (x1, y1 * fator)) for (x0, y0), (x1, y1) in layout.segmentos()]
+
+
+def _tamanho_fonte(maximo, escala, valores):
+    """Fonte dos rótulos: cabe no círculo do nó mesmo para o rótulo mais longo"""
+    caracteres = max((len(str(valor)) for valor in valores), default=1)
+    return min(maximo, 0.8 * escala / max(2, caracteres))
+
+
+def _enquadrar(ax, layout):
+    """Ajusta os limites do eixo ao layout; retorna (fator vertical, pontos por unidade).
+
+    O layout separa nós vizinhos por uma unidade na horizontal e níveis por
+    uma unidade na vertical. Árvores largas teriam de ser achatadas para
+    caber com aspecto igual, então os níveis são esticados por `fator` até a
+    árvore ocupar a área do eixo. "Pontos por unidade" é o tamanho, na tela,
+    do espaço entre dois nós vizinhos e serve para dimensionar marcadores e
+    texto.
+    """
+    fig = ax.figure
+    caixa = ax.get_position()
+    largura_pts = caixa.width * fig.get_figwidth() * 72
+    altura_pts = caixa.height * fig.get_figheight() * 72
+
+    x_min, x_max, y_min, _ = layout.limites()
+    largura = x_max - x_min + 2
+    altura = 1.2 - y_min
+    fator = max(1.0, largura * altura_pts / largura_pts / altura)
+
+    ax.set_xlim(x_min - 1, x_max + 1)
+    ax.set_ylim((y_min - 1.2) * fator, 0)
+    return fator, min(largura_pts / largura, altura_pts / (altura * fator))
+
+
+def animar_estados(arvore, intervalo=1.5):
+    """Exibe, passo a passo, os estados capturados por uma operação animada"""
+    total = len(arvore.estados_animacao)
+    print(f"\n🎬 Iniciando animação com {total} passos...")
+    print("   Aguarde... As janelas gráficas serão exibidas.\n")
+
+    # Uma única janela, redesenhada a cada passo
+    fig = plt.figure(figsize=(16, 10))
+    renderizador = RenderizadorQuadros(fig)
+
+    for i, (estado, descricao) in enumerate(zip(arvore.estados_animacao, arvore.descricoes_animacao)):
+        print(f"\n{'='*70}")
+        print(f"📍 PASSO {i+1}/{total}")
+        print(f"📝 {descricao}")
+        print('='*70)
+
+        try:
+            fig.canvas.manager.set_window_title(f"Animação Árvore Rubro-Negra - Passo {i+1}/{total}")
+        except:
+            pass  # Alguns backends não suportam set_window_title
+
+        renderizador.desenhar(estado, descricao, i, total)
+        fig.canvas.draw_idle()
+
+        # Mostra a figura e aguarda
+        if i < total - 1:
+            plt.show(block=False)
+            plt.pause(0.1)
+            input("   ⏸️  Pressione ENTER para próximo passo... ")
+        else:
+            print(f"\n{'='*70}")
+            print("✅ ANIMAÇÃO CONCLUÍDA!")
+            print(f"{'='*70}\n")
+            plt.show(block=True)
+
+
+class _EscritorPNG:
+    """Grava cada quadro como um PNG numerado (mesma interface dos writers)"""
+
+    def __init__(self):
+        self.fig = None
+
+    @contextmanager
+    def saving(self, fig, destino, dpi):
+        raiz, _ = os.path.splitext(destino)
+        self.fig, self.modelo, self.dpi, self.numero = fig, raiz + "_{:03d}.png", dpi, 0
+        yield self
+
+    def grab_frame(self):
+        self.numero += 1
+        self.fig.savefig(self.modelo.format(self.numero), dpi=self.dpi)
+
+
+def _escolher_escritor(destino, intervalo):
+    """Escolhe o writer pela extensão de `destino` (.mp4, .gif ou .png)"""
+    extensao = os.path.splitext(destino)[1].lower()
+    fps = 1 / intervalo
+    if extensao == ".mp4":
+        if not animation.writers.is_available("ffmpeg"):
+            raise RuntimeError("exportar MP4 exige o ffmpeg instalado; use .gif ou .png")
+        return animation.FFMpegWriter(fps=fps)
+    if extensao == ".gif":
+        return animation.PillowWriter(fps=fps)
+    if extensao == ".png":
+        return _EscritorPNG()
+    raise ValueError(f"formato de animação não suportado: {destino!r} (use .mp4, .gif ou .png)")
+
+
+def exportar_animacao(arvore, destino, intervalo=1.5, dpi=100):
+    """Renderiza os quadros fora da tela direto para MP4, GIF ou PNGs numerados.
+
+    Usa uma figura Agg sem janela e um único `RenderizadorQuadros`. Retorna o
+    tempo (em segundos) gasto para desenhar e gravar cada quadro.
+    """
+    escritor = _escolher_escritor(destino, intervalo)
+    total = len(arvore.estados_animacao)
+
+    fig = Figure(figsize=(16, 10))
+    FigureCanvasAgg(fig)
+    renderizador = RenderizadorQuadros(fig)
+
+    tempos = []
+    with escritor.saving(fig, destino, dpi):
+        for i, (estado, descricao) in enumerate(zip(arvore.estados_animacao, arvore.descricoes_animacao)):
+            inicio = time.perf_counter()
+            renderizador.desenhar(estado, descricao, i, total)
+            escritor.grab_frame()
+            tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def _encontrar_raiz(estado):
+    """Encontra ID da raiz no estado"""
+    # A raiz é o nó que não tem pai
+    for node_id, dados in estado.items():
+        if dados['pai_id'] is None:
+            return node_id
+    return None
+
+
+# Formas de desenhar arestas e nós em `desenhar_arvore`
+BACKENDS = ("matplotlib", "networkx")
+
+
+def visualizar_arvore(arvore, titulo="Árvore Rubro-Negra", salvar=None, profundidade_maxima=None,
+                      backend="matplotlib"):
+    """Desenha a árvore (não vazia) em uma janela matplotlib e opcionalmente salva"""
+    fig = plt.figure(figsize=(16, 10))
+    desenhar_arvore(fig, arvore, titulo, profundidade_maxima, backend)
+
+    if salvar:
+        fig.savefig(salvar, dpi=300, bbox_inches='tight')
+
+    plt.show()
+
+
+def desenhar_arvore(fig, arvore, titulo="Árvore Rubro-Negra", profundidade_maxima=None,
+                    backend="matplotlib"):
+    """Desenha a árvore (não vazia) em `fig`; retorna o layout usado.
+
+    Sem `profundidade_maxima`, árvores com mais de `LIMITE_NOS_DETALHADOS`
+    nós são cortadas automaticamente no nível que cabe no limite; as
+    subárvores abaixo dele aparecem como triângulos com a contagem de nós.
+
+    O backend "matplotlib" desenha todas as arestas como uma única
+    `LineCollection` e todos os nós como um único `scatter`. O backend
+    "networkx" (requer networkx instalado) monta um `DiGraph` e desenha um
+    círculo por nó; fica disponível para comparação.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend desconhecido: {backend!r} (use {' ou '.join(BACKENDS)})")
+
+    ax = fig.add_subplot()
+    ax.axis('off')
+    ax.set_aspect('equal')
+
+    # Título e legenda antes do tight_layout: o tamanho final do eixo define a escala
+    ax.set_title(titulo, fontsize=16, fontweight='bold', pad=20)
+    vermelho_patch = mpatches.Patch(color='red', label='Nó Vermelho')
+    preto_patch = mpatches.Patch(color='black', label='Nó Preto')
+    ax.legend(handles=[vermelho_patch, preto_patch], loc='upper right')
+    fig.tight_layout()
+
+    if profundidade_maxima is None:
+        profundidade_maxima = profundidade_para(len(arvore))
+    layout = calcular_layout(arvore.raiz, _filhos_no(arvore), profundidade_maxima)
+    fator, escala = _enquadrar(ax, layout)
+    xs = layout.xs
+    ys = [y * fator for y in layout.ys]
+    cores = ['red' if no.cor == Cor.VERMELHO else 'black' for no in layout.nos]
+    espessura = min(2.0, max(0.3, escala / 20))
+
+    if backend == "networkx":
+        _desenhar_com_networkx(ax, layout, xs, ys, cores, espessura)
+    else:
+        ax.add_collection(LineCollection(_segmentos(layout, fator), colors='gray',
+                                         linewidths=espessura, zorder=2))
+        ax.scatter(xs, ys, s=(0.6 * escala) ** 2, c=cores, edgecolors='black',
+                   linewidths=min(2.0, escala / 20), zorder=3)
+
+    # Subárvores recolhidas: um triângulo por resumo, abaixo do nó
+    fonte = _tamanho_fonte(12.0, escala, (no.valor for no in layout.nos))
+    triangulos = []
+    for i, (quantidade, _) in layout.resumos.items():
+        x, y = xs[i], ys[i]
+        triangulos.append([(x, y), (x - 0.3, y - 0.6 * fator), (x + 0.3, y - 0.6 * fator)])
+        if fonte >= TAMANHO_MINIMO_FONTE:
+            ax.text(x, y - 0.7 * fator, f"+{quantidade - 1}", ha='center', va='top',
+                    fontsize=fonte * 0.7, color='dimgray')
+    ax.add_collection(PolyCollection(triangulos, facecolors='lightgray', edgecolors='gray', zorder=2))
+
+    # Rótulos (omitidos quando não caberiam no círculo)
+    if fonte >= TAMANHO_MINIMO_FONTE:
+        for x, y, no in zip(xs, ys, layout.nos):
+            ax.text(x, y, str(no.valor), ha='center', va='center',
+                    fontsize=fonte, fontweight='bold', color='white', zorder=4)
+
+    # Adiciona informações da árvore
+    info_text = f"Nós: {len(arvore)} | Altura: {arvore.altura()} | Altura Preta: {arvore.altura_preta()}"
+    if layout.resumos:
+        info_text += f" | Exibindo até o nível {profundidade_maxima} ({len(layout.resumos)} subárvores resumidas)"
+    fig.text(0.5, 0.02, info_text, ha='center', fontsize=12,
+             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+    return layout
+
+
+def _desenhar_com_networkx(ax, layout, xs, ys, cores, espessura):
+    """Arestas via `nx.draw_networkx_edges` e um `Circle` por nó"""
+    import networkx as nx
+
+    G = nx.DiGraph()
+    pos = {}
+    for i, pai in enumerate(layout.pais):
+        G.add_node(i)
+        pos[i] = (xs[i], ys[i])
+        if pai >= 0:
+            G.add_edge(pai, i)
+    nx.draw_networkx_edges(G, pos, ax=ax, arrows=False, width=espessura, edge_color='gray')
+
+    for i in G.nodes():
+        circle = plt.Circle(pos[i], 0.3, color=cores[i], ec='black', linewidth=espessura, zorder=3)
+        ax.add_patch(circle)